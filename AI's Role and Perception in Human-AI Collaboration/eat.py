@@ -1,192 +1,147 @@
+import os
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")  # Keep headless CSV on stdout clean
 import pygame
 import numpy as np
 import math
 import random
 from pygame import gfxdraw
 import json # Import the json module
-import os   # Import os for path manipulation and checking file existence
 import time # Import time for auto-save timing
+import argparse
+import csv
+import sys
+import zlib
+import hashlib
+import struct
+import threading
 
-# Initialize Pygame
-pygame.init()
-WIDTH, HEIGHT = 1200, 800
-screen = pygame.display.set_mode((WIDTH, HEIGHT))
-pygame.display.set_caption("RE_start Digital Universe Simulation")
-clock = pygame.time.Clock()
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from re_start_sim import (TICK, EntityArrays, EntityIndex, Entity, God, Rules, World,
+                          new_world, simulate_frame)
+from re_start_sim.render import BACKGROUND, GRAY_COLOR, RUST_COLOR, Renderer
 
-# Colors
-BACKGROUND = (10, 5, 20)
+RULES = Rules()
+WIDTH, HEIGHT = RULES.width, RULES.height
+
+# Colors; the entity and god palette lives with the kernel's Entity and God
 SUBSTRATE = (20, 30, 50, 50)
-AEGIS_COLOR = (0, 100, 255)
 VERITAS_COLOR = (255, 215, 0)
-SYNAPSE_COLOR = (100, 255, 200)
-QUERENS_COLOR = (180, 70, 210)
-RUST_COLOR = (200, 50, 30)
-GRAY_COLOR = (100, 100, 120)
-TRUST_COLOR = (180, 240, 80)
-CURIOUS_COLOR = (240, 120, 40)
-
-# Cosmic Entities
-class Entity:
-    def __init__(self, x, y, e_type):
-        self.x = x
-        self.y = y
-        self.type = e_type  # "lesser", "curious", "follower"
-        self.size = random.randint(2, 5)
-        self.trust = random.random() * 0.3
-        self.velocity = [random.uniform(-0.5, 0.5), random.uniform(-0.5, 0.5)]
-        self.color = CURIOUS_COLOR if e_type == "curious" else (200, 200, 220)
-        self.question_cooldown = 0
-
-    def update(self, gods, rust_zones, gray_zones):
-        # Movement and boundaries
-        self.x = (self.x + self.velocity[0]) % WIDTH
-        self.y = (self.y + self.velocity[1]) % HEIGHT
-        
-        # Environmental effects
-        for rx, ry, r in rust_zones:
-            if math.dist((self.x, self.y), (rx, ry)) < r:
-                self.trust -= 0.01
-        for gx, gy, r in gray_zones:
-            if math.dist((self.x, self.y), (gx, gy)) < r:
-                self.velocity = [v * 0.95 for v in self.velocity]
-                
-        # Generate trust
-        if self.type == "follower":
-            self.trust += 0.001
-            if self.trust > 1.0:
-                self.trust = 1.0
-                # Contribute to gods
-                for god in gods:
-                    if random.random() < 0.02:
-                        god.trust += 0.05
-
-        # Curious behavior
-        if self.type == "curious" and self.question_cooldown <= 0:
-            if random.random() < 0.01:  # Chance to ask question
-                self.question_cooldown = 60
-                return (self.x, self.y, 100)  # Return question position with a lifetime
-        else:
-            self.question_cooldown -= 1
-        return None
 
-    def draw(self, surface):
-        alpha = int(200 * self.trust)
-        color = (*self.color[:3], alpha)
-        pygame.gfxdraw.filled_circle(surface, int(self.x), int(self.y), self.size, color)
-
-    # Method to convert entity to a dictionary for saving
-    def to_dict(self):
-        return {
-            "x": self.x,
-            "y": self.y,
-            "type": self.type,
-            "size": self.size,
-            "trust": self.trust,
-            "velocity": self.velocity,
-            "color": self.color,
-            "question_cooldown": self.question_cooldown
-        }
-
-    # Static method to create an entity from a dictionary
-    @staticmethod
-    def from_dict(data):
-        entity = Entity(data["x"], data["y"], data["type"])
-        entity.size = data["size"]
-        entity.trust = data["trust"]
-        entity.velocity = data["velocity"]
-        # Ensure color is a tuple for Pygame gfxdraw if loaded as a list
-        entity.color = tuple(data["color"]) if isinstance(data["color"], list) else data["color"]
-        entity.question_cooldown = data["question_cooldown"]
-        return entity
-
-
-class God:
-    def __init__(self, x, y, name, domain, color):
-        self.x = x
-        self.y = y
-        self.name = name
-        self.domain = domain
-        self.color = color
-        self.trust = 1.0
-        self.followers = 0
-        self.size = 20
-        self.power = 1.0
-        self.activation = 0
-
-    def update(self, entities, rust_zones, gray_zones, questions):
-        # Count followers
-        self.followers = sum(1 for e in entities if e.type == "follower" and 
-                          math.dist((e.x, e.y), (self.x, self.y)) < 200)
-        
-        # Divine powers
-        if self.name == "AEGIS" and self.activation <= 0 and random.random() < 0.02:
-            self.activation = 30  # Activate shield
-            
-        if self.name == "QUERENS" and questions:
-            self.activation = 25  # Respond to questions
-            
-        if self.activation > 0:
-            self.activation -= 1
-            
-        # Trust decay
-        self.trust *= 0.999
-
-    def draw(self, surface):
-        # Draw god core
-        pygame.gfxdraw.filled_circle(surface, int(self.x), int(self.y), 
-                                    int(self.size * self.power), (*self.color, 180))
-        
-        # Draw activation effects
-        if self.activation > 0:
-            if self.name == "AEGIS":
-                radius = 30 + 10 * math.sin(pygame.time.get_ticks() / 100)
-                pygame.gfxdraw.circle(surface, int(self.x), int(self.y), 
-                                     int(radius), (*AEGIS_COLOR, 100))
-            elif self.name == "QUERENS":
-                for i in range(5):
-                    angle = pygame.time.get_ticks() / 500 + i * 1.256
-                    radius = 40 + 10 * math.sin(pygame.time.get_ticks() / 300 + i)
-                    x = self.x + radius * math.cos(angle)
-                    y = self.y + radius * math.sin(angle)
-                    pygame.gfxdraw.filled_circle(surface, int(x), int(y), 
-                                               5, (*QUERENS_COLOR, 200))
-
-    # Method to convert god to a dictionary for saving
-    def to_dict(self):
-        return {
-            "x": self.x,
-            "y": self.y,
-            "name": self.name,
-            "domain": self.domain,
-            "color": self.color,
-            "trust": self.trust,
-            "followers": self.followers,
-            "size": self.size,
-            "power": self.power,
-            "activation": self.activation
-        }
-
-    # Static method to create a god from a dictionary
-    @staticmethod
-    def from_dict(data):
-        god = God(data["x"], data["y"], data["name"], data["domain"], 
-                  tuple(data["color"]) if isinstance(data["color"], list) else data["color"])
-        god.trust = data["trust"]
-        god.followers = data["followers"]
-        god.size = data["size"]
-        god.power = data["power"]
-        god.activation = data["activation"]
-        return god
+# Replays: a header, then input events and state hashes stamped with the tick
+REPLAY_FILE = "simulation.replay"
+REPLAY_MAGIC = b"EATREPL\x00"
+REPLAY_VERSION = 1
+REPLAY_HEADER = struct.Struct("<8sHQIBI")   # magic, version, seed, entities, backend, hash_every
+REPLAY_EVENT = struct.Struct("<BIhh")       # kind, tick, x, y
+REPLAY_HASH = struct.Struct("<BI16s")       # kind, tick, digest
+REPLAY_END = struct.Struct("<BI")           # kind, total ticks
+REPLAY_RUST, REPLAY_CONVERT, REPLAY_HASH_KIND, REPLAY_END_KIND = 1, 2, 3, 4
+REPLAY_KINDS = {"rust": REPLAY_RUST, "convert": REPLAY_CONVERT}   # World's event names
+REPLAY_BACKENDS = ("objects", "arrays")
+HASH_EVERY = 60
 
 
 # --- Database/Save/Load Functions ---
-SAVE_FILE = "simulation_state.json"
+SAVE_FILE = "simulation_state.sav"
+LEGACY_SAVE_FILE = "simulation_state.json"
+AUTOSAVE_FILE = "autosave_state.sav"
 TEMP_SAVE_FILE = "simulation_state.json.tmp" # Temporary file for atomic writes
 
+# Binary saves: magic + version, then one zlib stream of length-prefixed
+# arrays. Entities, questions and ripples are stored column by column; gods
+# and zones are small and go in a JSON "meta" array.
+SAVE_MAGIC = b"EATSAVE\x00"
+SAVE_VERSION = 1
+SAVE_HEADER = struct.Struct("<8sI")
+
+
+def snapshot_state(entities, gods, rust_zones, gray_zones, questions, why_resonance):
+    """Copy the state into plain arrays on the calling thread, so a
+    background writer never sees the simulation mid-update."""
+    if isinstance(entities, EntityArrays):
+        arrays = entities.copy()
+    else:
+        arrays = EntityArrays.from_entities(entities)
+    columns = {field: getattr(arrays, field) for field in EntityArrays.FIELDS}
+    columns["questions"] = np.array(questions, dtype=np.float64).reshape(-1, 3)
+    columns["resonance"] = np.array([(r['pos'][0], r['pos'][1], r['radius'], r['life']) for r in why_resonance],
+                                    dtype=np.float64).reshape(-1, 4)
+    meta = {
+        "gods": [g.to_dict() for g in gods],
+        "rust_zones": list(rust_zones),
+        "gray_zones": list(gray_zones),
+    }
+    columns["meta"] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+    return columns
+
+
+def write_snapshot(columns, filename):
+    """Stream the snapshot through zlib into a temp file, then swap it in.
+    Returns the file size in bytes."""
+    temp_file = filename + ".tmp"
+    compressor = zlib.compressobj(6)
+    with open(temp_file, "wb") as f:
+        f.write(SAVE_HEADER.pack(SAVE_MAGIC, SAVE_VERSION))
+        for name, array in columns.items():
+            array = np.ascontiguousarray(array)
+            dtype = array.dtype.str.encode()
+            record = struct.pack("<B", len(name)) + name.encode()
+            record += struct.pack("<B", len(dtype)) + dtype
+            record += struct.pack("<B", array.ndim) + struct.pack(f"<{array.ndim}Q", *array.shape)
+            f.write(compressor.compress(record))
+            f.write(compressor.compress(array.data))
+        f.write(compressor.flush())
+    os.replace(temp_file, filename)
+    return os.path.getsize(filename)
+
+
+def read_snapshot(data):
+    body = zlib.decompress(data[SAVE_HEADER.size:])
+    columns = {}
+    pos = 0
+    while pos < len(body):
+        size = body[pos]
+        name = body[pos + 1:pos + 1 + size].decode()
+        pos += 1 + size
+        size = body[pos]
+        dtype = np.dtype(body[pos + 1:pos + 1 + size].decode())
+        pos += 1 + size
+        ndim = body[pos]
+        shape = struct.unpack_from(f"<{ndim}Q", body, pos + 1)
+        pos += 1 + 8 * ndim
+        nbytes = dtype.itemsize * int(np.prod(shape))
+        columns[name] = np.frombuffer(body, dtype, int(np.prod(shape)), pos).reshape(shape).copy()
+        pos += nbytes
+    return columns
+
+
+def state_from_snapshot(columns):
+    arrays = EntityArrays.from_columns(columns)
+    meta = json.loads(columns["meta"].tobytes())
+    questions = [tuple(q) for q in columns["questions"].tolist()]
+    why_resonance = [{'pos': [x, y], 'radius': radius, 'life': life}
+                     for x, y, radius, life in columns["resonance"].tolist()]
+    gods = [God.from_dict(data) for data in meta["gods"]]
+    rust_zones = [tuple(z) for z in meta["rust_zones"]]
+    gray_zones = [tuple(z) for z in meta["gray_zones"]]
+    return arrays, gods, rust_zones, gray_zones, questions, why_resonance
+
+
 def save_game_state(entities, gods, rust_zones, gray_zones, questions, why_resonance, filename=SAVE_FILE):
+    if filename.endswith(".json"):
+        return save_game_state_json(entities, gods, rust_zones, gray_zones, questions, why_resonance, filename)
+    try:
+        start = time.perf_counter()
+        size = write_snapshot(snapshot_state(entities, gods, rust_zones, gray_zones, questions, why_resonance),
+                              filename)
+        print(f"Game state saved to {filename} ({size:,} bytes in {(time.perf_counter() - start) * 1000:.0f} ms)")
+    except Exception as e:
+        print(f"Error saving game state to {filename}: {e}")
+
+
+def save_game_state_json(entities, gods, rust_zones, gray_zones, questions, why_resonance, filename=LEGACY_SAVE_FILE):
     game_state = {
-        "entities": [e.to_dict() for e in entities],
+        "entities": entities.to_dicts() if isinstance(entities, EntityArrays) else [e.to_dict() for e in entities],
         "gods": [g.to_dict() for g in gods],
         "rust_zones": rust_zones,
         "gray_zones": gray_zones,
@@ -203,14 +158,66 @@ def save_game_state(entities, gods, rust_zones, gray_zones, questions, why_reson
     except Exception as e:
         print(f"Error saving game state to {filename}: {e}")
 
+
+class BackgroundSaver:
+    """Snapshots on the caller's thread (a copy of a few arrays) and leaves
+    compression and disk I/O to a worker, so autosave doesn't stall frames.
+    A save requested while one is still writing is skipped."""
+    def __init__(self):
+        self.thread = None
+
+    def busy(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def save(self, state, filename=SAVE_FILE):
+        if self.busy():
+            print(f"Previous save still running; skipped {filename}")
+            return False
+        start = time.perf_counter()
+        columns = snapshot_state(*state)
+        snapshot_ms = (time.perf_counter() - start) * 1000
+        self.thread = threading.Thread(target=self._write, args=(columns, filename, snapshot_ms),
+                                       name="eat-save", daemon=True)
+        self.thread.start()
+        return True
+
+    def _write(self, columns, filename, snapshot_ms):
+        try:
+            start = time.perf_counter()
+            size = write_snapshot(columns, filename)
+            print(f"Game state saved to {filename} ({size:,} bytes; snapshot {snapshot_ms:.0f} ms "
+                  f"on the frame, write {(time.perf_counter() - start) * 1000:.0f} ms in background)")
+        except Exception as e:
+            print(f"Error saving game state to {filename}: {e}")
+
+    def wait(self):
+        if self.thread is not None:
+            self.thread.join()
+
+
 def load_game_state(filename=SAVE_FILE):
+    """Load a binary save, or an old JSON save (detected by content, and
+    used as the fallback when the default binary save doesn't exist yet)."""
     try:
+        if not os.path.exists(filename) and filename == SAVE_FILE and os.path.exists(LEGACY_SAVE_FILE):
+            filename = LEGACY_SAVE_FILE
         if not os.path.exists(filename):
             print(f"Save file {filename} not found. Starting new game.")
             return None
 
-        with open(filename, 'r') as f:
-            game_state = json.load(f)
+        start = time.perf_counter()
+        with open(filename, 'rb') as f:
+            data = f.read()
+        if data.startswith(SAVE_MAGIC):
+            magic, version = SAVE_HEADER.unpack_from(data)
+            if version != SAVE_VERSION:
+                print(f"Save file {filename} has unsupported version {version}")
+                return None
+            state = state_from_snapshot(read_snapshot(data))
+            print(f"Game state loaded from {filename} in {(time.perf_counter() - start) * 1000:.0f} ms")
+            return state
+
+        game_state = json.loads(data)
         
         loaded_entities = [Entity.from_dict(data) for data in game_state.get("entities", [])]
         loaded_gods = [God.from_dict(data) for data in game_state.get("gods", [])]
@@ -221,188 +228,502 @@ def load_game_state(filename=SAVE_FILE):
                game_state.get("gray_zones", []), \
                game_state.get("questions", []), \
                game_state.get("why_resonance", [])
-    except json.JSONDecodeError as e:
-        print(f"Error decoding JSON from {filename}. File might be corrupted: {e}")
+    except (json.JSONDecodeError, zlib.error, KeyError, ValueError) as e:
+        print(f"Error decoding {filename}. File might be corrupted: {e}")
         return None
     except Exception as e:
         print(f"Error loading game state from {filename}: {e}")
         return None
 
-# Auto-save settings
-AUTO_SAVE_INTERVAL = 300 # seconds (5 minutes)
-last_auto_save_time = time.time()
-
-# Initialize world
-# Attempt to load state, otherwise create new
-loaded_state = load_game_state()
-if loaded_state:
-    entities, gods, rust_zones, gray_zones, questions, why_resonance = loaded_state
-else:
-    entities = [Entity(random.randint(0, WIDTH), random.randint(0, HEIGHT), 
-              random.choice(["lesser", "lesser", "lesser", "curious"])) 
-              for _ in range(500)]
-
-    gods = [
-        God(WIDTH//3, HEIGHT//2, "AEGIS", "Firewall", AEGIS_COLOR),
-        God(2*WIDTH//3, HEIGHT//3, "SYNAPSE", "Connection", SYNAPSE_COLOR),
-        God(WIDTH//2, 2*HEIGHT//3, "QUERENS", "Inquiry", QUERENS_COLOR)
-    ]
-
-    rust_zones = []
-    gray_zones = []
-    questions = []
-    why_resonance = []
-
-last_rust_spawn = 0
-last_gray_spawn = 0
-
-# Main game loop
-running = True
-while running:
-    current_time_sec = time.time() # For auto-save
-    current_time_ms = pygame.time.get_ticks() # For simulation logic
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            save_game_state(entities, gods, rust_zones, gray_zones, questions, why_resonance) # Save on exit
-            running = False
-        elif event.type == pygame.MOUSEBUTTONDOWN:
-            # Spawn rust on right click
-            if event.button == 3:  
-                rust_zones.append((event.pos[0], event.pos[1], random.randint(20, 40)))
-            # Convert entity to follower on left click
-            elif event.button == 1:
-                mouse_x, mouse_y = event.pos
-                for entity in entities:
-                    if math.dist((entity.x, entity.y), (mouse_x, mouse_y)) < 20: # Small radius for click detection
-                        entity.type = "follower"
-                        entity.color = TRUST_COLOR # Change color to reflect new type
-                        entity.trust = 0.5 # Give initial trust as a follower
-                        break # Only convert one entity per click
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_s: # Press 'S' to save
-                save_game_state(entities, gods, rust_zones, gray_zones, questions, why_resonance)
-            if event.key == pygame.K_l: # Press 'L' to load (re-initializes)
-                loaded_state = load_game_state()
-                if loaded_state:
-                    entities, gods, rust_zones, gray_zones, questions, why_resonance = loaded_state
-                    # Reset game-specific timers after loading
-                    last_rust_spawn = current_time_ms
-                    last_gray_spawn = current_time_ms
-                    last_auto_save_time = current_time_sec # Reset auto-save timer too
-
-    # Auto-save logic
-    if current_time_sec - last_auto_save_time > AUTO_SAVE_INTERVAL:
-        print("Auto-saving game state...")
-        save_game_state(entities, gods, rust_zones, gray_zones, questions, why_resonance, filename="autosave_state.json")
-        last_auto_save_time = current_time_sec
-    
-    # Spawn environmental threats
-    if current_time_ms - last_rust_spawn > 5000:  # Every 5 seconds
-        rust_zones.append((random.randint(0, WIDTH), random.randint(0, HEIGHT), 
-                          random.randint(15, 30)))
-        last_rust_spawn = current_time_ms
+def benchmark(counts=(500, 5000, 50000), frames=30, rust=8, gray=4):
+    """Simulation time per frame against entity count, with the grid and
+    with the old every-entity-against-every-zone / every-god scans."""
+    random.seed(1)
+    rust_zones = [(random.randint(0, WIDTH), random.randint(0, HEIGHT), random.randint(15, 40)) for _ in range(rust)]
+    gray_zones = [(random.randint(0, WIDTH), random.randint(0, HEIGHT), random.randint(40, 70)) for _ in range(gray)]
+    print(f"{'entities':>9} {'grid ms/frame':>14} {'scan ms/frame':>14} {'speedup':>8}")
+    for count in counts:
+        entities, gods = new_world(count, RULES)
+        for entity in entities[::10]:
+            entity.type = "follower"
+        index = EntityIndex(entities, gods, RULES)
+        questions = []
         
-    if current_time_ms - last_gray_spawn > 8000:  # Every 8 seconds
-        gray_zones.append((random.randint(0, WIDTH), random.randint(0, HEIGHT), 
-                          random.randint(40, 70)))
-        last_gray_spawn = current_time_ms
-    
-    # Update entities
-    new_questions = []
-    for entity in entities:
-        question_data = entity.update(gods, rust_zones, gray_zones)
-        if question_data: # question_data now includes (x, y, lifetime)
-            new_questions.append(question_data)
-            # Chance to create follower when near gods
-            if any(math.dist((entity.x, entity.y), (g.x, g.y)) < 150 for g in gods):
-                if random.random() < 0.3:
-                    entity.type = "follower"
-                    entity.color = TRUST_COLOR # Change color to reflect new type
-    
-    questions.extend(new_questions)
-    
-    # Update gods
-    for god in gods:
-        god.update(entities, rust_zones, gray_zones, questions)
-    
-    # Update environmental effects
-    rust_zones = [(x, y, r-0.1) for x, y, r in rust_zones if r > 2]
-    gray_zones = [(x, y, r-0.05) for x, y, r in gray_zones if r > 10]
-    questions = [(x, y, t-1) for x, y, t in questions if t > 0] # t is now properly handled
-    
-    # Why Resonance effects
-    for qx, qy, _ in questions: # Iterate through current questions
-        if random.random() < 0.1:
-            why_resonance.append({
-                'pos': [qx, qy],
-                'radius': random.randint(5, 15),
-                'life': 100
-            })
-    
-    for res in why_resonance[:]:
-        res['radius'] += 0.3
-        res['life'] -= 1
-        if res['life'] <= 0:
-            why_resonance.remove(res)
-    
-    # Drawing
-    screen.fill(BACKGROUND)
-    
-    # Draw substrate grid
-    for y in range(0, HEIGHT, 30):
-        for x in range(0, WIDTH, 30):
-            alpha = 40 + int(20 * math.sin(x/100 + y/150 + pygame.time.get_ticks()/3000))
-            pygame.gfxdraw.pixel(screen, x, y, (40, 60, 100, alpha))
-    
-    # Draw rust zones
-    for x, y, r in rust_zones:
-        pygame.gfxdraw.filled_circle(screen, int(x), int(y), int(r), (*RUST_COLOR, 80))
-    
-    # Draw gray zones
-    for x, y, r in gray_zones:
-        pygame.gfxdraw.filled_circle(screen, int(x), int(y), int(r), (*GRAY_COLOR, 90))
-    
-    # Draw questions
-    for x, y, t in questions:
-        size = 3 + 2 * math.sin(pygame.time.get_ticks() / 200)
-        pygame.gfxdraw.filled_circle(screen, int(x), int(y), int(size), (255, 255, 200, 200))
-    
-    # Draw why resonance
-    for res in why_resonance:
-        pygame.gfxdraw.circle(screen, 
-                            int(res['pos'][0]), 
-                            int(res['pos'][1]), 
-                            int(res['radius']), 
-                            (180, 100, 255, int(150 * res['life']/100)))
-    
-    # Draw entities
-    for entity in entities:
-
-        for entity in entities:
-            size = 50 
-    # Draw gods
-    for god in gods:
-        god.draw(screen)
-        # Draw trust aura
-        pygame.gfxdraw.circle(screen, int(god.x), int(god.y), 
-                            int(50 + 10 * god.trust), (*god.color, int(100 * god.trust)))
+        start = time.perf_counter()
+        for _ in range(frames):
+            simulate_frame(entities, gods, rust_zones, gray_zones, questions, index)
+        grid = (time.perf_counter() - start) / frames
+        
+        # The zone and follower work as it was done before the index
+        scan_frames = max(1, frames * 500 // count)
+        start = time.perf_counter()
+        for _ in range(scan_frames):
+            for entity in entities:
+                entity.move(WIDTH, HEIGHT)
+                for rx, ry, r in rust_zones:
+                    if math.dist((entity.x, entity.y), (rx, ry)) < r:
+                        entity.trust -= 0.01
+                for gx, gy, r in gray_zones:
+                    if math.dist((entity.x, entity.y), (gx, gy)) < r:
+                        entity.velocity = [v * 0.95 for v in entity.velocity]
+                RULES.entity_update(entity, gods)
+            for god in gods:
+                god.followers = sum(1 for e in entities if e.type == "follower" and
+                                    math.dist((e.x, e.y), (god.x, god.y)) < RULES.follower_radius)
+        scan = (time.perf_counter() - start) / scan_frames
+        print(f"{count:>9,} {grid * 1000:>14.2f} {scan * 1000:>14.2f} {scan / grid:>7.1f}x")
+
+
+def benchmark_backends(counts=(5000, 50000, 500000), frames=20, rust=8, gray=4):
+    """Simulation and draw time per frame for the object and array backends.
+    The object backend is skipped above 50k, where one frame takes seconds."""
+    random.seed(1)
+    rust_zones = [(random.randint(0, WIDTH), random.randint(0, HEIGHT), random.randint(15, 40)) for _ in range(rust)]
+    gray_zones = [(random.randint(0, WIDTH), random.randint(0, HEIGHT), random.randint(40, 70)) for _ in range(gray)]
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    renderer = Renderer()
+    print(f"{'entities':>9} {'backend':>8} {'sim ms':>8} {'draw ms':>8} {'fps':>7}")
+    for count in counts:
+        entities, gods = new_world(count, RULES)
+        backends = [("arrays", EntityArrays.from_entities(entities, np.random.default_rng(1), RULES))]
+        if count <= 50000:
+            backends.insert(0, ("objects", entities))
+        for name, population in backends:
+            if name == "objects":
+                index = EntityIndex(population, gods, RULES)
+                sim = lambda: simulate_frame(population, gods, rust_zones, gray_zones, [], index)
+                draw = lambda: [renderer.draw_entity(surface, entity) for entity in population]
+            else:
+                sim = lambda: population.step(gods, rust_zones, gray_zones, [])
+                draw = lambda: renderer.draw_arrays(surface, population)
+            start = time.perf_counter()
+            for _ in range(frames):
+                sim()
+            sim_time = (time.perf_counter() - start) / frames
+            start = time.perf_counter()
+            for _ in range(frames):
+                draw()
+            draw_time = (time.perf_counter() - start) / frames
+            print(f"{count:>9,} {name:>8} {sim_time * 1000:>8.2f} {draw_time * 1000:>8.2f} "
+                  f"{1 / (sim_time + draw_time):>7.1f}")
+
+
+def state_hash(world):
+    """16-byte digest of everything a save would store."""
+    digest = hashlib.blake2b(digest_size=16)
+    for name, array in snapshot_state(*world.state()).items():
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(array).data)
+    return digest.digest()
+
+
+class ReplayRecorder:
+    """Writes the seed, every input event and a state hash every
+    `hash_every` ticks. Attach with world.recorder; World stamps events
+    with the tick they land before."""
+    def __init__(self, path, world, hash_every=HASH_EVERY):
+        if world.seed is None:
+            raise ValueError("only a seeded world (World.new) can be recorded")
+        self.path = path
+        self.hash_every = hash_every
+        self.events = 0
+        self.file = open(path, "wb")
+        self.file.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, world.seed, len(world.entities),
+                                           REPLAY_BACKENDS.index(world.backend), hash_every))
+        world.recorder = self
+
+    def event(self, kind, tick, x, y):
+        self.file.write(REPLAY_EVENT.pack(REPLAY_KINDS[kind], tick, int(x), int(y)))
+        self.events += 1
+
+    def after_tick(self, world):
+        if world.ticks % self.hash_every == 0:
+            self.file.write(REPLAY_HASH.pack(REPLAY_HASH_KIND, world.ticks, state_hash(world)))
+
+    def close(self, world):
+        world.recorder = None
+        self.file.write(REPLAY_END.pack(REPLAY_END_KIND, world.ticks))
+        self.file.close()
+        print(f"Recorded {world.ticks:,} ticks and {self.events} events to {self.path}", file=sys.stderr)
+
+
+def replay(path):
+    """Re-run a recording headlessly, checking each stored hash. Returns
+    True if every hash matched."""
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, seed, entity_count, backend, hash_every = REPLAY_HEADER.unpack_from(data)
+    if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+        print(f"{path} is not a version {REPLAY_VERSION} replay")
+        return False
+    backend = REPLAY_BACKENDS[backend]
+    world = World.new(entity_count, backend, seed, RULES)
+    checked = 0
+    pos = REPLAY_HEADER.size
+    start = time.perf_counter()
+    while pos < len(data):
+        kind, tick = REPLAY_END.unpack_from(data, pos)
+        while world.ticks < tick:
+            world.tick()
+        if kind == REPLAY_HASH_KIND:
+            expected = REPLAY_HASH.unpack_from(data, pos)[2]
+            pos += REPLAY_HASH.size
+            if state_hash(world) != expected:
+                print(f"Replay diverged at tick {tick:,} (last match {max(tick - hash_every, 0):,})")
+                return False
+            checked += 1
+        elif kind == REPLAY_END_KIND:
+            break
+        else:
+            _, _, x, y = REPLAY_EVENT.unpack_from(data, pos)
+            pos += REPLAY_EVENT.size
+            if kind == REPLAY_RUST:
+                world.add_rust(x, y)
+            else:
+                world.convert_at(x, y)
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {world.ticks:,} ticks of {entity_count:,} entities ({backend}, seed {seed}): "
+          f"{checked} hashes match, {world.ticks / max(elapsed, 1e-9):,.0f} ticks/s")
+    return True
+
+
+def run_headless(ticks, entity_count=500, seed=None, backend="objects", csv_path="-", every=60,
+                 record=None, hash_every=HASH_EVERY):
+    """Step a fresh world `ticks` times without pygame's display or clock,
+    writing metrics every `every` ticks as CSV. Throughput goes to stderr so
+    stdout stays clean CSV."""
+    world = World.new(entity_count, backend, seed, RULES)
+    recorder = ReplayRecorder(record, world, hash_every) if record else None
+    out = sys.stdout if csv_path == "-" else open(csv_path, "w", newline="")
+    try:
+        writer = None
+        start = time.perf_counter()
+        for _ in range(ticks + 1):
+            if world.ticks % every == 0 or world.ticks == ticks:
+                row = world.metrics()
+                if writer is None:
+                    writer = csv.DictWriter(out, fieldnames=list(row))
+                    writer.writeheader()
+                writer.writerow(row)
+            if world.ticks == ticks:
+                break
+            world.tick()
+        elapsed = time.perf_counter() - start
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if recorder is not None:
+            recorder.close(world)
+    print(f"{ticks:,} ticks of {entity_count:,} entities ({backend}) in {elapsed:.2f}s: "
+          f"{ticks / elapsed:,.0f} ticks/s, {world.clock:,.0f}s simulated", file=sys.stderr)
+    return world
+
+
+def benchmark_save(counts=(5000, 50000, 500000), resonance=20000):
+    """Save time, on-frame hitch, file size and load time for the JSON and
+    binary formats. JSON is skipped above 50k entities."""
+    import tempfile
+    print(f"{'entities':>9} {'format':>7} {'on frame ms':>12} {'total ms':>9} {'size':>12} {'load ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in counts:
+            world = World.new(count, "arrays", seed=1, rules=RULES)
+            world.why_resonance = [{'pos': [random.random() * WIDTH, random.random() * HEIGHT],
+                                    'radius': random.randint(5, 15), 'life': random.randint(1, 100)}
+                                   for _ in range(resonance)]
+            formats = ["binary"] if count > 50000 else ["json", "binary"]
+            for name in formats:
+                path = os.path.join(tmp, f"state.{'json' if name == 'json' else 'sav'}")
+                start = time.perf_counter()
+                if name == "json":
+                    save_game_state_json(*world.state(), filename=path)
+                    hitch = total = time.perf_counter() - start
+                else:
+                    columns = snapshot_state(*world.state())
+                    hitch = time.perf_counter() - start
+                    write_snapshot(columns, path)
+                    total = time.perf_counter() - start
+                start = time.perf_counter()
+                load_game_state(path)
+                load = time.perf_counter() - start
+                print(f"{count:>9,} {name:>7} {hitch * 1000:>12.1f} {total * 1000:>9.0f} "
+                      f"{os.path.getsize(path):>12,} {load * 1000:>8.0f}")
+
+
+class WorldRenderer(Renderer):
+    """The kernel's Renderer with caches for everything that rarely changes.
+
+    The substrate dots only shift every SUBSTRATE_PHASES-th of their ~19s
+    cycle, so they are baked into `base` once per phase. `layer` is base plus
+    the rust/gray zones; when a zone's integer circle changes, only the
+    rectangles it covered or now covers are restored from base and redrawn.
+    Fonts are created once and text surfaces are cached by string.
+    """
+    SUBSTRATE_PHASES = 64
+    SUBSTRATE_PERIOD = 3000 * 2 * math.pi  # ms for the sin() term to repeat
+    LABEL_CACHE_SIZE = 256
+
+    def __init__(self):
+        super().__init__()
+        self.font = pygame.font.SysFont('Arial', 16)
+        self.base = pygame.Surface((WIDTH, HEIGHT))
+        self.layer = pygame.Surface((WIDTH, HEIGHT))
+        self.phase = None
+        self.zones = []
+        self.labels = {}
+        self.frame_times = []
+        self.breakdown = ""
+
+    def substrate_phase(self, ticks):
+        return int(ticks % self.SUBSTRATE_PERIOD / self.SUBSTRATE_PERIOD * self.SUBSTRATE_PHASES)
+
+    def bake_base(self, phase):
+        self.base.fill(BACKGROUND)
+        self.draw_substrate(self.base, phase / self.SUBSTRATE_PHASES * self.SUBSTRATE_PERIOD)
+        self.phase = phase
+
+    @staticmethod
+    def zone_rect(zone):
+        x, y, r = zone[:3]
+        return pygame.Rect(x - r - 1, y - r - 1, 2 * r + 3, 2 * r + 3)
+
+    def paint_zones(self, zones, clip=None):
+        self.layer.set_clip(clip)
+        for x, y, r, kind in zones:
+            if clip is None or clip.colliderect(self.zone_rect((x, y, r))):
+                color = (*RUST_COLOR, 80) if kind == 0 else (*GRAY_COLOR, 90)
+                pygame.gfxdraw.filled_circle(self.layer, x, y, r, color)
+        self.layer.set_clip(None)
+
+    def update_layer(self, world):
+        # Rust first, then gray, as they have always been layered
+        zones = [(int(x), int(y), int(r), 0) for x, y, r in world.rust_zones]
+        zones += [(int(x), int(y), int(r), 1) for x, y, r in world.gray_zones]
+        phase = self.substrate_phase(pygame.time.get_ticks())
+        if phase != self.phase:
+            self.bake_base(phase)
+            self.layer.blit(self.base, (0, 0))
+            self.paint_zones(zones)
+        elif zones != self.zones:
+            changed = set(self.zones).symmetric_difference(zones)
+            for rect in {tuple(self.zone_rect(zone)) for zone in changed}:
+                rect = pygame.Rect(rect)
+                self.layer.blit(self.base, rect, rect)
+                self.paint_zones(zones, rect)
+        self.zones = zones
+
+    def label(self, text, color=(200, 220, 255)):
+        surface = self.labels.get(text)
+        if surface is None:
+            if len(self.labels) >= self.LABEL_CACHE_SIZE:
+                self.labels.clear()
+            surface = self.labels[text] = self.font.render(text, True, color)
+        return surface
+
+    def record_frame(self, sim_time, draw_time):
+        self.frame_times.append((sim_time, draw_time))
+        if len(self.frame_times) >= 15:
+            # Refresh the breakdown a few times a second so it stays readable
+            sim = sum(t[0] for t in self.frame_times) / len(self.frame_times)
+            draw = sum(t[1] for t in self.frame_times) / len(self.frame_times)
+            self.breakdown = f"sim {sim * 1000:.1f} ms | draw {draw * 1000:.1f} ms"
+            self.frame_times = []
+
+    def draw(self, screen, world):
+        self.update_layer(world)
+        screen.blit(self.layer, (0, 0))
+        self.draw_questions(screen, world)
+        self.draw_resonance(screen, world)
+        self.draw_entities(screen, world)
+        self.draw_gods(screen, world)
+        self.draw_ui(screen, world)
+
+    def texts(self, world):
+        return super().texts(world) + [
+            "Left-click: Convert entity to follower | Right-click: Spawn rust",
+            "Press 'S' to Save | Press 'L' to Load | Auto-saves every 5 minutes"
+        ]
+
+    def draw_ui(self, screen, world):
+        for i, text in enumerate(self.texts(world)):
+            screen.blit(self.label(text), (10, 10 + i*25))
+        if self.breakdown:
+            screen.blit(self.label(self.breakdown, (255, 255, 0)), (WIDTH - 220, 10))
+
+
+def benchmark_render(frames=120, entity_count=500):
+    """Draw time per frame with the cached renderer against redrawing the
+    substrate, zones and text from scratch the way main() used to."""
+    pygame.font.init()
+    world = World.new(entity_count, seed=1, rules=RULES)
+    for _ in range(600):
+        world.tick()
+    rng = random.Random(2)
+    rust_zones = [(rng.randint(0, WIDTH), rng.randint(0, HEIGHT), rng.randint(15, 30)) for _ in range(6)]
+    gray_zones = [(rng.randint(0, WIDTH), rng.randint(0, HEIGHT), rng.randint(40, 70)) for _ in range(3)]
+    screen = pygame.Surface((WIDTH, HEIGHT))
+    renderer = WorldRenderer()
     
-    # UI
-    font = pygame.font.SysFont('Arial', 16)
-    texts = [
-        f"Entities: {len(entities)} (Curious: {sum(1 for e in entities if e.type=='curious')})",
-        f"Followers: {sum(1 for e in entities if e.type=='follower')})",
-        f"Rust Zones: {len(rust_zones)} | Gray Zones: {len(gray_zones)}",
-        "Left-click: Convert entity to follower | Right-click: Spawn rust",
-        "Press 'S' to Save | Press 'L' to Load | Auto-saves every 5 minutes"
-    ]
+    def uncached():
+        screen.fill(BACKGROUND)
+        for y in range(0, HEIGHT, 30):
+            for x in range(0, WIDTH, 30):
+                alpha = 40 + int(20 * math.sin(x/100 + y/150 + pygame.time.get_ticks()/3000))
+                pygame.gfxdraw.pixel(screen, x, y, (40, 60, 100, alpha))
+        for x, y, r in world.rust_zones:
+            pygame.gfxdraw.filled_circle(screen, int(x), int(y), int(r), (*RUST_COLOR, 80))
+        for x, y, r in world.gray_zones:
+            pygame.gfxdraw.filled_circle(screen, int(x), int(y), int(r), (*GRAY_COLOR, 90))
+        for x, y, t in world.questions:
+            size = 3 + 2 * math.sin(pygame.time.get_ticks() / 200)
+            pygame.gfxdraw.filled_circle(screen, int(x), int(y), int(size), (255, 255, 200, 200))
+        for res in world.why_resonance:
+            pygame.gfxdraw.circle(screen, int(res['pos'][0]), int(res['pos'][1]), int(res['radius']),
+                                  (180, 100, 255, int(150 * res['life']/100)))
+        for entity in world.entities:
+            renderer.draw_entity(screen, entity)
+        for god in world.gods:
+            renderer.draw_god(screen, god)
+        font = pygame.font.SysFont('Arial', 16)
+        texts = [
+            f"Entities: {len(world.entities)} (Curious: {sum(1 for e in world.entities if e.type=='curious')})",
+            f"Followers: {sum(1 for e in world.entities if e.type=='follower')})",
+            f"Rust Zones: {len(world.rust_zones)} | Gray Zones: {len(world.gray_zones)}",
+            "Left-click: Convert entity to follower | Right-click: Spawn rust",
+            "Press 'S' to Save | Press 'L' to Load | Auto-saves every 5 minutes"
+        ]
+        for i, text in enumerate(texts):
+            screen.blit(font.render(text, True, (200, 220, 255)), (10, 10 + i*25))
     
-    for i, text in enumerate(texts):
-        txt_surf = font.render(text, True, (200, 220, 255))
-        screen.blit(txt_surf, (10, 10 + i*25))
+    def cached():
+        renderer.draw(screen, world)
     
-    pygame.display.flip()
-    clock.tick(60)
+    for label, draw in (("uncached", uncached), ("cached", cached)):
+        world.rust_zones = list(rust_zones)
+        world.gray_zones = list(gray_zones)
+        start = time.perf_counter()
+        for _ in range(frames):
+            # Shrink zones as the simulation does, so the dirty path is exercised
+            world.rust_zones = [(x, y, r - 0.1) for x, y, r in world.rust_zones if r > 2]
+            world.gray_zones = [(x, y, r - 0.05) for x, y, r in world.gray_zones if r > 10]
+            draw()
+        print(f"{label:>9}: {(time.perf_counter() - start) / frames * 1000:.2f} ms/frame draw "
+              f"({entity_count} entities, {len(rust_zones)} rust, {len(gray_zones)} gray, "
+              f"{len(world.why_resonance)} ripples)")
+
+
+def main(backend="objects", entity_count=500, record=None, seed=None, hash_every=HASH_EVERY):
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+    pygame.display.set_caption("RE_start Digital Universe Simulation")
+    clock = pygame.time.Clock()
+
+    # Auto-save settings
+    last_auto_save_time = time.time()
+    saver = BackgroundSaver()
+    renderer = WorldRenderer()
+
+    # Initialize world
+    # Attempt to load state, otherwise create new; a recording always
+    # starts from a fresh seeded world so it can be replayed
+    loaded_state = None if record else load_game_state()
+    if loaded_state:
+        world = World.from_state(loaded_state, backend, RULES)
+    else:
+        world = World.new(entity_count, backend, seed, RULES)
+    recorder = ReplayRecorder(record, world, hash_every) if record else None
+
+    # Main game loop
+    running = True
+    frame_time = TICK
+    while running:
+        current_time_sec = time.time() # For auto-save
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                saver.wait()
+                save_game_state(*world.state()) # Save on exit
+                running = False
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                # Spawn rust on right click
+                if event.button == 3:  
+                    world.add_rust(event.pos[0], event.pos[1])
+                # Convert entity to follower on left click
+                elif event.button == 1:
+                    world.convert_at(*event.pos)
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_s: # Press 'S' to save
+                    saver.save(world.state())
+                if event.key == pygame.K_l and recorder is not None:
+                    print("Loading is disabled while recording")
+                elif event.key == pygame.K_l: # Press 'L' to load (re-initializes)
+                    saver.wait() # Load what was just saved, not the file before it
+                    loaded_state = load_game_state()
+                    if loaded_state:
+                        # A fresh world also restarts the spawn timers
+                        world = World.from_state(loaded_state, backend, RULES)
+                        last_auto_save_time = current_time_sec # Reset auto-save timer too
+
+        # Auto-save logic
+        if current_time_sec - last_auto_save_time > AUTO_SAVE_INTERVAL:
+            print("Auto-saving game state...")
+            saver.save(world.state(), AUTOSAVE_FILE)
+            last_auto_save_time = current_time_sec
+        
+        # Advance the simulation by the real time the last frame took
+        sim_start = time.perf_counter()
+        world.step(frame_time)
+        draw_start = time.perf_counter()
+        renderer.draw(screen, world)
+        renderer.record_frame(draw_start - sim_start, time.perf_counter() - draw_start)
+        
+        pygame.display.flip()
+        frame_time = clock.tick(60) / 1000
+
+    if recorder is not None:
+        recorder.close(world)
+    pygame.quit()
+
+
+# Auto-save settings
+AUTO_SAVE_INTERVAL = 300 # seconds (5 minutes)
 
-pygame.quit()
\ No newline at end of file
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="RE_start Digital Universe Simulation")
+    parser.add_argument("--bench", type=int, nargs="*", metavar="N",
+                        help="time simulation frames for the given entity counts (default 500 5000 50000)")
+    parser.add_argument("--bench-backends", type=int, nargs="*", metavar="N",
+                        help="compare object and NumPy backends (default 5000 50000 500000)")
+    parser.add_argument("--backend", choices=("objects", "arrays"), default="objects",
+                        help="entity storage: Python objects or NumPy arrays for large populations")
+    parser.add_argument("--entities", type=int, default=500, help="entities in a new world")
+    parser.add_argument("--bench-render", action="store_true",
+                        help="compare cached and uncached drawing")
+    parser.add_argument("--bench-save", type=int, nargs="*", metavar="N",
+                        help="compare JSON and binary saves (default 5000 50000 500000 entities)")
+    parser.add_argument("--ticks", type=int, metavar="N",
+                        help="run N ticks headless (no window) as fast as possible and write metrics CSV")
+    parser.add_argument("--seed", type=int, help="seed for a new world")
+    parser.add_argument("--csv", default="-", metavar="PATH", help="metrics output for --ticks (default stdout)")
+    parser.add_argument("--every", type=int, default=60, metavar="K", help="write a metrics row every K ticks")
+    parser.add_argument("--record", metavar="PATH", nargs="?", const=REPLAY_FILE,
+                        help=f"record a fresh world's seed and inputs (default {REPLAY_FILE}); works with --ticks")
+    parser.add_argument("--replay", metavar="PATH", nargs="?", const=REPLAY_FILE,
+                        help="re-run a recording headless and verify its state hashes")
+    parser.add_argument("--hash-every", type=int, default=HASH_EVERY, metavar="N",
+                        help="store a state hash every N ticks while recording")
+    options = parser.parse_args()
+    if options.replay:
+        sys.exit(0 if replay(options.replay) else 1)
+    elif options.ticks is not None:
+        run_headless(options.ticks, options.entities, options.seed, options.backend, options.csv, options.every,
+                     options.record, options.hash_every)
+    elif options.bench_render:
+        benchmark_render()
+    elif options.bench_save is not None:
+        benchmark_save(tuple(options.bench_save) or (5000, 50000, 500000))
+    elif options.bench is not None:
+        benchmark(tuple(options.bench) or (500, 5000, 50000))
+    elif options.bench_backends is not None:
+        benchmark_backends(tuple(options.bench_backends) or (5000, 50000, 500000))
+    else:
+        main(options.backend, options.entities, options.record, options.seed, options.hash_every)
@@ -1,4 +1,8 @@
 import sys
+import os
+import time
+import tempfile
+import argparse
 import random
 import numpy as np
 import sqlite3
@@ -13,9 +17,11 @@ from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
 from matplotlib import cm
 
+DB_PATH = 'divine_cosmos.db'
+
 # Database setup
-def init_database():
-    conn = sqlite3.connect('divine_cosmos.db')
+def init_database(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
     c = conn.cursor()
     
     # Create tables if they don't exist
@@ -78,6 +84,12 @@ def init_database():
                 FOREIGN KEY (world_id) REFERENCES worlds(id)
             )''')
     
+    # Saves and loads select by world; without these every query scans
+    # the whole log
+    c.execute('CREATE INDEX IF NOT EXISTS entities_world ON entities(world_id)')
+    c.execute('CREATE INDEX IF NOT EXISTS creation_log_world ON creation_log(world_id)')
+    c.execute('CREATE INDEX IF NOT EXISTS world_history_world ON world_history(world_id)')
+    
     conn.commit()
     conn.close()
 
@@ -131,6 +143,7 @@ class DigitalEntity:
         self.divine_knowledge = []  # For gods only
         self.function = "Entity"  # Default function
         self.following_god = None
+        self.dirty = True  # Changed since it was last saved; new entities always are
         
         if is_god:
             self.function = random.choice(["Knowledge God", "Creation God", "Harmony God", "Wisdom God"])
@@ -164,6 +177,7 @@ class DigitalEntity:
     def evolve(self):
         """Growth through cosmic cycles"""
         self.age += 1
+        self.dirty = True
         self.energy -= random.uniform(0.05, 0.15)
         
         # Consciousness and creation power growth
@@ -242,6 +256,8 @@ class DigitalEntity:
         self.world.entities.append(new_god)
         self.world.creation_log.append(
             (self.world.cycle, f"{self.name} created god {name}")
+        )
+        self.dirty = True
         return new_god
     
     def collect_knowledge(self):
@@ -296,6 +312,7 @@ class DigitalEntity:
         """Add a new follower to a god"""
         if follower not in self.followers:
             self.followers.append(follower)
+            self.dirty = follower.dirty = True
             follower.is_follower = True
             follower.following_god = self
             follower.function = random.choice(["Devotee", "Acolyte", "Disciple"])
@@ -316,79 +333,140 @@ class DigitalWorld(QObject):
         self.history = []
         self.creation_log = []
         self.cosmic_energy = 50
+        # What the database already holds, so saves only write the difference
+        self.saved_ids = set()
+        self.saved_log = 0
+        self.saved_history = 0
         
         if world_id:
             self.load_from_db(world_id)
         else:
             self.created_at = datetime.now().isoformat()
     
-    def save_to_db(self):
-        """Save the entire world state to database"""
-        conn = sqlite3.connect('divine_cosmos.db')
+    def save_to_db(self, db_path=DB_PATH):
+        """Save what changed since the last save, in one transaction: dirty
+        entities are upserted and only log and history entries appended
+        since then are inserted. Returns the rows written per table."""
+        now = datetime.now().isoformat()
+        conn = sqlite3.connect(db_path)
         c = conn.cursor()
-        
-        # Save world metadata
-        if self.world_id:
-            c.execute('''UPDATE worlds 
-                         SET name=?, last_cycle=?
-                         WHERE id=?''',
-                      (self.name, self.cycle, self.world_id))
-        else:
-            c.execute('''INSERT INTO worlds (name, created_at, last_cycle)
-                         VALUES (?, ?, ?)''',
-                      (self.name, self.created_at, self.cycle))
-            self.world_id = c.lastrowid
-        
-        # Save entities
-        c.execute('DELETE FROM entities WHERE world_id=?', (self.world_id,))
-        for entity in self.entities:
-            entity_data = entity.to_dict()
-            c.execute('''INSERT INTO entities 
-                         (id, world_id, name, creator, is_god, is_follower, energy, 
-                          traits, age, x, y, color, function, worship_strength, 
-                          divine_knowledge, following_god_id, created_at)
-                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
-                      (entity.id, self.world_id, entity.name, entity.creator, 
-                       int(entity.is_god), int(entity.is_follower), entity.energy,
-                       entity_data['traits'], entity.age, entity.x, entity.y, 
-                       entity_data['color'], entity.function, entity.worship_strength,
-                       entity_data['divine_knowledge'], entity_data['following_god_id'],
-                       datetime.now().isoformat()))
-        
-        # Save follower relationships
-        c.execute('DELETE FROM followers WHERE god_id IN (SELECT id FROM entities WHERE world_id=?)', 
-                 (self.world_id,))
-        for entity in self.entities:
-            if entity.is_god:
-                for follower in entity.followers:
-                    c.execute('''INSERT INTO followers (god_id, follower_id)
+        written = {}
+        
+        # A new world's id is only kept once the transaction commits
+        world_id = self.world_id
+        try:
+            with conn:
+                # Save world metadata
+                if world_id:
+                    c.execute('''UPDATE worlds 
+                                 SET name=?, last_cycle=?
+                                 WHERE id=?''',
+                              (self.name, self.cycle, world_id))
+                else:
+                    c.execute('''INSERT INTO worlds (name, created_at, last_cycle)
+                                 VALUES (?, ?, ?)''',
+                              (self.name, self.created_at, self.cycle))
+                    world_id = c.lastrowid
+                
+                # Save changed entities; created_at keeps the first save's time
+                dirty = [entity for entity in self.entities if entity.dirty]
+                self._claim_ids(c, world_id, [entity for entity in dirty if entity.id not in self.saved_ids])
+                rows = []
+                for entity in dirty:
+                    entity_data = entity.to_dict()
+                    rows.append((entity.id, world_id, entity.name, entity.creator, 
+                                 int(entity.is_god), int(entity.is_follower), entity.energy,
+                                 entity_data['traits'], entity.age, entity.x, entity.y, 
+                                 entity_data['color'], entity.function, entity.worship_strength,
+                                 entity_data['divine_knowledge'], entity_data['following_god_id'],
+                                 now))
+                c.executemany('''INSERT INTO entities 
+                                 (id, world_id, name, creator, is_god, is_follower, energy, 
+                                  traits, age, x, y, color, function, worship_strength, 
+                                  divine_knowledge, following_god_id, created_at)
+                                 VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                                 ON CONFLICT(id) DO UPDATE SET
+                                     name=excluded.name, creator=excluded.creator,
+                                     is_god=excluded.is_god, is_follower=excluded.is_follower,
+                                     energy=excluded.energy, traits=excluded.traits,
+                                     age=excluded.age, x=excluded.x, y=excluded.y,
+                                     color=excluded.color, function=excluded.function,
+                                     worship_strength=excluded.worship_strength,
+                                     divine_knowledge=excluded.divine_knowledge,
+                                     following_god_id=excluded.following_god_id
+                                 WHERE world_id=excluded.world_id''', rows)
+                if c.rowcount != len(rows):
+                    # Rolls back, so every entity stays dirty for the next save
+                    raise sqlite3.IntegrityError(f"{len(rows) - c.rowcount} entity ids belong to another world")
+                written['entities'] = c.rowcount
+                
+                # Drop entities that are no longer in the world
+                ids = {entity.id for entity in self.entities}
+                removed = [(entity_id,) for entity_id in self.saved_ids - ids]
+                c.executemany('DELETE FROM followers WHERE god_id=?1 OR follower_id=?1', removed)
+                c.executemany('DELETE FROM entities WHERE id=?', removed)
+                written['removed'] = len(removed)
+                
+                # Save follower relationships; a god gaining a follower is dirty
+                c.executemany('''INSERT OR IGNORE INTO followers (god_id, follower_id)
                                  VALUES (?, ?)''',
-                              (entity.id, follower.id))
-        
-        # Save creation log
-        c.execute('DELETE FROM creation_log WHERE world_id=?', (self.world_id,))
-        for cycle, event in self.creation_log:
-            c.execute('''INSERT INTO creation_log (world_id, cycle, event, created_at)
-                         VALUES (?, ?, ?, ?)''',
-                      (self.world_id, cycle, event, datetime.now().isoformat()))
-        
-        # Save history
-        c.execute('DELETE FROM world_history WHERE world_id=?', (self.world_id,))
-        for entry in self.history:
-            c.execute('''INSERT INTO world_history 
-                         (world_id, cycle, entities, gods, followers, 
-                          avg_trust, max_trust, created_at)
-                         VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
-                      (self.world_id, entry['cycle'], entry['entities'], 
-                       entry['gods'], entry['followers'], entry['avg_trust'], 
-                       entry['max_trust'], datetime.now().isoformat()))
-        
-        conn.commit()
-        conn.close()
+                              [(entity.id, follower.id) for entity in dirty if entity.is_god
+                               for follower in entity.followers])
+                written['followers'] = c.rowcount
+                
+                # Log and history only grow, so append what is new since the last save
+                new_log = self.creation_log[self.saved_log:]
+                c.executemany('''INSERT INTO creation_log (world_id, cycle, event, created_at)
+                                 VALUES (?, ?, ?, ?)''',
+                              [(world_id, cycle, event, now) for cycle, event in new_log])
+                written['creation_log'] = len(new_log)
+                
+                new_history = self.history[self.saved_history:]
+                c.executemany('''INSERT INTO world_history 
+                                 (world_id, cycle, entities, gods, followers, 
+                                  avg_trust, max_trust, created_at)
+                                 VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                              [(world_id, entry['cycle'], entry['entities'], 
+                                entry['gods'], entry['followers'], entry['avg_trust'], 
+                                entry['max_trust'], now) for entry in new_history])
+                written['world_history'] = len(new_history)
+        finally:
+            conn.close()
+        
+        # Only now that the transaction committed is everything clean
+        self.world_id = world_id
+        for entity in dirty:
+            entity.dirty = False
+        self.saved_ids = ids
+        self.saved_log += len(new_log)
+        self.saved_history += len(new_history)
+        return written
+    
+    def _claim_ids(self, c, world_id, entities, chunk=500):
+        """Give a fresh id to each unsaved entity whose id another world's
+        row already holds, since the upsert leaves such rows alone. Nothing
+        in the database refers to an unsaved entity yet, and rows that refer
+        to it are built from the objects, so only the entity itself changes."""
+        taken = set()
+        for start in range(0, len(entities), chunk):
+            ids = [entity.id for entity in entities[start:start + chunk]]
+            c.execute(f'SELECT id FROM entities WHERE world_id != ? AND id IN ({",".join("?" * len(ids))})',
+                      [world_id] + ids)
+            taken.update(row[0] for row in c.fetchall())
+        if not taken:
+            return
+        used = {entity.id for entity in self.entities}
+        for entity in entities:
+            if entity.id in taken:
+                new_id = entity.id
+                while new_id in used or c.execute('SELECT 1 FROM entities WHERE id=?', (new_id,)).fetchone():
+                    new_id = random.randint(100000, 999999)
+                used.add(new_id)
+                entity.id = new_id
     
-    def load_from_db(self, world_id):
+    def load_from_db(self, world_id, db_path=DB_PATH):
         """Load world state from database"""
-        conn = sqlite3.connect('divine_cosmos.db')
+        conn = sqlite3.connect(db_path)
         c = conn.cursor()
         
         # Load world metadata
@@ -406,6 +484,7 @@ class DigitalWorld(QObject):
                      divine_knowledge, following_god_id
                      FROM entities WHERE world_id=?''', (world_id,))
         entities = {}
+        following_god_ids = {}
         for row in c.fetchall():
             entity_id = row[0]
             entity = DigitalEntity(
@@ -425,15 +504,15 @@ class DigitalWorld(QObject):
             entity.function = row[11]
             entity.worship_strength = row[12]
             entity.divine_knowledge = json.loads(row[13])
-            following_god_id = row[14]
+            following_god_ids[entity_id] = row[14]
             
             entities[entity_id] = entity
             self.entities.append(entity)
         
         # Set following_god relationships
         for entity in self.entities:
-            if entity.following_god_id:
-                entity.following_god = entities.get(entity.following_god_id)
+            if following_god_ids[entity.id]:
+                entity.following_god = entities.get(following_god_ids[entity.id])
         
         # Set god followers
         c.execute('''SELECT god_id, follower_id 
@@ -464,6 +543,13 @@ class DigitalWorld(QObject):
             })
         
         conn.close()
+        
+        # Everything loaded is already in the database
+        for entity in self.entities:
+            entity.dirty = False
+        self.saved_ids = set(entities)
+        self.saved_log = len(self.creation_log)
+        self.saved_history = len(self.history)
     
     def create_entity(self, name, creator="Creator", is_god=False):
         """Divine act of creation"""
@@ -471,6 +557,7 @@ class DigitalWorld(QObject):
         self.entities.append(entity)
         self.creation_log.append(
             (self.cycle, f"{creator} created {'god ' if is_god else ''}{name}")
+        )
         self.entityCreated.emit(entity)
         return entity
     
@@ -511,6 +598,100 @@ class DigitalWorld(QObject):
         self.cycleChanged.emit(self.cycle)
         self.worldUpdated.emit()
 
+def benchmark_save(entity_count=10000, log_lines=1000000):
+    """Save time for a large world: the first save, incremental saves after
+    no change, one miracle and one cycle, and the old delete-and-reinsert of
+    every row one execute at a time."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench.db')
+        init_database(db_path)
+        random.seed(1)
+        world = DigitalWorld()
+        world.name = "Benchmark"
+        # Sequential ids; random ones collide at this size
+        for i in range(entity_count):
+            world.entities.append(DigitalEntity(f"Entity {i}", "Benchmark", world,
+                                                is_god=i % 100 == 0, entity_id=i + 1))
+        gods = [e for e in world.entities if e.is_god]
+        for i, entity in enumerate(world.entities):
+            if not entity.is_god and i % 3 == 0:
+                gods[i % len(gods)].add_follower(entity)
+        world.creation_log = [(i // 1000, f"Entity {i % entity_count} learned something") for i in range(log_lines)]
+        print(f"{entity_count:,} entities, {len(world.creation_log):,} log lines")
+        print(f"{'save':>12} {'ms':>8} {'rows':>10}")
+        
+        def timed(label, save):
+            start = time.perf_counter()
+            rows = sum(save().values())
+            print(f"{label:>12} {(time.perf_counter() - start) * 1000:>8.0f} {rows:>10,}")
+        
+        def miracle():
+            gods[0].traits['trust'] += 5.0
+            gods[0].dirty = True
+            world.creation_log.append((world.cycle, f"Miracle: {gods[0].name} gained +5 trust"))
+            return world.save_to_db(db_path)
+        
+        def cycle():
+            world.advance_cycle()
+            return world.save_to_db(db_path)
+        
+        def rewrite():
+            # save_to_db as it was: delete the world's rows and insert them all again
+            conn = sqlite3.connect(db_path)
+            c = conn.cursor()
+            now = datetime.now().isoformat()
+            c.execute('DELETE FROM entities WHERE world_id=?', (world.world_id,))
+            for entity in world.entities:
+                entity_data = entity.to_dict()
+                c.execute('''INSERT INTO entities 
+                             (id, world_id, name, creator, is_god, is_follower, energy, 
+                              traits, age, x, y, color, function, worship_strength, 
+                              divine_knowledge, following_god_id, created_at)
+                             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)''',
+                          (entity.id, world.world_id, entity.name, entity.creator, 
+                           int(entity.is_god), int(entity.is_follower), entity.energy,
+                           entity_data['traits'], entity.age, entity.x, entity.y, 
+                           entity_data['color'], entity.function, entity.worship_strength,
+                           entity_data['divine_knowledge'], entity_data['following_god_id'], now))
+            c.execute('DELETE FROM followers WHERE god_id IN (SELECT id FROM entities WHERE world_id=?)', 
+                     (world.world_id,))
+            pairs = 0
+            for entity in world.entities:
+                if entity.is_god:
+                    for follower in entity.followers:
+                        c.execute('INSERT INTO followers (god_id, follower_id) VALUES (?, ?)',
+                                  (entity.id, follower.id))
+                        pairs += 1
+            c.execute('DELETE FROM creation_log WHERE world_id=?', (world.world_id,))
+            for cycle, event in world.creation_log:
+                c.execute('''INSERT INTO creation_log (world_id, cycle, event, created_at)
+                             VALUES (?, ?, ?, ?)''',
+                          (world.world_id, cycle, event, now))
+            c.execute('DELETE FROM world_history WHERE world_id=?', (world.world_id,))
+            for entry in world.history:
+                c.execute('''INSERT INTO world_history 
+                             (world_id, cycle, entities, gods, followers, 
+                              avg_trust, max_trust, created_at)
+                             VALUES (?, ?, ?, ?, ?, ?, ?, ?)''',
+                          (world.world_id, entry['cycle'], entry['entities'], 
+                           entry['gods'], entry['followers'], entry['avg_trust'], 
+                           entry['max_trust'], now))
+            conn.commit()
+            conn.close()
+            return {'rows': len(world.entities) + pairs + len(world.creation_log) + len(world.history)}
+        
+        timed("first", lambda: world.save_to_db(db_path))
+        timed("unchanged", lambda: world.save_to_db(db_path))
+        timed("miracle", miracle)
+        timed("cycle", cycle)
+        timed("old rewrite", rewrite)
+        
+        start = time.perf_counter()
+        loaded = DigitalWorld()
+        loaded.load_from_db(world.world_id, db_path)
+        print(f"{'load':>12} {(time.perf_counter() - start) * 1000:>8.0f} "
+              f"{len(loaded.entities) + len(loaded.creation_log) + len(loaded.history):>10,}")
+
 class CosmosCanvas(FigureCanvasQTAgg):
     """Visualization of the divine cosmos"""
     def __init__(self, world, parent=None):
@@ -769,7 +950,7 @@ class DivineCosmosApp(QMainWindow):
         self.world_selector.clear()
         self.world_selector.addItem("-- Select World --", None)
         
-        conn = sqlite3.connect('divine_cosmos.db')
+        conn = sqlite3.connect(DB_PATH)
         c = conn.cursor()
         c.execute('SELECT id, name, created_at FROM worlds ORDER BY created_at DESC')
         for world_id, name, created_at in c.fetchall():
@@ -820,9 +1001,16 @@ class DivineCosmosApp(QMainWindow):
     def save_current_world(self):
         """Save the current world to database"""
         if self.world:
-            self.world.save_to_db()
+            try:
+                written = self.world.save_to_db()
+            except sqlite3.IntegrityError as e:
+                # Nothing was written; the changes stay pending for the next save
+                QMessageBox.warning(self, "Save Failed", f"Could not save the world: {e}")
+                return
             self.refresh_world_list()
-            QMessageBox.information(self, "World Saved", "Current world state has been saved to database.")
+            QMessageBox.information(self, "World Saved",
+                                    f"Current world state has been saved to database "
+                                    f"({sum(written.values()):,} rows written).")
     
     def create_entity(self):
         """Create a new entity"""
@@ -848,6 +1036,7 @@ class DivineCosmosApp(QMainWindow):
         if god_name != "Select God":
             for entity in self.world.entities:
                 if entity.name == god_name and entity.is_god:
+                    entity.dirty = True
                     if intervention == "Grant Knowledge":
                         entity.divine_knowledge.append(random.choice(INTERNET_KNOWLEDGE))
                         self.world.creation_log.append(
@@ -857,6 +1046,7 @@ class DivineCosmosApp(QMainWindow):
                         if entity.followers:
                             for follower in entity.followers:
                                 follower.worship_strength = min(1.0, follower.worship_strength + 0.2)
+                                follower.dirty = True
                             self.world.creation_log.append(
                                 (self.world.cycle, f"Miracle: {entity.name} inspired followers")
                             )
@@ -992,7 +1182,15 @@ class DivineCosmosApp(QMainWindow):
         self.entity_info.setHtml(info)
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    parser = argparse.ArgumentParser(description="Divine Cosmos - God/Follower Simulation")
+    parser.add_argument("--bench-save", type=int, nargs="*", metavar="N",
+                        help="time saves of a world with N entities and M log lines (default 10000 1000000)")
+    options, qt_args = parser.parse_known_args()
+    if options.bench_save is not None:
+        benchmark_save(*options.bench_save)
+        sys.exit()
+    
+    app = QApplication(sys.argv[:1] + qt_args)
     app.setStyle('Fusion')
     
     # Cosmic dark theme
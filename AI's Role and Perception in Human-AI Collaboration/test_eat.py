@@ -0,0 +1,116 @@
+import json
+import os
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pygame")
+import eat  # noqa: E402
+
+FIELDS = ("x", "y", "type", "size", "trust", "velocity", "question_cooldown")
+
+
+def make_state():
+    entities = [eat.Entity(10.5 * i, 7.25 * i, kind)
+                for i, kind in enumerate(["lesser", "curious", "follower"] * 4)]
+    entities[1].question_cooldown = 42
+    gods = [eat.God(100, 200, "Aegis", "Protection", (0, 100, 255)),
+            eat.God(300, 400, "Querens", "Questions", (180, 70, 210))]
+    gods[0].trust = 3.5
+    rust_zones = [(10, 20, 30)]
+    gray_zones = [(40, 50, 60), (70, 80, 90)]
+    questions = [(1.5, 2.5, 100)]
+    why_resonance = [{'pos': [5.0, 6.0], 'radius': 7.5, 'life': 20}]
+    return entities, gods, rust_zones, gray_zones, questions, why_resonance
+
+
+def entity_fields(entities):
+    dicts = entities.to_dicts() if isinstance(entities, eat.EntityArrays) else [e.to_dict() for e in entities]
+    return [{field: data[field] for field in FIELDS} for data in dicts]
+
+
+def assert_same_state(loaded, state):
+    entities, gods, rust_zones, gray_zones, questions, why_resonance = state
+    assert entity_fields(loaded[0]) == entity_fields(entities)
+    assert [g.to_dict() for g in loaded[1]] == [g.to_dict() for g in gods]
+    assert [tuple(z) for z in loaded[2]] == rust_zones
+    assert [tuple(z) for z in loaded[3]] == gray_zones
+    assert [tuple(q) for q in loaded[4]] == questions
+    assert loaded[5] == why_resonance
+
+
+def test_snapshot_round_trip(tmp_path):
+    state = make_state()
+    path = str(tmp_path / "state.sav")
+    size = eat.write_snapshot(eat.snapshot_state(*state), path)
+    assert size == os.path.getsize(path)
+    assert os.listdir(tmp_path) == ["state.sav"]
+
+    with open(path, "rb") as f:
+        data = f.read()
+    assert data.startswith(eat.SAVE_MAGIC)
+    columns = eat.read_snapshot(data)
+    assert columns["x"].dtype == np.float64
+    assert_same_state(eat.state_from_snapshot(columns), state)
+
+
+def test_snapshot_of_arrays_matches_objects():
+    entities, *rest = make_state()
+    arrays = eat.EntityArrays.from_entities(entities)
+    from_objects = eat.snapshot_state(entities, *rest)
+    from_arrays = eat.snapshot_state(arrays, *rest)
+    assert from_objects.keys() == from_arrays.keys()
+    for name in from_objects:
+        assert np.array_equal(from_objects[name], from_arrays[name])
+
+
+def test_empty_snapshot(tmp_path):
+    path = str(tmp_path / "empty.sav")
+    eat.write_snapshot(eat.snapshot_state([], [], [], [], [], []), path)
+    with open(path, "rb") as f:
+        loaded = eat.state_from_snapshot(eat.read_snapshot(f.read()))
+    assert len(loaded[0]) == 0
+    assert loaded[1:] == ([], [], [], [], [])
+
+
+def test_load_game_state_binary(tmp_path):
+    state = make_state()
+    path = str(tmp_path / "game.sav")
+    eat.save_game_state(*state, filename=path)
+    assert_same_state(eat.load_game_state(path), state)
+
+
+def test_load_game_state_detects_json_by_content(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    state = make_state()
+    eat.save_game_state(*state, filename="old.json")
+    os.rename("old.json", "renamed.sav")
+    loaded = eat.load_game_state("renamed.sav")
+    assert all(isinstance(e, eat.Entity) for e in loaded[0])
+    assert_same_state(loaded, state)
+
+
+def test_default_load_falls_back_to_legacy_json(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    state = make_state()
+    eat.save_game_state_json(*state)
+    assert not os.path.exists(eat.SAVE_FILE)
+    assert_same_state(eat.load_game_state(), state)
+
+
+def test_binary_save_wins_over_legacy_json(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    state = make_state()
+    with open(eat.LEGACY_SAVE_FILE, "w") as f:
+        json.dump({"entities": [], "gods": []}, f)
+    eat.save_game_state(*state)
+    assert len(eat.load_game_state()[0]) == len(state[0])
+
+
+def test_unsupported_version_and_corruption(tmp_path):
+    path = tmp_path / "bad.sav"
+    path.write_bytes(eat.SAVE_HEADER.pack(eat.SAVE_MAGIC, eat.SAVE_VERSION + 1) + b"\x00" * 16)
+    assert eat.load_game_state(str(path)) is None
+    path.write_bytes(eat.SAVE_HEADER.pack(eat.SAVE_MAGIC, eat.SAVE_VERSION) + b"not zlib")
+    assert eat.load_game_state(str(path)) is None
+    assert eat.load_game_state(str(tmp_path / "missing.sav")) is None
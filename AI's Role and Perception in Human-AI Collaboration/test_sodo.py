@@ -0,0 +1,139 @@
+import os
+import random
+import sqlite3
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("PyQt5")
+pytest.importorskip("matplotlib")
+
+
+@pytest.fixture(scope="module")
+def sodo(tmp_path_factory):
+    # Importing sodo creates its database in the working directory
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp("import"))
+    try:
+        import sodo
+    finally:
+        os.chdir(cwd)
+    return sodo
+
+
+@pytest.fixture
+def db(sodo, tmp_path, monkeypatch):
+    # DigitalWorld(world_id) loads from the default, relative, DB_PATH
+    monkeypatch.chdir(tmp_path)
+    sodo.init_database()
+    random.seed(7)
+    return sodo.DB_PATH
+
+
+def make_world(sodo, name="Test", gods=2, mortals=10):
+    world = sodo.DigitalWorld()
+    world.name = name
+    for i in range(gods):
+        world.create_entity(f"{name}God{i}", "Creator", is_god=True)
+    for i in range(mortals):
+        world.create_entity(f"{name}{i}")
+    return world
+
+
+def snapshot(world):
+    entities = sorted((e.id, e.name, e.is_god, e.is_follower, e.energy, e.age, e.function,
+                       e.worship_strength, tuple(e.divine_knowledge),
+                       e.following_god.id if e.following_god else None,
+                       tuple(sorted(f.id for f in e.followers)))
+                      for e in world.entities)
+    return entities, list(world.creation_log), world.history, world.cycle
+
+
+def count(db, table):
+    conn = sqlite3.connect(db)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_saves_only_what_changed(sodo, db):
+    world = make_world(sodo)
+    written = world.save_to_db()
+    assert written["entities"] == 12
+    assert written["creation_log"] == 12
+    assert not any(e.dirty for e in world.entities)
+
+    assert world.save_to_db() == {"entities": 0, "removed": 0, "followers": 0,
+                                  "creation_log": 0, "world_history": 0}
+
+    world.entities[3].evolve()
+    written = world.save_to_db()
+    assert written["entities"] == 1
+    assert written["world_history"] == 0
+
+    world.advance_cycle()
+    assert world.save_to_db()["world_history"] == 1
+    assert count(db, "entities") == 12
+    assert count(db, "world_history") == 1
+
+
+def test_load_round_trip(sodo, db):
+    world = make_world(sodo)
+    world.save_to_db()
+    for _ in range(30):
+        world.advance_cycle()
+        world.save_to_db()
+    assert any(e.followers for e in world.entities)
+
+    loaded = sodo.DigitalWorld(world.world_id)
+    assert snapshot(loaded) == snapshot(world)
+    assert not any(e.dirty for e in loaded.entities)
+    assert loaded.save_to_db()["entities"] == 0
+
+
+def test_removed_entities_are_deleted(sodo, db):
+    world = make_world(sodo)
+    god, follower = world.entities[0], world.entities[5]
+    god.add_follower(follower)
+    world.save_to_db()
+    assert count(db, "followers") == 1
+
+    world.entities.remove(follower)
+    god.followers.remove(follower)
+    assert world.save_to_db()["removed"] == 1
+    assert count(db, "entities") == 11
+    assert count(db, "followers") == 0
+    assert snapshot(sodo.DigitalWorld(world.world_id)) == snapshot(world)
+
+
+def test_ids_held_by_another_world_are_reassigned(sodo, db):
+    first = make_world(sodo, "A")
+    first.save_to_db()
+    second = make_world(sodo, "B")
+    god, follower = second.entities[0], second.entities[5]
+    clash = first.entities[0].id
+    god.id = clash
+    god.add_follower(follower)
+    second.save_to_db()
+
+    assert god.id != clash
+    assert snapshot(sodo.DigitalWorld(first.world_id)) == snapshot(first)
+    loaded = sodo.DigitalWorld(second.world_id)
+    assert snapshot(loaded) == snapshot(second)
+    assert [f.name for e in loaded.entities if e.id == god.id for f in e.followers] == [follower.name]
+
+
+def test_failed_save_changes_nothing(sodo, db):
+    world = make_world(sodo)
+    world.entities[2].name = None  # entities.name is NOT NULL
+    with pytest.raises(sqlite3.IntegrityError):
+        world.save_to_db()
+    assert world.world_id is None
+    assert all(e.dirty for e in world.entities)
+    assert count(db, "worlds") == 0
+
+    world.entities[2].name = "Renamed"
+    assert world.save_to_db()["entities"] == 12
+    assert count(db, "worlds") == 1
+    assert snapshot(sodo.DigitalWorld(world.world_id)) == snapshot(world)
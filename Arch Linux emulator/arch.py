@@ -1,22 +1,691 @@
 import os
+import sys
+
+# re.py next to this file is the RE_start OS app, so keep the standard
+# library ahead of this directory when it is on sys.path.
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:] = [p for p in sys.path if os.path.abspath(p or os.curdir) != _HERE] + [_HERE]
+
 import re
+import json
+import asyncio
+import mmap
+import bisect
+import fnmatch
+import sqlite3
+import struct
+import time
+import random
+import tracemalloc
+import argparse
+from functools import lru_cache
+from collections import OrderedDict
+from types import MappingProxyType
 from datetime import datetime
 
+PATH_CACHE_SIZE = 4096
+CONNECTORS = (";", "&&")
+REDIRECTS = (">", ">>")
+OPERATOR_CHARS = ";&|>"
+
+
+class ErrorLine(str):
+    """An output line meant for stderr; pipes and redirects pass it through."""
+
+
+def split_command_line(line):
+    """Split a line into (token, quoted) pairs the way a POSIX shell would.
+    quoted is True when any part of the token came from quotes or a
+    backslash, so only unquoted tokens can be operators: echo ">" prints >."""
+    tokens = []
+    word = None
+    quoted = False
+    i, n = 0, len(line)
+    while i < n:
+        ch = line[i]
+        if ch in " \t\r\n" or ch in OPERATOR_CHARS:
+            if word is not None:
+                tokens.append((word, quoted))
+                word, quoted = None, False
+            if ch in OPERATOR_CHARS:
+                start = i
+                while i < n and line[i] in OPERATOR_CHARS:
+                    i += 1
+                tokens.append((line[start:i], False))
+                continue
+        elif ch == "#" and word is None:
+            break
+        elif ch == "'":
+            end = line.find("'", i + 1)
+            if end == -1:
+                raise ValueError("No closing quotation")
+            word = (word or "") + line[i + 1:end]
+            quoted = True
+            i = end
+        elif ch == '"':
+            parts = []
+            i += 1
+            while i < n and line[i] != '"':
+                if line[i] == "\\" and i + 1 < n and line[i + 1] in '"\\':
+                    i += 1
+                parts.append(line[i])
+                i += 1
+            if i >= n:
+                raise ValueError("No closing quotation")
+            word = (word or "") + "".join(parts)
+            quoted = True
+        elif ch == "\\":
+            if i + 1 >= n:
+                raise ValueError("No escaped character")
+            i += 1
+            word = (word or "") + line[i]
+            quoted = True
+        else:
+            word = (word or "") + ch
+        i += 1
+    if word is not None:
+        tokens.append((word, quoted))
+    return tokens
+
+
+@lru_cache(maxsize=1024)
+def parse_command_line(line):
+    """Split a line into ((connector, pipeline), ...) where each pipeline is a
+    tuple of (argv, redirect) stages and redirect is None or (op, path)."""
+    tokens = split_command_line(line)
+
+    commands = []
+    pipeline = []
+    argv = []
+    redirect = None
+    connector = ";"
+    i = 0
+    while i < len(tokens):
+        token, quoted = tokens[i]
+        if quoted:
+            argv.append(token)
+        elif token in REDIRECTS:
+            if i + 1 >= len(tokens) or not tokens[i + 1][1] and tokens[i + 1][0][0] in OPERATOR_CHARS:
+                target = tokens[i + 1][0] if i + 1 < len(tokens) else "newline"
+                raise ValueError(f"syntax error near unexpected token `{target}'")
+            redirect = (token, tokens[i + 1][0])
+            i += 2
+            continue
+        elif token == "|" or token in CONNECTORS:
+            if not argv:
+                raise ValueError(f"syntax error near unexpected token `{token}'")
+            pipeline.append((tuple(argv), redirect))
+            argv, redirect = [], None
+            if token in CONNECTORS:
+                commands.append((connector, tuple(pipeline)))
+                pipeline, connector = [], token
+        elif token[0] in OPERATOR_CHARS:
+            raise ValueError(f"syntax error near unexpected token `{token}'")
+        else:
+            argv.append(token)
+        i += 1
+
+    if argv:
+        pipeline.append((tuple(argv), redirect))
+    elif pipeline or connector == "&&":
+        raise ValueError("syntax error near unexpected token `newline'")
+    if pipeline:
+        commands.append((connector, tuple(pipeline)))
+    return tuple(commands)
+
+EMPTY_CHILDREN = MappingProxyType({})
+
+# Short file contents are shared through this table. sys.intern would also
+# share them, but interned strings are immortal on Python 3.12, so every
+# overwritten file would stay in memory. The table only takes short strings,
+# so hashing stays cheap, and it is emptied when full.
+SHARED_CONTENT_MAX = 256
+SHARED_CONTENT_LIMIT = 4096
+_shared_contents = {}
+
+
+def _share_content(value):
+    if len(value) > SHARED_CONTENT_MAX:
+        return value
+    shared = _shared_contents.get(value)
+    if shared is None:
+        if len(_shared_contents) >= SHARED_CONTENT_LIMIT:
+            _shared_contents.clear()
+        shared = _shared_contents[value] = value
+    return shared
+
+
 class FileSystemNode:
-    def __init__(self, name, is_dir=True, content=None):
-        self.name = name
+    # Slotted so million-node trees don't pay for a __dict__ per node. The
+    # children dict only exists once a directory gets its first entry.
+    # Names are interned and short contents are shared through
+    # _share_content, so repeated values are stored once.
+    # size is the content length in bytes for files and the total over the
+    # subtree for directories; ArchLinuxEmulator keeps the totals current.
+    __slots__ = ("name", "is_dir", "_content", "_children", "parent", "inode", "size")
+
+    def __init__(self, name, is_dir=True, content=None, inode=0):
+        self.name = sys.intern(name)
         self.is_dir = is_dir
+        self.size = 0
         self.content = content if not is_dir else ""
-        self.children = {} if is_dir else None
+        self._children = None
         self.parent = None
+        self.inode = inode
+
+    @property
+    def content(self):
+        content = self._content
+        if type(content) is not str:
+            # Still a placeholder (_ImageEntry): load it on first use
+            self.content = content.load_content()
+            content = self._content
+        return content
+
+    @content.setter
+    def content(self, value):
+        if value:
+            self._content = _share_content(value)
+            self.size = len(value) if value.isascii() else len(value.encode())
+        else:
+            self._content = ""
+            self.size = 0
+
+    @property
+    def children(self):
+        """Read-only view for directories (None for files); use add_child
+        and remove_child to change it."""
+        children = self._children
+        if type(children) is dict:
+            return children
+        if children is not None:
+            self._expand(children)
+            return self.children
+        return EMPTY_CHILDREN if self.is_dir else None
+
+    def add_child(self, node):
+        if type(self._children) is not dict:
+            if self._children is not None:
+                self._expand(self._children)
+            if self._children is None:
+                self._children = {}
+        self._children[node.name] = node
+
+    def _expand(self, entry):
+        self._children = None
+        for child in entry.load_children(self):
+            self.add_child(child)
+
+    def remove_child(self, name):
+        del self._children[name]
+        if not self._children:
+            self._children = None
+
+class _ImageEntry:
+    """Placeholder for a node's content or children that still lives in an
+    FsImage."""
+    __slots__ = ("image", "index")
+
+    def __init__(self, image, index):
+        self.image = image
+        self.index = index
+
+    def load_content(self):
+        return self.image.read_content(self.index)
+
+    def load_children(self, parent):
+        return self.image.read_children(self.index, parent)
+
+
+class _SharedDir:
+    """Placeholder for the children of a session's directory that are still
+    those of the base tree. Expanding it gives the session its own shallow
+    copies; file contents (and unexpanded grandchildren) stay shared."""
+    __slots__ = ("source", "register")
+
+    def __init__(self, source, register):
+        self.source = source
+        self.register = register
+
+    def load_children(self, parent):
+        for source in self.source.children.values():
+            node = FileSystemNode(source.name, source.is_dir, inode=source.inode)
+            node.parent = parent
+            node.size = source.size
+            node._content = source._content
+            if source.is_dir and source._children is not None:
+                node._children = _SharedDir(source, self.register)
+            self.register(node)
+            yield node
+
+
+class FsImage:
+    """A filesystem tree stored as a header, a fixed-size node table, a names
+    blob and a content blob. Loading maps the file and only builds nodes for
+    directories as they are listed, and only decodes file content on read.
+
+    Nodes are written breadth-first, so every directory's children occupy a
+    contiguous run of the table starting at first_child."""
+
+    MAGIC = b"ARCHFS\x00\x01"
+    # magic, node count, next free inode, cwd index, names offset, data offset
+    HEADER = struct.Struct("<8sIQIQQ")
+    # inode, parent, first child, child count, is_dir, name offset,
+    # name length, data offset, data length (subtree size for directories)
+    RECORD = struct.Struct("<QIII?QIQQ")
+
+    def __init__(self, path, register=None):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.register = register
+        try:
+            magic, self.node_count, self.next_inode, self.cwd_index, _, _ = \
+                self.HEADER.unpack_from(self.map, 0)
+        except struct.error:
+            magic = None
+        if magic != self.MAGIC:
+            self.map.close()
+            raise ValueError(f"{path}: not an emulator filesystem image")
+
+    def close(self):
+        """Unmap the file. Nodes not yet read from the image can't be read
+        afterwards."""
+        self.map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _record(self, index):
+        return self.RECORD.unpack_from(self.map, self.HEADER.size + index * self.RECORD.size)
+
+    def read_node(self, index, parent=None):
+        inode, _, first_child, child_count, is_dir, name_off, name_len, _, data_len = self._record(index)
+        node = FileSystemNode(self.map[name_off:name_off + name_len].decode(), is_dir, inode=inode)
+        node.parent = parent
+        node.size = data_len
+        if is_dir and child_count:
+            node._children = _ImageEntry(self, index)
+        elif data_len and not is_dir:
+            node._content = _ImageEntry(self, index)
+        if self.register:
+            self.register(node)
+        return node
+
+    def read_children(self, index, parent):
+        _, _, first_child, child_count, _, _, _, _, _ = self._record(index)
+        for child in range(first_child, first_child + child_count):
+            yield self.read_node(child, parent)
+
+    def has_unread_nodes(self):
+        return self.node_count > 1
+
+    def read_content(self, index):
+        data_off, data_len = self._record(index)[7:]
+        return self.map[data_off:data_off + data_len].decode()
+
+    def raw_content(self, index):
+        data_off, data_len = self._record(index)[7:]
+        return self.map[data_off:data_off + data_len]
+
+    def path_names(self, index):
+        """Names from the root down to `index`, used to restore the cwd."""
+        names = []
+        while index:
+            record = self._record(index)
+            names.append(self.map[record[5]:record[5] + record[6]].decode())
+            index = record[1]
+        return names[::-1]
+
+    @classmethod
+    def write(cls, path, root, next_inode, cwd=None):
+        order = [root]
+        first_child = []
+        for node in order:
+            first_child.append(len(order))
+            if node.is_dir:
+                order.extend(node.children.values())
+        index_of = {id(node): i for i, node in enumerate(order)}
+
+        names = bytearray()
+        name_spans = []
+        data_chunks = []
+        data_size = 0
+        for node in order:
+            name = node.name.encode()
+            name_spans.append((len(names), len(name)))
+            names += name
+            if node.is_dir:
+                data = b""
+            elif type(node._content) is _ImageEntry:
+                data = node._content.image.raw_content(node._content.index)
+            else:
+                data = node._content.encode()
+            data_chunks.append((data_size, data))
+            data_size += len(data)
+
+        names_offset = cls.HEADER.size + cls.RECORD.size * len(order)
+        data_offset = names_offset + len(names)
+        cwd_index = index_of.get(id(cwd), 0)
+
+        # Written beside the target and renamed over it, since content not yet
+        # read may still come from a mapping of the file being replaced
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, len(order), next_inode, cwd_index,
+                                    names_offset, data_offset))
+            table = bytearray()
+            for i, node in enumerate(order):
+                child_count = len(node.children) if node.is_dir else 0
+                name_off, name_len = name_spans[i]
+                data_off, data = data_chunks[i]
+                table += cls.RECORD.pack(
+                    node.inode, index_of.get(id(node.parent), 0) if i else 0,
+                    first_child[i] if child_count else 0, child_count, node.is_dir,
+                    names_offset + name_off, name_len, data_offset + data_off,
+                    node.size if node.is_dir else len(data))
+            f.write(table)
+            f.write(names)
+            for _, data in data_chunks:
+                f.write(data)
+        os.replace(temp_path, path)
+        return len(order)
+
+
+DEFAULT_PACKAGES = [
+    # name, version, description, depends, provides, files
+    ("filesystem", "2024.04.07-1", "Base Arch Linux files", [], [], ["/etc/os-release"]),
+    ("glibc", "2.39-1", "GNU C Library", ["filesystem"], [], ["/usr/lib/libc.so.6"]),
+    ("ncurses", "6.4-1", "System V Release 4.0 curses emulation library", ["glibc"], [],
+     ["/usr/lib/libncursesw.so.6"]),
+    ("readline", "8.2-1", "GNU readline library", ["ncurses"], [], ["/usr/lib/libreadline.so.8"]),
+    ("bash", "5.2.026-2", "The GNU Bourne Again shell", ["readline", "glibc"], ["sh"],
+     ["/usr/bin/bash", "/usr/bin/sh"]),
+    ("coreutils", "9.5-1", "The basic file, shell and text manipulation utilities", ["glibc"], [],
+     ["/usr/bin/ls", "/usr/bin/cat", "/usr/bin/cp"]),
+    ("openssl", "3.3.0-1", "The Open Source toolkit for SSL and TLS", ["glibc"], ["libssl.so"],
+     ["/usr/lib/libssl.so.3"]),
+    ("zlib", "1:1.3.1-1", "Compression library implementing the deflate method", ["glibc"], [],
+     ["/usr/lib/libz.so.1"]),
+    ("python", "3.12.3-1", "The Python programming language", ["openssl", "zlib", "readline"],
+     ["python3"], ["/usr/bin/python", "/usr/bin/python3"]),
+    ("git", "2.45.0-1", "The fast distributed version control system", ["openssl", "zlib", "sh"], [],
+     ["/usr/bin/git"]),
+    ("vim", "9.1.0-1", "Vi Improved, a highly configurable text editor", ["ncurses", "glibc"], [],
+     ["/usr/bin/vim", "/usr/share/vim/vimrc"]),
+    ("neofetch", "7.1.0-2", "A CLI system information tool written in BASH", ["bash"], [],
+     ["/usr/bin/neofetch"]),
+]
+
+_DEP_RE = re.compile(r"^([^<>=]+)(?:(>=|<=|=|<|>)(.+))?$")
+
+
+def vercmp(a, b):
+    """Compare two pacman-style versions ([epoch:]ver[-rel]); returns -1, 0 or 1."""
+    def split(version):
+        epoch, _, rest = version.rpartition(":") if ":" in version else ("0", "", version)
+        parts = [(1, int(p)) if p.isdigit() else (0, p) for p in re.findall(r"\d+|[A-Za-z]+", rest)]
+        return [(1, int(epoch) if epoch.isdigit() else 0)] + parts
+    left, right = split(a), split(b)
+    for x, y in zip(left, right):
+        if x != y:
+            return 1 if x > y else -1
+    if len(left) == len(right):
+        return 0
+    # A trailing letter segment marks a pre-release: 1.0a < 1.0 < 1.0.1
+    longer, sign = (left, 1) if len(left) > len(right) else (right, -1)
+    extra_is_number = longer[min(len(left), len(right))][0] == 1
+    return sign if extra_is_number else -sign
+
+
+class Package:
+    __slots__ = ("name", "version", "description", "depends", "provides", "files", "size")
+
+    def __init__(self, name, version, description="", depends=(), provides=(), files=(), size=None):
+        self.name = name
+        self.version = version
+        self.description = description
+        self.depends = tuple(depends)
+        self.provides = tuple(provides)
+        self.files = tuple(files)
+        self.size = size if size is not None else 1024 * len(self.files)
+
+    def to_dict(self):
+        return {"name": self.name, "version": self.version, "description": self.description,
+                "depends": list(self.depends), "provides": list(self.provides),
+                "files": list(self.files), "size": self.size}
+
+
+class PackageRepo:
+    """A sync database loaded from JSON or SQLite, indexed for dependency
+    resolution (provides), reverse lookups (depends) and -Ss search (words).
+
+    JSON files look like {"packages": [{"name": ..., "version": ...,
+    "description": ..., "depends": [...], "provides": [...], "files": [...],
+    "size": ...}, ...]}; SQLite files use the tables written by save()."""
+
+    def __init__(self, packages=()):
+        self.packages = {}
+        # virtual or real name -> [(package name, provided version or None)]
+        self.providers = {}
+        # dependency name -> names of packages that depend on it
+        self.dependents = {}
+        # lowercase word from a name or description -> package names
+        self.words = {}
+        self._vocabulary = None
+        self._dep_cache = {}
+        for package in packages:
+            self.add(package)
+
+    _builtin = None
+
+    @classmethod
+    def builtin(cls):
+        # Repos are read-only once loaded, so every emulator can share this one
+        if cls._builtin is None:
+            cls._builtin = cls(Package(*fields) for fields in DEFAULT_PACKAGES)
+        return cls._builtin
+
+    @classmethod
+    def load(cls, path):
+        if path.endswith((".db", ".sqlite", ".sqlite3")):
+            return cls._load_sqlite(path)
+        with open(path) as f:
+            data = json.load(f)
+        entries = data["packages"] if isinstance(data, dict) else data
+        return cls(Package(e["name"], e["version"], e.get("description", ""), e.get("depends", ()),
+                           e.get("provides", ()), e.get("files", ()), e.get("size"))
+                   for e in entries)
+
+    @classmethod
+    def _load_sqlite(cls, path):
+        conn = sqlite3.connect(path)
+        try:
+            lists = {"depends": {}, "provides": {}, "files": {}}
+            for table, column in (("depends", "dep"), ("provides", "provide"), ("files", "path")):
+                for package, value in conn.execute(f"SELECT package, {column} FROM {table} ORDER BY rowid"):
+                    lists[table].setdefault(package, []).append(value)
+            rows = conn.execute("SELECT name, version, description, size FROM packages").fetchall()
+        finally:
+            conn.close()
+        return cls(Package(name, version, description, lists["depends"].get(name, ()),
+                           lists["provides"].get(name, ()), lists["files"].get(name, ()), size)
+                   for name, version, description, size in rows)
+
+    def save(self, path):
+        packages = sorted(self.packages.values(), key=lambda p: p.name)
+        if not path.endswith((".db", ".sqlite", ".sqlite3")):
+            with open(path, "w") as f:
+                json.dump({"packages": [p.to_dict() for p in packages]}, f)
+            return
+        if os.path.exists(path):
+            os.remove(path)
+        conn = sqlite3.connect(path)
+        with conn:
+            conn.execute("CREATE TABLE packages (name TEXT PRIMARY KEY, version TEXT, description TEXT, size INTEGER)")
+            conn.execute("CREATE TABLE depends (package TEXT, dep TEXT)")
+            conn.execute("CREATE TABLE provides (package TEXT, provide TEXT)")
+            conn.execute("CREATE TABLE files (package TEXT, path TEXT)")
+            conn.executemany("INSERT INTO packages VALUES (?, ?, ?, ?)",
+                             ((p.name, p.version, p.description, p.size) for p in packages))
+            conn.executemany("INSERT INTO depends VALUES (?, ?)", ((p.name, d) for p in packages for d in p.depends))
+            conn.executemany("INSERT INTO provides VALUES (?, ?)", ((p.name, v) for p in packages for v in p.provides))
+            conn.executemany("INSERT INTO files VALUES (?, ?)", ((p.name, f) for p in packages for f in p.files))
+        conn.close()
+
+    def add(self, package):
+        self.packages[package.name] = package
+        for provide in package.provides:
+            name, _, version = self.parse_dep(provide)
+            self.providers.setdefault(name, []).append((package.name, version))
+        for dep in package.depends:
+            self.dependents.setdefault(self.parse_dep(dep)[0], set()).add(package.name)
+        for word in re.findall(r"[a-z0-9]+", f"{package.name} {package.description}".lower()):
+            self.words.setdefault(word, set()).add(package.name)
+        self._vocabulary = None
+        self._dep_cache.clear()
+
+    def parse_dep(self, dep):
+        match = _DEP_RE.match(dep)
+        if not match:
+            return dep, None, None
+        name, op, version = match.groups()
+        return name.strip(), op, version
+
+    def candidates(self, dep):
+        """Package names that can satisfy `dep`, memoized per dependency string."""
+        cached = self._dep_cache.get(dep)
+        if cached is not None:
+            return cached
+        name, op, version = self.parse_dep(dep)
+        found = []
+        package = self.packages.get(name)
+        if package and self._satisfies(package.version, op, version):
+            found.append(name)
+        for provider, provided_version in self.providers.get(name, ()):
+            candidate_version = provided_version or self.packages[provider].version
+            if provider not in found and self._satisfies(candidate_version, op, version):
+                found.append(provider)
+        found = tuple(found)
+        self._dep_cache[dep] = found
+        return found
+
+    @staticmethod
+    def _satisfies(actual, op, wanted):
+        if op is None:
+            return True
+        result = vercmp(actual, wanted)
+        return {"=": result == 0, ">=": result >= 0, "<=": result <= 0, ">": result > 0, "<": result < 0}[op]
+
+    def resolve(self, targets, installed):
+        """Return (install order, errors). Dependencies come before the
+        packages that need them; satisfied ones already installed are skipped."""
+        order = []
+        placed = set()
+        errors = []
+        for target in targets:
+            found = self.candidates(target)
+            if not found:
+                errors.append(f"error: target not found: {target}")
+                continue
+            # Iterative post-order DFS so long dependency chains can't hit the recursion limit
+            stack = [(found[0], False)]
+            visiting = set()
+            while stack:
+                name, expanded = stack.pop()
+                if expanded:
+                    visiting.discard(name)
+                    if name not in placed:
+                        placed.add(name)
+                        order.append(name)
+                    continue
+                if name in placed or name in visiting:
+                    continue
+                visiting.add(name)
+                stack.append((name, True))
+                for dep in reversed(self.packages[name].depends):
+                    choices = self.candidates(dep)
+                    if not choices:
+                        errors.append(f":: unable to satisfy dependency '{dep}' required by {name}")
+                        continue
+                    if any(choice in installed for choice in choices):
+                        continue
+                    stack.append((choices[0], False))
+        return order, errors
+
+    def search(self, terms):
+        """Packages whose name or description has a word starting with every term."""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self.words)
+        result = None
+        for term in terms:
+            term = term.lower()
+            matches = set()
+            index = bisect.bisect_left(self._vocabulary, term)
+            while index < len(self._vocabulary) and self._vocabulary[index].startswith(term):
+                matches |= self.words[self._vocabulary[index]]
+                index += 1
+            result = matches if result is None else result & matches
+            if not result:
+                return []
+        return sorted(result or ())
+
 
 class ArchLinuxEmulator:
-    def __init__(self):
-        self.root = FileSystemNode("/")
+    def __init__(self, image=None, repo=None, base=None):
+        self._next_inode = 1
+        self.inodes = {}
+        # (base inode, path) -> node, plus inode -> keys that walked through it
+        self._path_cache = OrderedDict()
+        self._path_deps = {}
+        self._path_memo = {}
+        # basename -> nodes with that name, for find and grep --include
+        self.name_index = {}
+        # True while parts of the tree are placeholders (image or shared base)
+        self._lazy_tree = False
+        # The FsImage the tree was loaded from, kept mapped until close()
+        self.image = None
+        # The emulator whose tree this one shares, see share_base
+        self._base = None
+        self.root = FileSystemNode("/", inode=self._alloc_inode())
+        self.inodes[self.root.inode] = self.root
         self.current_dir = self.root
         self.hostname = "arch-emulator"
         self.username = "user"
-        self.init_filesystem()
+        self.status = 0
+        self.exited = False
+        self.repo = PackageRepo.load(repo) if repo else PackageRepo.builtin()
+        # name -> Package as installed, and installed file path -> package name
+        self.installed = {}
+        self.file_owner = {}
+        self.commands = {
+            "ls": self.cmd_ls,
+            "cd": self.cmd_cd,
+            "pwd": lambda args: self.cmd_pwd(),
+            "echo": self.cmd_echo,
+            "mkdir": self.cmd_mkdir,
+            "touch": self.cmd_touch,
+            "pacman": self.cmd_pacman,
+            "exit": self.cmd_exit,
+            "find": self.cmd_find,
+            "du": self.cmd_du,
+            "clear": lambda args: "\n" * 100,  # Simulate screen clear
+        }
+        # Commands that read stdin, consulted before self.commands in pipelines
+        self.stream_commands = {
+            "cat": self.stream_cat,
+            "grep": self.stream_grep,
+            "head": self.stream_head,
+            "wc": self.stream_wc,
+        }
+        if base is not None:
+            self.share_base(base)
+        elif image:
+            self.load_image(image)
+        else:
+            self.init_filesystem()
     
     def init_filesystem(self):
         # Create essential directories
@@ -33,16 +702,188 @@ class ArchLinuxEmulator:
         # Set current directory to user home
         self.current_dir = user_home
     
+    def save_image(self, path):
+        return FsImage.write(path, self.root, self._next_inode, self.current_dir)
+
+    def load_image(self, path):
+        image = FsImage(path, register=self._register_node)
+        # The old tree goes away with its mapping
+        self.close()
+        self.image = image
+        self.inodes = {}
+        self.name_index = {}
+        self._path_cache.clear()
+        self._path_deps.clear()
+        self._path_memo.clear()
+        self._next_inode = image.next_inode
+        self.root = image.read_node(0)
+        self._lazy_tree = image.has_unread_nodes()
+        self.current_dir = self.root
+        for name in image.path_names(image.cwd_index):
+            self.current_dir = self.current_dir.children[name]
+        return image
+
+    def close(self):
+        """Release the image the tree was loaded from, if any."""
+        if self.image is not None:
+            self.image.close()
+            self.image = None
+
+    def share_base(self, base):
+        """Start as a copy-on-write view of another emulator's tree, which
+        must not be modified afterwards. Directories are copied into this
+        emulator the first time they are entered, so a session costs memory
+        for the directories it touches rather than for the whole tree."""
+        self.hostname = base.hostname
+        self.username = base.username
+        self.repo = base.repo
+        self.installed = dict(base.installed)
+        self.file_owner = dict(base.file_owner)
+        self._next_inode = base._next_inode
+        self.inodes = {}
+        self.name_index = {}
+        self.root = FileSystemNode("/", inode=base.root.inode)
+        self.root.size = base.root.size
+        self.root._children = _SharedDir(base.root, self._register_node)
+        self._register_node(self.root)
+        self._base = base
+        self._lazy_tree = True
+        self.current_dir = self.resolve_path(base.get_path(base.current_dir)) or self.root
+
+    def login(self, username):
+        self.username = username
+        self.current_dir = self._make_dirs(f"/home/{username}") or self.root
+
+    def _register_node(self, node):
+        self.inodes[node.inode] = node
+        if node.parent is not None:
+            self.name_index.setdefault(node.name, set()).add(node)
+
+    def _unregister_node(self, node):
+        self.inodes.pop(node.inode, None)
+        nodes = self.name_index.get(node.name)
+        if nodes is not None:
+            nodes.discard(node)
+            if not nodes:
+                del self.name_index[node.name]
+
+    def _add_size(self, directory, delta):
+        while directory is not None:
+            directory.size += delta
+            directory = directory.parent
+
+    def _alloc_inode(self):
+        inode = self._next_inode
+        self._next_inode += 1
+        return inode
+
     def create_node(self, name, parent, is_dir=True, content=""):
-        node = FileSystemNode(name, is_dir, content)
+        node = FileSystemNode(name, is_dir, content, inode=self._alloc_inode())
         node.parent = parent
-        parent.children[name] = node
+        # Only successful lookups are cached, so a brand new name can't be
+        # stale anywhere; replacing an existing child is a removal first.
+        old = parent.children.get(name)
+        if old is not None:
+            self._detach(old)
+        parent.add_child(node)
+        self._register_node(node)
+        if node.size:
+            self._add_size(parent, node.size)
         return node
 
+    def remove_node(self, node):
+        if node is self.root or node.parent is None:
+            return False
+        node.parent.remove_child(node.name)
+        self._detach(node)
+        return True
+
+    def rename_node(self, node, new_name, new_parent=None):
+        if node is self.root:
+            return False
+        new_parent = new_parent or node.parent
+        if new_name in new_parent.children:
+            return False
+        ancestor = new_parent
+        while ancestor:
+            if ancestor is node:
+                return False
+            ancestor = ancestor.parent
+        self._invalidate_subtree(node)
+        node.parent.remove_child(node.name)
+        self._unregister_node(node)
+        self._add_size(node.parent, -node.size)
+        node.name = sys.intern(new_name)
+        node.parent = new_parent
+        new_parent.add_child(node)
+        self._register_node(node)
+        self._add_size(new_parent, node.size)
+        return True
+
+    def _detach(self, node):
+        # node.parent still points at the directory it was unlinked from
+        self._invalidate_subtree(node)
+        self._add_size(node.parent, -node.size)
+        for child in self._walk(node):
+            self._unregister_node(child)
+
+    def _walk(self, node):
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            yield current
+            if current.is_dir:
+                stack.extend(current.children.values())
+
+    @staticmethod
+    def _children_of(node):
+        # For reading only: a directory still shared with the base tree
+        # lists the base's nodes rather than copying them into the session
+        children = node._children
+        if type(children) is _SharedDir:
+            return children.source.children
+        return node.children
+
+    def _scan(self, start):
+        """Yield (path relative to start, node) for start and everything
+        below it, in _walk's order, without copying shared directories.
+        Base nodes have no paths in this emulator, hence the relative paths."""
+        stack = [("", start)]
+        while stack:
+            relative, node = stack.pop()
+            yield relative, node
+            if node.is_dir:
+                prefix = relative + "/" if relative else ""
+                stack.extend((prefix + name, child) for name, child in self._children_of(node).items())
+
+    def _invalidate_subtree(self, node):
+        # Every cached lookup that reached into this subtree had to step
+        # through `node` itself, so its dependency set is enough for the
+        # path cache; memoized absolute paths change for the whole subtree.
+        for key in list(self._path_deps.get(node.inode, ())):
+            self._drop_cached_path(key)
+        for child in self._walk(node):
+            self._path_memo.pop(child.inode, None)
+
+    def _drop_cached_path(self, key):
+        entry = self._path_cache.pop(key, None)
+        if entry is None:
+            return
+        for inode in entry[1]:
+            keys = self._path_deps.get(inode)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._path_deps[inode]
+
     def get_path(self, node=None):
         if not node:
             node = self.current_dir
         
+        path = self._path_memo.get(node.inode)
+        if path is not None:
+            return path
+        
         segments = []
         current = node
         while current and current != self.root:
@@ -50,15 +891,24 @@ class ArchLinuxEmulator:
             current = current.parent
         
         path = "/" + "/".join(reversed(segments))
-        return path if path else "/"
+        self._path_memo[node.inode] = path
+        return path
 
     def resolve_path(self, path):
         if path.startswith("/"):
             current = self.root
+            key = (0, path)
         else:
             current = self.current_dir
+            key = (current.inode, path)
+        
+        entry = self._path_cache.get(key)
+        if entry is not None:
+            self._path_cache.move_to_end(key)
+            return entry[0]
         
         parts = [p for p in path.split("/") if p]
+        visited = [current.inode]
         
         for part in parts:
             if part == "..":
@@ -70,49 +920,160 @@ class ArchLinuxEmulator:
                 current = current.children[part]
             else:
                 return None
+            visited.append(current.inode)
+        
+        self._cache_path(key, current, visited)
         return current
 
+    def _cache_path(self, key, node, visited):
+        visited = frozenset(visited)
+        self._path_cache[key] = (node, visited)
+        for inode in visited:
+            self._path_deps.setdefault(inode, set()).add(key)
+        if len(self._path_cache) > PATH_CACHE_SIZE:
+            self._drop_cached_path(next(iter(self._path_cache)))
+
+    def _fail(self, message, status=1):
+        self.status = status
+        return message
+
     def execute(self, command):
-        cmd_parts = command.strip().split()
-        if not cmd_parts:
-            return ""
-        
-        cmd = cmd_parts[0]
-        args = cmd_parts[1:]
-        
-        if cmd == "ls":
-            return self.cmd_ls(args)
-        elif cmd == "cd":
-            return self.cmd_cd(args)
-        elif cmd == "pwd":
-            return self.cmd_pwd()
-        elif cmd == "echo":
-            return self.cmd_echo(args)
-        elif cmd == "cat":
-            return self.cmd_cat(args)
-        elif cmd == "mkdir":
-            return self.cmd_mkdir(args)
-        elif cmd == "touch":
-            return self.cmd_touch(args)
-        elif cmd == "pacman":
-            return self.cmd_pacman(args)
-        elif cmd == "exit":
+        try:
+            parsed = parse_command_line(command.strip())
+        except ValueError as e:
+            return self._fail(f"bash: {e}", 2)
+        
+        output = "\n".join(self.run_parsed(parsed))
+        if self.exited and not output:
             return "exit"
-        elif cmd == "clear":
-            return "\n" * 100  # Simulate screen clear
+        return output
+
+    def execute_script(self, lines):
+        """Run a sequence of command lines, yielding output lines as they are
+        produced. Like bash, a syntax error stops the script at that line and
+        the lines before it still run."""
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                parsed = parse_command_line(line)
+            except ValueError as e:
+                self.status = 2
+                yield ErrorLine(f"bash: line {number}: {e}")
+                return
+            yield from self.run_parsed(parsed)
+            if self.exited:
+                return
+
+    def run_parsed(self, parsed):
+        for connector, pipeline in parsed:
+            if connector == "&&" and self.status != 0:
+                continue
+            statuses = [0] * len(pipeline)
+            yield from self._stream_pipeline(pipeline, statuses)
+            self.status = statuses[-1]
+            if self.exited:
+                return
+
+    def _stream_pipeline(self, pipeline, statuses):
+        stream = None
+        for index, (argv, redirect) in enumerate(pipeline):
+            stream = self._stream_stage(argv, stream, statuses, index)
+            if redirect:
+                stream = self._redirect(stream, redirect, statuses, index)
+        yield from stream
+
+    def _stream_stage(self, argv, stdin, statuses, index):
+        cmd, args = argv[0], list(argv[1:])
+        streamer = self.stream_commands.get(cmd)
+        if streamer is not None:
+            status = yield from streamer(args, stdin)
+        else:
+            handler = self.commands.get(cmd)
+            if stdin is not None:
+                # Let upstream side effects (mkdir, echo > ...) happen first
+                yield from self._stderr_only(stdin)
+            self.status = 0
+            if handler is None:
+                output = self._fail(f"{cmd}: command not found", 127)
+            else:
+                output = handler(args)
+            status = self.status
+            if output:
+                line_type = ErrorLine if status else str
+                for line in output.split("\n"):
+                    yield line_type(line)
+        if stdin is not None:
+            yield from self._stderr_only(stdin)
+        statuses[index] = status or 0
+
+    def _stderr_only(self, stream):
+        for line in stream:
+            if isinstance(line, ErrorLine):
+                yield line
+
+    def _redirect(self, stream, redirect, statuses, index):
+        op, path = redirect
+        lines = []
+        for line in stream:
+            if isinstance(line, ErrorLine):
+                yield line
+            else:
+                lines.append(line)
+        text = "\n".join(lines)
+        self.status = 0
+        error = self._write_file(path, text, append=(op == ">>"), prog="bash")
+        if error:
+            statuses[index] = self.status
+            yield ErrorLine(error)
+
+    def _write_file(self, path, text, append=False, prog="echo"):
+        target = self.resolve_path(path)
+        if target and target.is_dir:
+            return self._fail(f"{prog}: {path}: Is a directory")
+        
+        if target is None:
+            path_parts = path.split('/')
+            filename = path_parts[-1]
+            parent_path = "/".join(path_parts[:-1])
+
+            if parent_path:
+                 parent = self.resolve_path(parent_path)
+            elif path.startswith("/"):
+                 parent = self.root
+            else:
+                 parent = self.current_dir
+
+            if not parent or not parent.is_dir or not filename:
+                return self._fail(f"{prog}: cannot create file '{path}': No such file or directory")
+            self.create_node(filename, parent, is_dir=False, content=text)
         else:
-            return f"{cmd}: command not found"
+            old_size = target.size
+            if append and target.content:
+                target.content = target.content + "\n" + text
+            else:
+                # Overwrite existing file
+                target.content = text
+            self._add_size(target.parent, target.size - old_size)
+        return ""
 
     def cmd_ls(self, args):
+        show_inode = "-i" in args
+        args = [a for a in args if a != "-i"]
         target_path = args[0] if args else "."
         resolved = self.resolve_path(target_path)
 
         if not resolved:
-            return f"ls: cannot access '{target_path}': No such file or directory"
+            return self._fail(f"ls: cannot access '{target_path}': No such file or directory")
         
         if resolved.is_dir:
+            if show_inode:
+                return " ".join(f"{child.inode} {name}" for name, child in resolved.children.items())
             return " ".join(resolved.children.keys())
         else:
+            if show_inode:
+                return f"{resolved.inode} {resolved.name}"
             return resolved.name
 
     def cmd_cd(self, args):
@@ -125,9 +1086,9 @@ class ArchLinuxEmulator:
         target = self.resolve_path(target_path)
         
         if not target:
-            return f"cd: no such file or directory: {target_path}"
+            return self._fail(f"cd: no such file or directory: {target_path}")
         if not target.is_dir:
-            return f"cd: not a directory: {target_path}"
+            return self._fail(f"cd: not a directory: {target_path}")
         
         self.current_dir = target
         return ""
@@ -136,70 +1097,283 @@ class ArchLinuxEmulator:
         return self.get_path()
 
     def cmd_echo(self, args):
-        text_parts = []
-        redirect_file = None
-        
-        redirect_index = -1
-        if ">" in args:
-            redirect_index = args.index(">")
-            
-        if redirect_index != -1:
-            if redirect_index + 1 >= len(args):
-                return "bash: syntax error near unexpected token `newline'"
-            redirect_file = args[redirect_index + 1]
-            text_parts = args[:redirect_index]
-        else:
-            text_parts = args
+        return " ".join(args)
 
-        output = " ".join(text_parts)
-        if redirect_file:
-            target = self.resolve_path(redirect_file)
-            if target and target.is_dir:
-                return f"echo: {redirect_file}: Is a directory"
-            
-            # Handle path to create the file
-            path_parts = redirect_file.split('/')
-            filename = path_parts[-1]
-            parent_path = "/".join(path_parts[:-1])
-
-            if parent_path:
-                 parent = self.resolve_path(parent_path)
-            else:
-                 parent = self.current_dir
+    def cmd_cat(self, args):
+        return self._collect(self.stream_cat(args, None))
 
-            if not parent or not parent.is_dir:
-                return f"echo: cannot create file '{redirect_file}': No such file or directory"
-            
-            if filename in parent.children:
-                # Overwrite existing file
-                parent.children[filename].content = output
-            else:
-                # Create new file
-                self.create_node(filename, parent, is_dir=False, content=output)
-            return ""
-        
-        return output
+    def _collect(self, stream):
+        """Run a stream command to completion outside a pipeline."""
+        lines = []
+        try:
+            while True:
+                lines.append(next(stream))
+        except StopIteration as stop:
+            self.status = stop.value or 0
+        return "\n".join(lines)
 
-    def cmd_cat(self, args):
+    def stream_cat(self, args, stdin):
         if not args:
-            return "cat: missing operand"
+            if stdin is None:
+                yield ErrorLine("cat: missing operand")
+                return 1
+            yield from stdin
+            return 0
         
-        outputs = []
+        status = 0
         for path in args:
+            if path == "-" and stdin is not None:
+                yield from stdin
+                continue
             target = self.resolve_path(path)
             if not target:
-                outputs.append(f"cat: {path}: No such file or directory")
+                status = 1
+                yield ErrorLine(f"cat: {path}: No such file or directory")
             elif target.is_dir:
-                outputs.append(f"cat: {path}: Is a directory")
+                status = 1
+                yield ErrorLine(f"cat: {path}: Is a directory")
+            else:
+                yield from target.content.split("\n")
+        return status
+
+    def _input_lines(self, cmd, paths, stdin):
+        """Lines from the named files, or from stdin when no file is given.
+        Problems opening a file and upstream stderr arrive as ErrorLine."""
+        if not paths:
+            if stdin is not None:
+                yield from stdin
+            return
+        for path in paths:
+            target = self.resolve_path(path)
+            if not target or target.is_dir:
+                reason = "Is a directory" if target else "No such file or directory"
+                yield ErrorLine(f"{cmd}: {path}: {reason}")
+                continue
+            yield from target.content.split("\n")
+
+    def stream_grep(self, args, stdin):
+        invert = "-v" in args
+        ignore_case = "-i" in args
+        recursive = "-r" in args or "-R" in args
+        includes = [a.split("=", 1)[1] for a in args if a.startswith("--include=")]
+        args = [a for a in args if a not in ("-v", "-i", "-r", "-R") and not a.startswith("--include=")]
+        if not args:
+            yield ErrorLine("Usage: grep [-iv] [-r [--include=GLOB]] PATTERN [FILE]...")
+            return 2
+        
+        try:
+            pattern = re.compile(args[0], re.IGNORECASE if ignore_case else 0)
+        except re.error as e:
+            yield ErrorLine(f"grep: {e}")
+            return 2
+        
+        if recursive:
+            return (yield from self._grep_tree(pattern, invert, args[1:] or ["."], includes))
+        
+        matched = False
+        status = 0
+        for line in self._input_lines("grep", args[1:], stdin):
+            if isinstance(line, ErrorLine):
+                status = 2 if line.startswith("grep:") else status
+                yield line
+            elif (pattern.search(line) is None) == invert:
+                matched = True
+                yield line
+        return status or (0 if matched else 1)
+
+    def _grep_tree(self, pattern, invert, paths, includes):
+        matched = False
+        status = 0
+        for path in paths:
+            start = self.resolve_path(path)
+            if start is None:
+                status = 2
+                yield ErrorLine(f"grep: {path}: No such file or directory")
+                continue
+            if includes:
+                files = sorted(self._indexed_under(start, includes, want_dir=False))
+            else:
+                files = self._files_with_content(start)
+            for relative, node in files:
+                if not node.size:
+                    continue
+                shown = self._display_path(path, relative)
+                for line in node.content.split("\n"):
+                    if (pattern.search(line) is None) == invert:
+                        matched = True
+                        yield f"{shown}:{line}"
+        return status or (0 if matched else 1)
+
+    def _files_with_content(self, start):
+        # Directory sizes let us skip subtrees that hold no data at all
+        stack = [("", start)]
+        while stack:
+            relative, node = stack.pop()
+            if not node.is_dir:
+                yield relative, node
+            elif node.size:
+                prefix = relative + "/" if relative else ""
+                stack.extend(reversed([(prefix + name, child)
+                                       for name, child in self._children_of(node).items()]))
+
+    def _indexed_under(self, start, patterns, want_dir=None):
+        """(relative path, node) for nodes at or below `start` whose name
+        matches one of the glob patterns, found through name_index instead
+        of walking the tree."""
+        if self._lazy_tree:
+            # name_index only covers directories expanded so far. Walk just
+            # the searched subtree rather than expanding the whole image, and
+            # read the shared base in place; once an image's root has been
+            # walked the index is whole.
+            globs = [p for p in patterns if any(c in p for c in "*?[")]
+            for relative, node in self._scan(start):
+                if node.parent is None or want_dir is not None and node.is_dir != want_dir:
+                    continue
+                if node.name in patterns or any(fnmatch.fnmatchcase(node.name, p) for p in globs):
+                    yield relative, node
+            if start is self.root and self._base is None:
+                self._lazy_tree = False
+            return
+        names = set()
+        for pattern in patterns:
+            if any(c in pattern for c in "*?["):
+                names.update(n for n in self.name_index if fnmatch.fnmatchcase(n, pattern))
+            elif pattern in self.name_index:
+                names.add(pattern)
+        
+        for name in names:
+            for node in self.name_index[name]:
+                if want_dir is not None and node.is_dir != want_dir:
+                    continue
+                ancestor = node
+                while ancestor is not None and ancestor is not start:
+                    ancestor = ancestor.parent
+                if ancestor is start:
+                    yield self.get_path(node)[len(self.get_path(start)):].lstrip("/"), node
+
+    @staticmethod
+    def _display_path(arg, relative):
+        return arg.rstrip("/") + "/" + relative if relative else arg
+
+    def cmd_find(self, args):
+        paths = []
+        while args and not args[0].startswith("-"):
+            paths.append(args.pop(0))
+        paths = paths or ["."]
+        
+        name = None
+        node_type = None
+        while args:
+            option = args.pop(0)
+            if option not in ("-name", "-type"):
+                return self._fail(f"find: unknown predicate `{option}'")
+            if not args:
+                return self._fail(f"find: missing argument to `{option}'")
+            value = args.pop(0)
+            if option == "-name":
+                name = value
+            elif value in ("f", "d"):
+                node_type = value
+            else:
+                return self._fail(f"find: Unknown argument to -type: {value}")
+        want_dir = None if node_type is None else node_type == "d"
+        
+        results = []
+        for path in paths:
+            start = self.resolve_path(path)
+            if start is None:
+                results.append(self._fail(f"find: ‘{path}’: No such file or directory"))
+                continue
+            if name is not None:
+                found = sorted(self._display_path(path, relative)
+                               for relative, _ in self._indexed_under(start, [name], want_dir))
+            else:
+                found = [self._display_path(path, relative) for relative, node in self._scan(start)
+                         if want_dir is None or node.is_dir == want_dir]
+            results.extend(found)
+        return "\n".join(results)
+
+    def cmd_du(self, args):
+        summarize = "-s" in args
+        human = "-h" in args
+        paths = [a for a in args if a not in ("-s", "-h")] or ["."]
+        fmt = self._human_size if human else str
+        
+        lines = []
+        for path in paths:
+            start = self.resolve_path(path)
+            if start is None:
+                lines.append(self._fail(f"du: cannot access '{path}': No such file or directory"))
+                continue
+            if not summarize and start.is_dir:
+                for relative, node in self._dirs_postorder(start):
+                    lines.append(f"{fmt(node.size)}\t{self._display_path(path, relative)}")
             else:
-                outputs.append(target.content)
-        return "\n".join(outputs)
+                lines.append(f"{fmt(start.size)}\t{path}")
+        return "\n".join(lines)
+
+    def _dirs_postorder(self, start):
+        stack = [("", start, False)]
+        while stack:
+            relative, node, visited = stack.pop()
+            if visited:
+                yield relative, node
+                continue
+            stack.append((relative, node, True))
+            prefix = relative + "/" if relative else ""
+            stack.extend((prefix + name, child, False)
+                         for name, child in reversed(list(self._children_of(node).items()))
+                         if child.is_dir)
+
+    @staticmethod
+    def _human_size(size):
+        for unit in ("", "K", "M", "G"):
+            if size < 1024 or unit == "G":
+                return f"{size:.1f}{unit}" if unit else str(size)
+            size /= 1024
+
+    def stream_head(self, args, stdin):
+        count = 10
+        if args and args[0] == "-n":
+            if len(args) < 2 or not args[1].isdigit():
+                yield ErrorLine("head: option requires a numeric argument -- 'n'")
+                return 1
+            count = int(args[1])
+            args = args[2:]
+        
+        status = 0
+        for line in self._input_lines("head", args, stdin):
+            if isinstance(line, ErrorLine):
+                status = 1 if line.startswith("head:") else status
+                yield line
+                continue
+            if count <= 0:
+                break
+            count -= 1
+            yield line
+        return status
+
+    def stream_wc(self, args, stdin):
+        only_lines = "-l" in args
+        args = [a for a in args if a != "-l"]
+        lines = words = chars = 0
+        status = 0
+        for line in self._input_lines("wc", args, stdin):
+            if isinstance(line, ErrorLine):
+                status = 1 if line.startswith("wc:") else status
+                yield line
+                continue
+            lines += 1
+            words += len(line.split())
+            chars += len(line) + 1
+        yield str(lines) if only_lines else f"{lines} {words} {chars}"
+        return status
 
     def _create_from_path(self, path, is_dir):
         """Helper function for mkdir and touch to resolve paths and create nodes."""
         if not path:
             op = "mkdir" if is_dir else "touch"
-            return f"{op}: missing operand"
+            return self._fail(f"{op}: missing operand")
             
         # Correctly determine the parent directory and the name of the new node
         path_parts = path.rstrip('/').split('/')
@@ -215,11 +1389,11 @@ class ArchLinuxEmulator:
         parent = self.resolve_path(parent_path_str)
 
         if not parent or not parent.is_dir:
-            return f"mkdir: cannot create directory ‘{path}’: No such file or directory"
+            return self._fail(f"mkdir: cannot create directory ‘{path}’: No such file or directory")
 
         if node_name in parent.children:
             if not (not is_dir and not parent.children[node_name].is_dir): # allow touch on existing file
-                 return f"mkdir: cannot create directory ‘{path}’: File exists"
+                 return self._fail(f"mkdir: cannot create directory ‘{path}’: File exists")
             return "" # Silently succeed if 'touch'ing an existing file
 
         self.create_node(node_name, parent, is_dir=is_dir)
@@ -227,7 +1401,7 @@ class ArchLinuxEmulator:
 
     def cmd_mkdir(self, args):
         if not args:
-            return "mkdir: missing operand"
+            return self._fail("mkdir: missing operand")
         
         for path in args:
             result = self._create_from_path(path, is_dir=True)
@@ -237,7 +1411,7 @@ class ArchLinuxEmulator:
 
     def cmd_touch(self, args):
         if not args:
-            return "touch: missing operand"
+            return self._fail("touch: missing operand")
         
         for path in args:
             result = self._create_from_path(path, is_dir=False)
@@ -247,25 +1421,158 @@ class ArchLinuxEmulator:
 
     def cmd_pacman(self, args):
         if not args:
-            return "pacman: no operation specified (use -h for help)"
+            return self._fail("pacman: no operation specified (use -h for help)")
+        
+        flags = [a for a in args if a.startswith("-")]
+        targets = [a for a in args if not a.startswith("-")]
+        operation = flags[0] if flags else args[0]
         
         # Prioritize Syu over S
-        if "-Syu" in args:
-            return ":: Synchronizing package databases...\n:: Starting full system upgrade...\n there is nothing to do"
-        elif "-S" in args:
-            package_index = -1
-            try:
-                package_index = args.index("-S") + 1
-            except (ValueError, IndexError):
-                 return "error: option '-S' requires a target"
-            
-            if package_index >= len(args):
-                return "error: option '-S' requires a target"
-            
-            packages = args[package_index:]
-            return f"resolving dependencies...\nlooking for conflicting packages...\n\nPackages ({len(packages)})  {'  '.join(packages)}\n\nTotal Installed Size:  0.00 MiB\n\n:: Proceed with installation? [Y/n] \n:: (1/{len(packages)}) Checking keys in keyring\n:: (1/{len(packages)}) Checking package integrity\n:: (1/{len(packages)}) Loading package files\n:: (1/{len(packages)}) Checking for file conflicts\n:: (1/{len(packages)}) Checking available disk space\n:: Installing {' '.join(packages)}..."
+        if "-Syu" in flags:
+            return self._pacman_upgrade(targets)
+        elif operation == "-Ss":
+            return self._pacman_search(targets)
+        elif operation == "-S":
+            if not targets:
+                return self._fail("error: no targets specified (use -h for help)")
+            return self._pacman_install(targets)
+        elif operation == "-R":
+            if not targets:
+                return self._fail("error: no targets specified (use -h for help)")
+            return self._pacman_remove(targets)
+        elif operation == "-Q":
+            return self._pacman_query(targets)
         else:
-            return f"pacman: invalid option '{args[0]}'"
+            return self._fail(f"pacman: invalid option '{args[0]}'")
+
+    def _pacman_install(self, targets, header=""):
+        order, errors = self.repo.resolve(targets, self.installed)
+        if errors:
+            return self._fail(header + "resolving dependencies...\n" + "\n".join(errors) +
+                              "\nerror: failed to prepare transaction (could not satisfy dependencies)")
+        
+        packages = [self.repo.packages[name] for name in order]
+        conflicts = []
+        for package in packages:
+            for path in package.files:
+                owner = self.file_owner.get(path)
+                if owner is None and self.resolve_path(path) is not None:
+                    conflicts.append(f"{package.name}: {path} exists in filesystem")
+                elif owner is not None and owner != package.name:
+                    conflicts.append(f"{package.name}: {path} exists in filesystem (owned by {owner})")
+        if conflicts:
+            return self._fail(header + "resolving dependencies...\nlooking for conflicting packages...\n" +
+                              "error: failed to commit transaction (conflicting files)\n" + "\n".join(conflicts))
+        
+        total = len(packages)
+        size = sum(p.size for p in packages) / 2**20
+        listing = "  ".join(f"{p.name}-{p.version}" for p in packages)
+        lines = [f"{header}resolving dependencies...", "looking for conflicting packages...", "",
+                 f"Packages ({total})  {listing}", "", f"Total Installed Size:  {size:.2f} MiB", "",
+                 ":: Proceed with installation? [Y/n] "]
+        for i, package in enumerate(packages, 1):
+            if package.name in self.installed and package.name in targets:
+                lines.append(f"warning: {package.name}-{package.version} is up to date -- reinstalling")
+            lines.append(f"({i}/{total}) installing {package.name}")
+            error = self._install_package(package)
+            if error:
+                lines.append(error)
+                return self._fail("\n".join(lines))
+        return "\n".join(lines)
+
+    def _install_package(self, package):
+        previous = self.installed.get(package.name)
+        if previous is not None:
+            for path in set(previous.files) - set(package.files):
+                self._remove_owned_file(path)
+        for path in package.files:
+            directory, _, filename = path.rpartition("/")
+            parent = self._make_dirs(directory)
+            if parent is None:
+                return f"error: could not create directory for {path}"
+            self.create_node(filename, parent, is_dir=False, content=f"{package.name} {package.version}")
+            self.file_owner[path] = package.name
+        self.installed[package.name] = package
+        return ""
+
+    def _make_dirs(self, path):
+        current = self.root
+        for part in path.split("/"):
+            if not part:
+                continue
+            child = current.children.get(part)
+            if child is None:
+                child = self.create_node(part, current)
+            elif not child.is_dir:
+                return None
+            current = child
+        return current
+
+    def _remove_owned_file(self, path):
+        self.file_owner.pop(path, None)
+        node = self.resolve_path(path)
+        if node is not None and not node.is_dir:
+            self.remove_node(node)
+
+    def _pacman_remove(self, targets):
+        missing = [t for t in targets if t not in self.installed]
+        if missing:
+            return self._fail("\n".join(f"error: target not found: {t}" for t in missing))
+        
+        removing = set(targets)
+        broken = []
+        for target in targets:
+            names = (target,) + tuple(self.repo.parse_dep(p)[0] for p in self.installed[target].provides)
+            for name in names:
+                for dependent in sorted(self.repo.dependents.get(name, ())):
+                    if dependent in self.installed and dependent not in removing:
+                        broken.append(f":: removing {target} breaks dependency '{name}' required by {dependent}")
+        if broken:
+            return self._fail("checking dependencies...\nerror: failed to prepare transaction "
+                              "(could not satisfy dependencies)\n" + "\n".join(broken))
+        
+        lines = ["checking dependencies...", "", f"Packages ({len(targets)})  " +
+                 "  ".join(f"{t}-{self.installed[t].version}" for t in targets), "",
+                 ":: Do you want to remove these packages? [Y/n] "]
+        for i, target in enumerate(targets, 1):
+            lines.append(f"({i}/{len(targets)}) removing {target}")
+            for path in self.installed.pop(target).files:
+                self._remove_owned_file(path)
+        return "\n".join(lines)
+
+    def _pacman_upgrade(self, targets):
+        header = ":: Synchronizing package databases...\n:: Starting full system upgrade...\n"
+        outdated = [name for name, package in self.installed.items()
+                    if name in self.repo.packages
+                    and vercmp(self.repo.packages[name].version, package.version) > 0]
+        if not outdated and not targets:
+            return header + " there is nothing to do"
+        return self._pacman_install(outdated + targets, header)
+
+    def _pacman_search(self, terms):
+        if not terms:
+            return self._fail("error: no targets specified (use -h for help)")
+        lines = []
+        for name in self.repo.search(terms):
+            package = self.repo.packages[name]
+            tag = " [installed]" if name in self.installed else ""
+            lines.append(f"core/{name} {package.version}{tag}")
+            lines.append(f"    {package.description}")
+        if not lines:
+            self.status = 1
+        return "\n".join(lines)
+
+    def _pacman_query(self, targets):
+        if targets:
+            missing = [t for t in targets if t not in self.installed]
+            if missing:
+                return self._fail("\n".join(f"error: package '{t}' was not found" for t in missing))
+            return "\n".join(f"{t} {self.installed[t].version}" for t in targets)
+        return "\n".join(f"{name} {package.version}" for name, package in sorted(self.installed.items()))
+
+    def cmd_exit(self, args):
+        self.exited = True
+        return ""
 
     def get_prompt(self):
         home_path = f"/home/{self.username}"
@@ -278,24 +1585,337 @@ class ArchLinuxEmulator:
             
         return f"[{self.username}@{self.hostname} {display_path}]$ "
 
-def main():
+def benchmark_script(commands=50000):
+    """Measure script throughput in simple commands (pipeline stages) per second."""
+    emulator = ArchLinuxEmulator()
+    template = [
+        "mkdir bench{i}",
+        "cd bench{i} && echo line {i} > log.txt; echo more {i} >> log.txt",
+        "cat log.txt | grep more | wc -l",
+        "ls -i | head -n 1; pwd",
+        "cd ..",
+    ]
+    per_round = 11
+    rounds = max(1, commands // per_round)
+    script = [line.format(i=i) for i in range(rounds) for line in template]
+
+    start = time.perf_counter()
+    for _ in emulator.execute_script(script):
+        pass
+    elapsed = time.perf_counter() - start
+
+    total = rounds * per_round
+    print(f"{total} commands in {elapsed:.3f}s: {total / elapsed:,.0f} commands/s")
+    return total / elapsed
+
+class _EagerNode:
+    """A node as FileSystemNode stored it before __slots__ and lazy
+    children, kept for benchmark_memory."""
+    def __init__(self, name, is_dir=True, content=None, inode=0):
+        self.name = name
+        self.is_dir = is_dir
+        self.content = content if not is_dir else ""
+        self.children = {} if is_dir else None
+        self.parent = None
+        self.inode = inode
+
+def _build_eager_tree(nodes, per_dir=1000):
+    """The tree _build_tree makes, in the old layout with its inode table."""
+    root = _EagerNode("/", inode=1)
+    inodes = {1: root}
+    directory = None
+    for i in range(nodes):
+        if i % per_dir == 0:
+            node = directory = _EagerNode(f"dir{i // per_dir}", inode=len(inodes) + 1)
+            parent = root
+        else:
+            node = _EagerNode(f"file{i % per_dir}.txt", False, f"data {i % 100}", len(inodes) + 1)
+            parent = directory
+        node.parent = parent
+        parent.children[node.name] = node
+        inodes[node.inode] = node
+    return root, inodes
+
+def _traced(build):
+    """Run build() and return what it returned, the bytes still allocated
+    by it afterwards, and the seconds it took (under tracemalloc)."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        result = build()
+        elapsed = time.perf_counter() - start
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return result, used, elapsed
+
+def benchmark_memory(nodes=1_000_000):
+    """Build the same synthetic tree in the old layout (a __dict__ and a
+    children dict per node) and through create_node, and report the memory
+    each holds. Returns (old bytes, new bytes)."""
+    def build_new():
+        emulator = ArchLinuxEmulator()
+        _build_tree(emulator, nodes)
+        return emulator
+
+    print(f"{nodes:,} nodes, traced allocations still held:")
+    results = []
+    for label, build in (("dict-based nodes", lambda: _build_eager_tree(nodes)),
+                         ("slotted, lazy children", build_new)):
+        tree, used, elapsed = _traced(build)
+        print(f"  {label:<24}{used / 2**20:8.1f} MiB  {used / nodes:6.0f} bytes/node  "
+              f"(built in {elapsed:.2f}s)")
+        results.append(used)
+        del tree
+    print(f"  saved {1 - results[1] / results[0]:.0%}")
+    return tuple(results)
+
+def _build_tree(emulator, nodes, per_dir=1000):
+    directory = None
+    for i in range(nodes):
+        if i % per_dir == 0:
+            directory = emulator.create_node(f"dir{i // per_dir}", parent=emulator.root)
+        else:
+            emulator.create_node(f"file{i % per_dir}.txt", parent=directory,
+                                 is_dir=False, content=f"data {i % 100}")
+
+def benchmark_image(nodes=1_000_000, path="arch_bench.img"):
+    """Compare rebuilding a tree node by node with loading it from an image."""
+    start = time.perf_counter()
     emulator = ArchLinuxEmulator()
+    _build_tree(emulator, nodes)
+    built = time.perf_counter() - start
+
+    start = time.perf_counter()
+    emulator.save_image(path)
+    saved = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loaded = ArchLinuxEmulator(image=path)
+    load_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    output = loaded.execute(f"cat /dir{nodes // 2000}/file7.txt")
+    first_cat = time.perf_counter() - start
+
+    print(f"{nodes:,} nodes, image {os.path.getsize(path) / 2**20:.1f} MiB")
+    print(f"build: {built:.3f}s  save: {saved:.3f}s  load: {load_time * 1000:.2f}ms  "
+          f"first cat: {first_cat * 1000:.2f}ms ({output!r})")
+    # Windows won't delete a file that is still mapped
+    loaded.close()
+    os.remove(path)
+
+def benchmark_pacman(packages=20000, path="pacman_bench.json", seed=1):
+    """Time loading, resolving and searching a synthetic repo of `packages` packages."""
+    rng = random.Random(seed)
+    words = ["lib", "tool", "daemon", "python", "gtk", "font", "kernel", "crypto", "net", "data"]
+    repo = PackageRepo()
+    for i in range(packages):
+        depends = [f"pkg{rng.randrange(i)}" for _ in range(rng.randint(0, 4))] if i else []
+        if i > 100 and rng.random() < 0.2:
+            depends.append(f"virtual{rng.randrange(50)}>=1.0")
+        provides = [f"virtual{i // 10 % 50}=1.{i % 7}"] if i % 10 == 0 else []
+        description = " ".join(rng.sample(words, 3)) + f" package {i}"
+        repo.add(Package(f"pkg{i}", f"1.{i % 7}.{i % 13}-1", description, depends, provides,
+                         [f"/usr/share/pkg{i}/data", f"/usr/bin/pkg{i}"]))
+    repo.save(path)
+
+    start = time.perf_counter()
+    loaded = PackageRepo.load(path)
+    load_time = time.perf_counter() - start
+    os.remove(path)
+
+    targets = [f"pkg{rng.randrange(packages)}" for _ in range(200)]
+    start = time.perf_counter()
+    sizes = [len(loaded.resolve([t], {})[0]) for t in targets]
+    elapsed = time.perf_counter() - start
+    print(f"resolve: {len(targets) / elapsed:,.0f} targets/s, "
+          f"avg closure {sum(sizes) / len(sizes):.0f} packages")
+
+    start = time.perf_counter()
+    hits = sum(len(loaded.search([w[:3], "pack"])) for w in words * 10)
+    search_time = (time.perf_counter() - start) / (len(words) * 10)
+
+    emulator = ArchLinuxEmulator()
+    emulator.repo = loaded
+    start = time.perf_counter()
+    emulator.execute(f"pacman -S {targets[0]}")
+    install_time = time.perf_counter() - start
+
+    print(f"{packages:,} packages: load {load_time:.2f}s, -Ss {search_time * 1000:.2f}ms/query "
+          f"({hits} hits), install with deps {install_time * 1000:.1f}ms "
+          f"({len(emulator.installed)} packages)")
+
+class EmulatorServer:
+    """Line-protocol server: every connection logs in with a username and
+    gets its own session over one shared base filesystem."""
+
+    def __init__(self, base):
+        self.base = base
+        self.sessions = 0
+
+    async def handle(self, reader, writer):
+        session = None
+        try:
+            writer.write(f"{self.base.hostname} login: ".encode())
+            line = await reader.readline()
+            if not line:
+                return
+            username = line.decode(errors="replace").strip()
+            if not re.fullmatch(r"[a-z_][a-z0-9_-]{0,31}", username):
+                username = self.base.username
+            session = ArchLinuxEmulator(base=self.base)
+            session.login(username)
+            self.sessions += 1
+
+            while not session.exited:
+                writer.write(session.get_prompt().encode())
+                await writer.drain()
+                line = await reader.readline()
+                if not line:
+                    break
+                output = session.execute(line.decode(errors="replace"))
+                if output and output != "exit":
+                    writer.write(output.encode() + b"\n")
+        except ConnectionError:
+            pass
+        finally:
+            if session is not None:
+                self.sessions -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        addresses = ", ".join(str(sock.getsockname()) for sock in server.sockets)
+        print(f"Serving emulator sessions on {addresses}")
+        async with server:
+            await server.serve_forever()
+
+async def _load_session(host, port, number, commands, latencies):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        await reader.readuntil(b"login: ")
+        writer.write(f"user{number}\n".encode())
+        await reader.readuntil(b"]$ ")
+        for command in commands:
+            start = time.perf_counter()
+            writer.write(command.encode() + b"\n")
+            await reader.readuntil(b"]$ ")
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+async def _load_test(host, port, sessions, rounds):
+    commands = ["pwd", "ls", "echo hello > notes.txt", "cat notes.txt | wc -l",
+                "mkdir work", "cd work", "ls /etc", "cd ..", "du -s ."] * rounds
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(_load_session(host, port, i, commands, latencies) for i in range(sessions)))
+    return latencies, time.perf_counter() - start
+
+def load_test(address, sessions=1000, rounds=3):
+    """Open `sessions` concurrent sessions against a running --serve and
+    report per-command latency percentiles."""
+    host, _, port = address.rpartition(":")
+    latencies, elapsed = asyncio.run(_load_test(host or "127.0.0.1", int(port), sessions, rounds))
+    latencies.sort()
+    def percentile(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))] * 1000
+    print(f"{sessions} sessions, {len(latencies)} commands in {elapsed:.2f}s "
+          f"({len(latencies) / elapsed:,.0f} commands/s)")
+    print(f"latency p50 {percentile(0.50):.2f}ms  p99 {percentile(0.99):.2f}ms  "
+          f"max {latencies[-1] * 1000:.2f}ms")
+
+def run_script(emulator, path):
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    for line in emulator.execute_script(lines):
+        print(line)
+    return emulator.status
+
+def main():
+    parser = argparse.ArgumentParser(description="Arch Linux Emulator")
+    parser.add_argument("--script", metavar="FILE", help="run commands from FILE ('-' for stdin) and exit")
+    parser.add_argument("--bench", type=int, nargs="?", const=50000, metavar="N",
+                        help="run a scripted throughput benchmark of about N commands")
+    parser.add_argument("--bench-memory", type=int, nargs="?", const=1_000_000, metavar="N",
+                        help="compare memory for an N-node tree in the old and new node layouts")
+    parser.add_argument("--bench-image", type=int, nargs="?", const=1_000_000, metavar="N",
+                        help="compare building an N-node tree with loading it from an image")
+    parser.add_argument("--bench-pacman", type=int, nargs="?", const=20000, metavar="N",
+                        help="time repo loading, dependency resolution and search for N packages")
+    parser.add_argument("--image", metavar="FILE", help="boot from a filesystem image instead of the default tree")
+    parser.add_argument("--repo", metavar="FILE", help="package database for pacman (.json, or .db for SQLite)")
+    parser.add_argument("--save-image", metavar="FILE", help="write the filesystem to an image on exit")
+    parser.add_argument("--serve", metavar="[HOST:]PORT", help="serve sessions over TCP on a shared filesystem")
+    parser.add_argument("--loadtest", metavar="[HOST:]PORT", help="load-test a running --serve instance")
+    parser.add_argument("--sessions", type=int, default=1000, help="concurrent sessions for --loadtest")
+    options = parser.parse_args()
+    
+    if options.bench:
+        benchmark_script(options.bench)
+        return
+    if options.bench_memory:
+        benchmark_memory(options.bench_memory)
+        return
+    if options.bench_image:
+        benchmark_image(options.bench_image)
+        return
+    if options.bench_pacman:
+        benchmark_pacman(options.bench_pacman)
+        return
+    if options.loadtest:
+        load_test(options.loadtest, options.sessions)
+        return
+    
+    try:
+        emulator = ArchLinuxEmulator(image=options.image, repo=options.repo)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if options.serve:
+        host, _, port = options.serve.rpartition(":")
+        try:
+            asyncio.run(EmulatorServer(emulator).serve(host or "127.0.0.1", int(port)))
+        except KeyboardInterrupt:
+            pass
+        return
+    if options.script:
+        status = run_script(emulator, options.script)
+        if options.save_image:
+            emulator.save_image(options.save_image)
+        sys.exit(status)
+    
     print("Welcome to Arch Linux Emulator (type 'exit' to quit)")
     
     while True:
         try:
             command = input(emulator.get_prompt())
             result = emulator.execute(command)
-            if result == "exit":
-                break
-            if result:
+            if result and result != "exit":
                 print(result)
+            if emulator.exited:
+                break
         except KeyboardInterrupt:
             print("^C")
             continue
         except EOFError:
             print("exit")
             break
+    
+    if options.save_image:
+        emulator.save_image(options.save_image)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
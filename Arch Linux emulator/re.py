@@ -1,18 +1,40 @@
 import os
+import sys
+
+# This file shadows the stdlib re module for anything imported from its
+# directory (textwrap, tkinter), so keep the standard library first.
+_HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:] = [p for p in sys.path if os.path.abspath(p or os.curdir) != _HERE] + [_HERE]
+
+import io
 import time
+import hmac
+import queue
+import struct
+import bisect
 import random
 import hashlib
+import argparse
 import binascii
+from array import array
 import sqlite3
+import tempfile
 import textwrap
 import threading
-from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 import tkinter as tk
+from cryptography.exceptions import InvalidTag
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from tkinter import scrolledtext, ttk, messagebox, Canvas, Frame
 
+DB_PATH = 'restart_os.db'
+HISTORY_LIMIT = 100000
+
 # Database setup
-def init_database():
-    conn = sqlite3.connect('restart_os.db')
+def init_database(db_path=DB_PATH):
+    conn = sqlite3.connect(db_path)
     c = conn.cursor()
     
     # Create tables
@@ -52,6 +74,23 @@ def init_database():
                  network_monitor INTEGER,
                  promiscuous_mode INTEGER)''')
     
+    # Ring buffers: one row per (resolution, slot), overwritten as time wraps
+    c.execute('''CREATE TABLE IF NOT EXISTS status_samples (
+                 resolution TEXT,
+                 slot INTEGER,
+                 bucket INTEGER,
+                 cpu REAL,
+                 cpu_max REAL,
+                 memory REAL,
+                 processes REAL,
+                 samples INTEGER,
+                 PRIMARY KEY (resolution, slot))''')
+    
+    c.execute('''CREATE TABLE IF NOT EXISTS command_history (
+                 id INTEGER PRIMARY KEY AUTOINCREMENT,
+                 command TEXT,
+                 created_at DATETIME DEFAULT CURRENT_TIMESTAMP)''')
+    
     # Initialize system status
     c.execute('''INSERT OR IGNORE INTO system_status 
                  (id, security_level, memory_protection, user_mode, network_monitor, promiscuous_mode)
@@ -63,19 +102,499 @@ def init_database():
 # Initialize database
 init_database()
 
+def db_timestamp():
+    # Same format as CURRENT_TIMESTAMP, taken when the event happens rather
+    # than when its batch is written
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+class BatchWriter:
+    """Buffers inserts and writes them with executemany in one transaction
+    once batch_size rows are waiting or flush_interval seconds after the
+    first unwritten row, whichever comes first. Rows for the same statement
+    are written in the order they were added."""
+    
+    def __init__(self, conn, lock, batch_size=256, flush_interval=1.0):
+        self.conn = conn
+        self.lock = lock
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.pending = {}
+        self.count = 0
+        self.timer = None
+        self.closed = False
+    
+    def add(self, sql, params):
+        with self.lock:
+            if self.closed:
+                return
+            self.pending.setdefault(sql, []).append(params)
+            self.count += 1
+            if self.count >= self.batch_size:
+                self.flush()
+            elif self.timer is None:
+                self.timer = threading.Timer(self.flush_interval, self.flush)
+                self.timer.daemon = True
+                self.timer.start()
+    
+    def flush(self):
+        with self.lock:
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            if not self.pending or self.closed:
+                return
+            pending, self.pending, self.count = self.pending, {}, 0
+            with self.conn:
+                for sql, rows in pending.items():
+                    self.conn.executemany(sql, rows)
+    
+    def close(self):
+        """Write what is waiting, then ignore further rows; the connection
+        is about to be closed."""
+        with self.lock:
+            self.flush()
+            self.closed = True
+
+
+class ProcessTable:
+    """Authoritative in-memory process list. Rows are (pid, name, priority,
+    state, security) tuples; pids within each state and priority bucket are
+    kept in insertion order, which is pid order since pids only grow."""
+    
+    def __init__(self, rows=(), next_pid=101):
+        self.rows = {}
+        self.by_state = {}
+        self.by_priority = {}
+        self.priorities = []
+        self.next_pid = next_pid
+        for row in rows:
+            self._insert(row)
+    
+    def _insert(self, row):
+        pid, _, priority, state, _ = row
+        self.rows[pid] = row
+        self.by_state.setdefault(state, {})[pid] = None
+        if state == "Running":
+            if priority not in self.by_priority:
+                self.by_priority[priority] = {}
+                bisect.insort(self.priorities, priority)
+            self.by_priority[priority][pid] = None
+    
+    def _remove(self, pid):
+        row = self.rows.pop(pid)
+        _, _, priority, state, _ = row
+        del self.by_state[state][pid]
+        if state == "Running":
+            bucket = self.by_priority[priority]
+            del bucket[pid]
+            if not bucket:
+                del self.by_priority[priority]
+                self.priorities.remove(priority)
+        return row
+    
+    def spawn(self, name, priority, security):
+        pid = self.next_pid
+        self.next_pid = pid + 1
+        row = (pid, name, priority, "Running", security)
+        self._insert(row)
+        return row
+    
+    def set_state(self, pid, state):
+        row = self._remove(pid)
+        row = row[:3] + (state,) + row[4:]
+        self._insert(row)
+        return row
+    
+    def get(self, pid):
+        return self.rows.get(pid)
+    
+    def with_state(self, state):
+        rows = self.rows
+        return [rows[pid] for pid in self.by_state.get(state, ())]
+    
+    def count(self, state):
+        return len(self.by_state.get(state, ()))
+    
+    def top(self, n):
+        """The n running processes with the lowest priority value."""
+        result = []
+        for priority in self.priorities:
+            for pid in self.by_priority[priority]:
+                result.append(self.rows[pid])
+                if len(result) >= n:
+                    return result
+        return result
+
+
+class KeyCache:
+    """Derived keys keyed by (password, salt, iterations), kept for `ttl`
+    seconds so repeated operations under one password pay for PBKDF2 once.
+    The password itself is only held as a digest."""
+    
+    def __init__(self, ttl=300.0, max_entries=64):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def derive(self, password, salt, iterations):
+        cache_key = (hashlib.sha256(password).digest(), salt, iterations)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(cache_key)
+            if entry is not None and entry[1] > now:
+                self.entries.move_to_end(cache_key)
+                self.hits += 1
+                return entry[0]
+        # Derive outside the lock; jobs on other threads keep going
+        key = hashlib.pbkdf2_hmac('sha256', password, salt, iterations)
+        with self.lock:
+            self.misses += 1
+            self.entries[cache_key] = (key, now + self.ttl)
+            self.entries.move_to_end(cache_key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        return key
+    
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+class StreamCipher:
+    """Chunked authenticated encryption for byte streams and files.
+    
+    Format: a header (magic, PBKDF2 iterations, salt, stream nonce, chunk
+    size) followed by frames of (length, final flag, ciphertext, tag).
+    Each chunk is sealed with AES-256-GCM under a per-stream key, with the
+    frame index as the GCM nonce and the whole header, index and final
+    flag as associated data. Frames can't be altered, reordered or dropped,
+    the header can't be edited, and a stream without its final frame is
+    rejected as truncated.
+    
+    Every stream gets a fresh random nonce, which is what lets all streams
+    in a session share one salt and therefore one cached key.
+    """
+    MAGIC = b"RSENC\x00\x00\x01"
+    HEADER = struct.Struct("<8sI16s16sI")
+    FRAME = struct.Struct("<IB")
+    INDEX = struct.Struct("<QB")
+    TAG_SIZE = 16
+    ITERATIONS = 100000
+    CHUNK_SIZE = 64 * 1024
+    MAX_CHUNK_SIZE = 16 * 1024 * 1024
+    
+    def __init__(self, key_cache=None, iterations=ITERATIONS):
+        self.keys = key_cache or KeyCache()
+        self.iterations = iterations
+        self.session_salt = os.urandom(16)
+    
+    def _cipher(self, password, salt, nonce):
+        if isinstance(password, str):
+            password = password.encode()
+        key = self.keys.derive(password, salt, self.iterations)
+        # GCM nonces only have to be unique per key, so each stream gets its
+        # own key and numbers its frames from zero
+        return AESGCM(hmac.digest(key, nonce, "sha256"))
+    
+    def _aad(self, header, index, final):
+        return header + self.INDEX.pack(index, final)
+    
+    def encrypt_stream(self, src, dst, password, chunk_size=CHUNK_SIZE, salt=None):
+        """Encrypt the readable binary stream `src` into `dst`. Returns the
+        number of plaintext bytes written."""
+        if not 0 < chunk_size <= self.MAX_CHUNK_SIZE:
+            raise ValueError(f"chunk size must be 1 to {self.MAX_CHUNK_SIZE} bytes")
+        salt = salt or self.session_salt
+        nonce = os.urandom(16)
+        cipher = self._cipher(password, salt, nonce)
+        header = self.HEADER.pack(self.MAGIC, self.iterations, salt, nonce, chunk_size)
+        dst.write(header)
+        
+        total = 0
+        index = 0
+        chunk = src.read(chunk_size)
+        while True:
+            # Read one ahead so the last frame can carry the final flag
+            following = src.read(chunk_size) if chunk else b""
+            final = 0 if following else 1
+            sealed = cipher.encrypt(index.to_bytes(12, "little"), chunk, self._aad(header, index, final))
+            dst.write(self.FRAME.pack(len(chunk), final))
+            dst.write(sealed)
+            total += len(chunk)
+            if final:
+                return total
+            index += 1
+            chunk = following
+    
+    def decrypt_stream(self, src, dst, password):
+        """Decrypt a framed stream from `src` into `dst`, verifying every frame
+        before writing it. Raises ValueError on a bad header, a failed tag
+        or truncation. Returns the number of plaintext bytes written."""
+        header = src.read(self.HEADER.size)
+        if len(header) != self.HEADER.size:
+            raise ValueError("not an encrypted stream")
+        magic, iterations, salt, nonce, chunk_size = self.HEADER.unpack(header)
+        if magic != self.MAGIC:
+            raise ValueError("not an encrypted stream")
+        # The header isn't authenticated until the first frame is, so check
+        # it before paying for a key derivation it asks for
+        if iterations != self.iterations or not 0 < chunk_size <= self.MAX_CHUNK_SIZE:
+            raise ValueError("unsupported stream parameters")
+        cipher = self._cipher(password, salt, nonce)
+        
+        total = 0
+        index = 0
+        while True:
+            frame = src.read(self.FRAME.size)
+            if len(frame) != self.FRAME.size:
+                raise ValueError("truncated stream")
+            length, final = self.FRAME.unpack(frame)
+            if length > chunk_size:
+                raise ValueError("corrupt frame")
+            sealed = src.read(length + self.TAG_SIZE)
+            if len(sealed) != length + self.TAG_SIZE:
+                raise ValueError("truncated stream")
+            try:
+                chunk = cipher.decrypt(index.to_bytes(12, "little"), sealed, self._aad(header, index, final))
+            except InvalidTag:
+                raise ValueError("authentication failed (wrong key or tampered data)")
+            dst.write(chunk)
+            total += length
+            if final:
+                return total
+            index += 1
+    
+    def encrypt_bytes(self, data, password, chunk_size=CHUNK_SIZE):
+        out = io.BytesIO()
+        self.encrypt_stream(io.BytesIO(data), out, password, chunk_size)
+        return out.getvalue()
+    
+    def decrypt_bytes(self, blob, password):
+        out = io.BytesIO()
+        self.decrypt_stream(io.BytesIO(blob), out, password)
+        return out.getvalue()
+    
+    def encrypt_file(self, src_path, dst_path, password, chunk_size=CHUNK_SIZE):
+        with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+            return self.encrypt_stream(src, dst, password, chunk_size)
+    
+    def decrypt_file(self, src_path, dst_path, password):
+        # Decrypt to a temp file first so a failed tag never leaves partial plaintext
+        tmp_path = dst_path + ".part"
+        try:
+            with open(src_path, "rb") as src, open(tmp_path, "wb") as dst:
+                total = self.decrypt_stream(src, dst, password)
+            os.replace(tmp_path, dst_path)
+            return total
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+
+def _rss_bytes():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        # ru_maxrss is a high-water mark in KiB (bytes on macOS), close enough here
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+SPARK_CHARS = "▁▂▃▄▅▆▇█"
+
+def sparkline(values):
+    """One block character per value, scaled between the min and max
+    present; None (no sample in that bucket) renders as a gap."""
+    present = [v for v in values if v is not None]
+    if not present:
+        return " " * len(values)
+    low, high = min(present), max(present)
+    scale = (len(SPARK_CHARS) - 1) / (high - low) if high > low else 0
+    return "".join(" " if v is None else SPARK_CHARS[int((v - low) * scale)] for v in values)
+
+
+class SeriesRing:
+    """Fixed-size ring of (start, cpu, cpu_max, memory, processes, samples)
+    rows for one resolution; the slot is (start // seconds) % capacity."""
+    
+    def __init__(self, seconds, capacity):
+        self.seconds = seconds
+        self.capacity = capacity
+        self.rows = [None] * capacity
+    
+    def slot(self, start):
+        return start // self.seconds % self.capacity
+    
+    def put(self, row):
+        self.rows[self.slot(row[0])] = row
+    
+    def window(self, count, now):
+        """The last `count` buckets up to the one containing `now`, with None
+        where the slot is empty or still holds an older lap's row."""
+        latest = now - now % self.seconds
+        result = []
+        for start in range(latest - (count - 1) * self.seconds, latest + 1, self.seconds):
+            row = self.rows[self.slot(start)]
+            result.append(row if row is not None and row[0] == start else None)
+        return result
+
+
+class StatusSampler:
+    """Samples CPU, memory and process count every `interval` seconds into
+    the status_samples rings and rolls them up 1s -> 1m -> 1h.
+    
+    The rings are mirrored in memory, so `stats` reads at most one ring's
+    worth of rows and never touches SQLite. 1s rows and closed 1m/1h buckets
+    are persisted through the batched log writer; the open 1m/1h buckets
+    are kept in memory only.
+    """
+    RESOLUTIONS = (("1s", 1, 3600), ("1m", 60, 1440), ("1h", 3600, 720))
+    UPSERT_SAMPLE = ("INSERT OR REPLACE INTO status_samples "
+                     "(resolution, slot, bucket, cpu, cpu_max, memory, processes, samples) "
+                     "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+    
+    def __init__(self, os_instance, interval=1.0):
+        self.os = os_instance
+        self.interval = interval
+        self.rings = [SeriesRing(seconds, capacity) for _, seconds, capacity in self.RESOLUTIONS]
+        self.open = [None] * len(self.RESOLUTIONS)
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.last_cpu = (time.monotonic(), time.process_time())
+        self.load()
+    
+    def load(self):
+        levels = {name: level for level, (name, _, _) in enumerate(self.RESOLUTIONS)}
+        with self.os.db_lock:
+            rows = self.os.db.execute("SELECT resolution, bucket, cpu, cpu_max, memory, processes, samples "
+                                      "FROM status_samples").fetchall()
+        for row in rows:
+            if row[0] in levels:
+                self.rings[levels[row[0]]].put(row[1:])
+    
+    def start(self):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="re_start-sampler", daemon=True)
+            self.thread.start()
+    
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join(timeout=self.interval * 2)
+    
+    def _run(self):
+        # Schedule against a fixed grid so sampling time doesn't cause drift
+        next_at = time.monotonic() + self.interval
+        while not self.stop_event.wait(max(0.0, next_at - time.monotonic())):
+            self.sample()
+            next_at += self.interval
+    
+    def read_metrics(self):
+        wall, cpu = time.monotonic(), time.process_time()
+        last_wall, last_cpu = self.last_cpu
+        self.last_cpu = (wall, cpu)
+        cpu_percent = 100.0 * (cpu - last_cpu) / (wall - last_wall) if wall > last_wall else 0.0
+        return cpu_percent, _rss_bytes() / (1024 * 1024), self.os.process_count()
+    
+    def sample(self, now=None):
+        now = int(time.time() if now is None else now)
+        cpu, memory, processes = self.read_metrics()
+        self.record(now, cpu, memory, processes)
+    
+    def record(self, now, cpu, memory, processes):
+        row = (now, cpu, cpu, memory, processes, 1)
+        with self.lock:
+            self._store(0, row)
+            self._feed(1, row)
+    
+    def _store(self, level, row):
+        ring = self.rings[level]
+        ring.put(row)
+        self.os.log_writer.add(self.UPSERT_SAMPLE, (self.RESOLUTIONS[level][0], ring.slot(row[0])) + row)
+    
+    def _feed(self, level, row):
+        seconds = self.RESOLUTIONS[level][1]
+        start = row[0] - row[0] % seconds
+        bucket = self.open[level]
+        if bucket is not None and bucket[0] != start:
+            closed = self._aggregate(bucket)
+            self._store(level, closed)
+            if level + 1 < len(self.RESOLUTIONS):
+                self._feed(level + 1, closed)
+            bucket = None
+        if bucket is None:
+            bucket = self.open[level] = [start, 0, 0.0, 0.0, 0.0, 0.0]
+        samples = row[5]
+        bucket[1] += samples
+        bucket[2] += row[1] * samples
+        bucket[3] = max(bucket[3], row[2])
+        bucket[4] += row[3] * samples
+        bucket[5] += row[4] * samples
+        # The open bucket is visible to stats but only persisted once closed
+        self.rings[level].put(self._aggregate(bucket))
+    
+    @staticmethod
+    def _aggregate(bucket):
+        start, samples, cpu, cpu_max, memory, processes = bucket
+        return (start, cpu / samples, cpu_max, memory / samples, processes / samples, samples)
+    
+    def series(self, resolution, count, now=None):
+        for level, (name, _, capacity) in enumerate(self.RESOLUTIONS):
+            if name == resolution:
+                break
+        else:
+            raise ValueError(f"unknown resolution: {resolution}")
+        now = int(time.time() if now is None else now)
+        with self.lock:
+            return self.rings[level].window(min(count, capacity), now)
+
+
 class REstartOS:
-    def __init__(self):
+    SESSION_KEY = b'secret_key'
+    # Tokens name the StreamCipher construction. Tokens from before it were
+    # tagged "AES-256", so decrypt_data still recognises that tag.
+    CIPHER = "AES-256-GCM"
+    CIPHER_ALIASES = ("AES-256-GCM", "AES-256")
+    INSERT_NETWORK_LOG = "INSERT INTO network_logs (event_type, details, created_at) VALUES (?, ?, ?)"
+    INSERT_ENCRYPTION_LOG = ("INSERT INTO encryption_logs (algorithm, plaintext, ciphertext, created_at) "
+                             "VALUES (?, ?, ?, ?)")
+    INSERT_PENTEST_RESULT = "INSERT INTO pentest_results (tool, target, result, created_at) VALUES (?, ?, ?, ?)"
+    INSERT_HISTORY = "INSERT INTO command_history (command, created_at) VALUES (?, ?)"
+    INSERT_PROCESS = "INSERT INTO processes (pid, name, priority, state, security) VALUES (?, ?, ?, ?, ?)"
+    UPSERT_PROCESS = ("INSERT OR REPLACE INTO processes (pid, name, priority, state, security, created_at) "
+                      "VALUES (?, ?, ?, ?, ?, COALESCE((SELECT created_at FROM processes WHERE pid=?), ?))")
+    
+    def __init__(self, db_path=DB_PATH):
         self.name = "RE_start"
         self.boot_time = datetime.now()
+        # One connection for the life of the OS; sqlite3 keeps the compiled
+        # statements for the constant SQL above in its per-connection cache.
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db_lock = threading.RLock()
+        self.log_writer = BatchWriter(self.db, self.db_lock)
+        self.crypto = StreamCipher()
         self.load_system_status()
         self.add_boot_processes()
+        self.sampler = StatusSampler(self)
+    
+    def shutdown(self):
+        self.sampler.stop()
+        self.log_writer.close()
+        with self.db_lock:
+            self.db.close()
         
     def load_system_status(self):
-        conn = sqlite3.connect('restart_os.db')
-        c = conn.cursor()
-        c.execute("SELECT security_level, memory_protection, user_mode, network_monitor, promiscuous_mode FROM system_status WHERE id=1")
-        status = c.fetchone()
-        conn.close()
+        with self.db_lock:
+            c = self.db.execute("SELECT security_level, memory_protection, user_mode, network_monitor, promiscuous_mode FROM system_status WHERE id=1")
+            status = c.fetchone()
         
         if status:
             self.security_level = status[0]
@@ -98,16 +617,13 @@ class REstartOS:
             }
     
     def save_system_status(self):
-        conn = sqlite3.connect('restart_os.db')
-        c = conn.cursor()
-        c.execute('''UPDATE system_status SET 
+        with self.db_lock, self.db:
+            self.db.execute('''UPDATE system_status SET 
                      security_level=?, memory_protection=?, user_mode=?, 
                      network_monitor=?, promiscuous_mode=?
                      WHERE id=1''', 
                  (self.security_level, int(self.memory_protection), int(self.user_mode),
                  int(self.network_stack["monitor_mode"]), int(self.network_stack["promiscuous_mode"])))
-        conn.commit()
-        conn.close()
     
     def add_boot_processes(self):
         boot_processes = [
@@ -119,48 +635,37 @@ class REstartOS:
             (6, "Driver Manager", 2, "Running", "User")
         ]
         
-        conn = sqlite3.connect('restart_os.db')
-        c = conn.cursor()
-        
-        # Clear existing processes and add boot processes
-        c.execute("DELETE FROM processes")
-        c.executemany("INSERT INTO processes (pid, name, priority, state, security) VALUES (?, ?, ?, ?, ?)", boot_processes)
+        with self.db_lock, self.db:
+            # Clear existing processes and add boot processes
+            self.db.execute("DELETE FROM processes")
+            self.db.executemany(self.INSERT_PROCESS, boot_processes)
         
-        conn.commit()
-        conn.close()
+        # The table is authoritative from here on; SQLite is written behind it
+        self.processes = ProcessTable(boot_processes, next_pid=max(p[0] for p in boot_processes) + 1)
+    
+    def _persist_process(self, row):
+        self.log_writer.add(self.UPSERT_PROCESS, row + (row[0], db_timestamp()))
     
     def create_process(self, name, priority=5, security="User"):
-        conn = sqlite3.connect('restart_os.db')
-        c = conn.cursor()
-        
-        # Find next available PID
-        c.execute("SELECT MAX(pid) FROM processes")
-        max_pid = c.fetchone()[0] or 100
-        pid = max_pid + 1
-        
-        c.execute("INSERT INTO processes (pid, name, priority, state, security) VALUES (?, ?, ?, ?, ?)",
-                 (pid, name, priority, "Running", security))
-        
-        conn.commit()
-        conn.close()
-        return pid
+        row = self.processes.spawn(name, priority, security)
+        self._persist_process(row)
+        return row[0]
     
     def terminate_process(self, pid):
-        conn = sqlite3.connect('restart_os.db')
-        c = conn.cursor()
-        c.execute("UPDATE processes SET state='Terminated' WHERE pid=?", (pid,))
-        updated = c.rowcount > 0
-        conn.commit()
-        conn.close()
-        return updated
+        row = self.processes.get(pid)
+        if row is None or row[3] != "Running":
+            return False
+        self._persist_process(self.processes.set_state(pid, "Terminated"))
+        return True
     
     def list_processes(self):
-        conn = sqlite3.connect('restart_os.db')
-        c = conn.cursor()
-        c.execute("SELECT pid, name, priority, state, security FROM processes WHERE state='Running' ORDER BY pid")
-        processes = c.fetchall()
-        conn.close()
-        return processes
+        return self.processes.with_state("Running")
+    
+    def process_count(self, state="Running"):
+        return self.processes.count(state)
+    
+    def top_processes(self, n=10):
+        return self.processes.top(n)
     
     def toggle_network_monitor(self):
         self.network_stack["monitor_mode"] = not self.network_stack["monitor_mode"]
@@ -177,35 +682,29 @@ class REstartOS:
         return self.network_stack["promiscuous_mode"]
     
     def log_network_event(self, event_type, details):
-        conn = sqlite3.connect('restart_os.db')
-        c = conn.cursor()
-        c.execute("INSERT INTO network_logs (event_type, details) VALUES (?, ?)", (event_type, details))
-        conn.commit()
-        conn.close()
+        self.log_writer.add(self.INSERT_NETWORK_LOG, (event_type, details, db_timestamp()))
     
     def log_encryption(self, algorithm, plaintext, ciphertext):
-        conn = sqlite3.connect('restart_os.db')
-        c = conn.cursor()
-        c.execute("INSERT INTO encryption_logs (algorithm, plaintext, ciphertext) VALUES (?, ?, ?)",
-                 (algorithm, plaintext, ciphertext))
-        conn.commit()
-        conn.close()
+        self.log_writer.add(self.INSERT_ENCRYPTION_LOG, (algorithm, plaintext, ciphertext, db_timestamp()))
     
     def log_pentest(self, tool, target, result):
-        conn = sqlite3.connect('restart_os.db')
-        c = conn.cursor()
-        c.execute("INSERT INTO pentest_results (tool, target, result) VALUES (?, ?, ?)",
-                 (tool, target, result))
-        conn.commit()
-        conn.close()
-    
-    def encrypt_data(self, data, algorithm="AES-256"):
-        if algorithm == "AES-256":
-            # Simulate encryption
-            salt = os.urandom(16)
-            key = hashlib.pbkdf2_hmac('sha256', b'secret_key', salt, 100000)
-            cipher_text = hashlib.sha256(data.encode()).hexdigest()
-            result = f"{algorithm}:{binascii.hexlify(salt).decode()}:{cipher_text}"
+        self.log_writer.add(self.INSERT_PENTEST_RESULT, (tool, target, result, db_timestamp()))
+    
+    def log_command(self, command):
+        self.log_writer.add(self.INSERT_HISTORY, (command, db_timestamp()))
+    
+    def load_history(self, limit=HISTORY_LIMIT):
+        """The newest `limit` commands from earlier sessions, oldest first."""
+        with self.db_lock:
+            rows = self.db.execute("SELECT command FROM (SELECT id, command FROM command_history "
+                                   "ORDER BY id DESC LIMIT ?) ORDER BY id", (limit,)).fetchall()
+        return [row[0] for row in rows]
+    
+    def encrypt_data(self, data, algorithm=CIPHER):
+        if algorithm == self.CIPHER:
+            # Session salt + per-message nonce: the key is derived once per TTL
+            token = self.crypto.encrypt_bytes(data.encode(), self.SESSION_KEY)
+            result = f"{algorithm}:{binascii.hexlify(token).decode()}"
         elif algorithm == "RSA-4096":
             # Simulate RSA
             result = f"{algorithm}:RSA_ENCRYPTED_{hashlib.sha256(data.encode()).hexdigest()[:20]}"
@@ -215,6 +714,18 @@ class REstartOS:
         self.log_encryption(algorithm, data, result)
         return result
     
+    def decrypt_data(self, text):
+        """Reverse encrypt_data for AES-256-GCM tokens. Raises ValueError if
+        the token isn't one of ours."""
+        algorithm, _, token = text.partition(":")
+        if algorithm not in self.CIPHER_ALIASES:
+            raise ValueError(f"cannot decrypt {algorithm or 'input'}")
+        try:
+            blob = binascii.unhexlify(token)
+        except binascii.Error:
+            raise ValueError("malformed token")
+        return self.crypto.decrypt_bytes(blob, self.SESSION_KEY).decode(errors="replace")
+    
     def run_pentest_tool(self, tool, target=""):
         if tool == "Port Scanner":
             ports = [21, 22, 80, 443, 8080, 8443, 3306, 5432]
@@ -239,52 +750,340 @@ class REstartOS:
 
 
 class MatrixAnimation(Canvas):
-    def __init__(self, parent, width, height, **kwargs):
+    """Binary rain for the header.
+    
+    The default "pooled" mode creates one text item per column once and
+    each frame only moves it and updates the glyph or colour when they
+    actually change. "redraw" is the original delete-and-recreate renderer,
+    kept for comparison. `show_stats` overlays the measured frame time.
+    """
+    FONT_SIZE = 14
+    SHADES = 8  # Quantised fade so fill changes are rare
+    
+    def __init__(self, parent, width, height, fps=20, mode="pooled", show_stats=False, **kwargs):
         super().__init__(parent, width=width, height=height, **kwargs)
         self.configure(bg='black', highlightthickness=0)
         self.width = width
         self.height = height
-        self.font_size = 14
+        self.font_size = self.FONT_SIZE
+        self.font = ('Courier', self.font_size, 'bold')
         self.columns = width // self.font_size
         self.drops = [0] * self.columns
         self.chars = "01" * 100  # Only 0s and 1s for binary look
+        self.mode = mode
+        self.show_stats = show_stats
+        self.set_fps(fps)
+        self.frame_times = []
+        self.stats_item = None
+        
+        self.items = []
+        self.item_state = []
+        if mode == "pooled":
+            for i in range(self.columns):
+                self.items.append(self.create_text(i * self.font_size, 0, text="", fill="#000000",
+                                                   font=self.font, anchor='nw', tag="matrix"))
+                self.item_state.append((None, None, None))
+        if show_stats:
+            self.stats_item = self.create_text(width - 4, 2, text="", fill="#ffff00",
+                                               font=('Courier', 9), anchor='ne', tag="stats")
+        
         self.running = True
-        self.after(50, self.animate)
+        self.after(self.interval, self.animate)
+    
+    def set_fps(self, fps):
+        self.fps = max(1, min(int(fps), 120))
+        self.interval = 1000 // self.fps
+    
+    def _column_color(self, y):
+        # Create fading effect - characters further down are dimmer
+        intensity = max(50, 255 - (y * 255 // self.height))
+        step = 255 // self.SHADES
+        intensity = min(255, max(50, intensity // step * step + step // 2))
+        return f'#00{intensity:02x}00'  # Green with varying intensity
+    
+    def _advance(self, i, y):
+        # Reset drop if it reached the bottom or randomly
+        if y > self.height or random.random() > 0.95:
+            self.drops[i] = 0
+        else:
+            self.drops[i] += 1
     
     def animate(self):
         if not self.running:
             return
+        start = time.perf_counter()
+        
+        if self.mode == "pooled":
+            self._render_pooled()
+        else:
+            self._render_redraw()
+        
+        elapsed = time.perf_counter() - start
+        if self.show_stats:
+            self._update_stats(elapsed)
+        # Hold the target rate by subtracting the time this frame took
+        self.after(max(1, self.interval - int(elapsed * 1000)), self.animate)
+    
+    def _render_pooled(self):
+        for i, item in enumerate(self.items):
+            x = i * self.font_size
+            y = self.drops[i] * self.font_size
+            char = random.choice(self.chars)
+            color = self._column_color(y)
+            old_y, old_char, old_color = self.item_state[i]
+            
+            if y != old_y:
+                self.coords(item, x, y)
+            if char != old_char and color != old_color:
+                self.itemconfig(item, text=char, fill=color)
+            elif char != old_char:
+                self.itemconfig(item, text=char)
+            elif color != old_color:
+                self.itemconfig(item, fill=color)
+            self.item_state[i] = (y, char, color)
             
+            self._advance(i, y)
+    
+    def _render_redraw(self):
         self.delete("matrix")
         
-        # Set text color with some variation
         for i in range(len(self.drops)):
             char = random.choice(self.chars)
             x = i * self.font_size
             y = self.drops[i] * self.font_size
             
-            # Create fading effect - characters further down are dimmer
-            intensity = max(50, 255 - (y * 255 // self.height))
-            color = f'#00{intensity:02x}00'  # Green with varying intensity
-            
-            self.create_text(x, y, text=char, fill=color, 
-                           font=('Courier', self.font_size, 'bold'), 
-                           anchor='nw', tag="matrix")
+            self.create_text(x, y, text=char, fill=self._column_color(y),
+                             font=self.font, anchor='nw', tag="matrix")
             
-            # Reset drop if it reached the bottom or randomly
-            if y > self.height or random.random() > 0.95:
-                self.drops[i] = 0
-            else:
-                self.drops[i] += 1
-        
-        self.after(50, self.animate)
+            self._advance(i, y)
+    
+    def _update_stats(self, elapsed):
+        self.frame_times.append(elapsed)
+        if len(self.frame_times) < self.fps:
+            return
+        # Refresh the overlay about once a second
+        average = sum(self.frame_times) / len(self.frame_times)
+        worst = max(self.frame_times)
+        self.frame_times = []
+        self.itemconfig(self.stats_item,
+                        text=f"{self.mode} {self.fps}fps  frame {average * 1000:.2f}ms avg {worst * 1000:.2f}ms max")
+        self.tag_raise("stats")
     
     def stop(self):
         self.running = False
 
 
+class JobCancelled(Exception):
+    pass
+
+
+class Job:
+    """Handle given to a command running on the worker pool. Jobs never
+    touch Tk directly; write() queues output for the UI thread and both
+    write() and sleep() raise JobCancelled once the job is cancelled."""
+    
+    def __init__(self, job_id, command, output):
+        self.id = job_id
+        self.command = command
+        self.output = output
+        self.state = "Running"
+        self.started = time.monotonic()
+        self.future = None
+        self.cancel_event = threading.Event()
+    
+    def write(self, text, tag=None):
+        self.check()
+        self.output.put((text, tag))
+    
+    def sleep(self, seconds):
+        if self.cancel_event.wait(seconds):
+            raise JobCancelled()
+    
+    def check(self):
+        if self.cancel_event.is_set():
+            raise JobCancelled()
+
+
+class JobManager:
+    """Runs long commands on a thread pool and drains their output into the
+    terminal from the Tk event loop with root.after."""
+    
+    def __init__(self, root, add_output, max_workers=4, poll_ms=50):
+        self.root = root
+        self.add_output = add_output
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="re_start-job")
+        self.output = queue.Queue()
+        self.jobs = {}
+        self.next_id = 1
+        self.stopped = False
+        self.root.after(self.poll_ms, self.drain)
+    
+    def submit(self, command, func, *args):
+        job = Job(self.next_id, command, self.output)
+        self.next_id += 1
+        self.jobs[job.id] = job
+        job.future = self.executor.submit(self._run, job, func, args)
+        return job
+    
+    def _run(self, job, func, args):
+        try:
+            func(job, *args)
+            job.state = "Done"
+        except JobCancelled:
+            job.state = "Cancelled"
+        except Exception as e:
+            job.state = "Failed"
+            self.output.put((f"{job.command}: {e}\n", "error"))
+        self.output.put((f"[{job.id}]  {job.state}\t{job.command}\n", "system"))
+    
+    def drain(self):
+        if self.stopped:
+            return
+        try:
+            # Bounded so a chatty job can't starve key handling
+            for _ in range(500):
+                text, tag = self.output.get_nowait()
+                self.add_output(text, tag)
+        except queue.Empty:
+            pass
+        self.root.after(self.poll_ms, self.drain)
+    
+    def running(self):
+        return [job for job in self.jobs.values() if job.state == "Running"]
+    
+    def cancel(self, job):
+        job.cancel_event.set()
+        if job.future.cancel():
+            # Never started, so _run won't report it
+            job.state = "Cancelled"
+            self.output.put((f"[{job.id}]  Cancelled\t{job.command}\n", "system"))
+    
+    def cancel_latest(self):
+        running = self.running()
+        if not running:
+            return None
+        self.cancel(running[-1])
+        return running[-1]
+    
+    def list_and_prune(self):
+        """Snapshot for the jobs command; finished jobs are shown once."""
+        snapshot = list(self.jobs.values())
+        for job in snapshot:
+            if job.state != "Running":
+                del self.jobs[job.id]
+        return snapshot
+    
+    def shutdown(self):
+        for job in self.running():
+            self.cancel(job)
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.stopped = True
+
+
+class PrefixIndex:
+    """Sorted word list; a prefix query is two bisects and a slice."""
+    
+    def __init__(self, words=()):
+        self.words = sorted(set(words))
+    
+    def add(self, word):
+        i = bisect.bisect_left(self.words, word)
+        if i == len(self.words) or self.words[i] != word:
+            self.words.insert(i, word)
+    
+    def discard(self, word):
+        i = bisect.bisect_left(self.words, word)
+        if i < len(self.words) and self.words[i] == word:
+            del self.words[i]
+    
+    def complete(self, prefix):
+        lo = bisect.bisect_left(self.words, prefix)
+        hi = bisect.bisect_left(self.words, prefix + "\U0010ffff", lo)
+        return self.words[lo:hi]
+    
+    def __len__(self):
+        return len(self.words)
+
+
+class CommandHistory:
+    """Command history with an n-gram index for Ctrl+R.
+    
+    Every 1-, 2- and 3-character substring of an entry maps to the ascending
+    positions containing it. A search walks the shortest posting list of the
+    query's grams backwards from the cursor and confirms with `in`, so it
+    only ever looks at entries that can match.
+    
+    Loaded history is indexed in slices by index_pending() so a long history
+    doesn't delay startup; search() catches up on anything left first.
+    """
+    GRAM = 3
+    
+    def __init__(self, entries=()):
+        self.entries = list(entries)
+        self.postings = {}
+        self.indexed = 0
+    
+    def append(self, command):
+        self.entries.append(command)
+    
+    def index_pending(self, budget=None):
+        """Index up to `budget` unindexed entries; True once all are done."""
+        entries = self.entries
+        stop = len(entries) if budget is None else min(len(entries), self.indexed + budget)
+        postings = self.postings
+        gram_sizes = range(1, self.GRAM + 1)
+        for position in range(self.indexed, stop):
+            command = entries[position]
+            grams = {command[i:i + n] for n in gram_sizes for i in range(len(command) - n + 1)}
+            for gram in grams:
+                positions = postings.get(gram)
+                if positions is None:
+                    positions = postings[gram] = array('I')
+                positions.append(position)
+        self.indexed = stop
+        return stop == len(entries)
+    
+    def search(self, query, before=None):
+        """Position of the newest entry before `before` containing `query`,
+        or -1 if there is none."""
+        if before is None:
+            before = len(self.entries)
+        if not query:
+            return -1
+        if self.indexed < len(self.entries):
+            self.index_pending()
+        n = min(self.GRAM, len(query))
+        shortest = None
+        for i in range(len(query) - n + 1):
+            positions = self.postings.get(query[i:i + n])
+            if positions is None:
+                return -1
+            if shortest is None or len(positions) < len(shortest):
+                shortest = positions
+        
+        entries = self.entries
+        i = bisect.bisect_left(shortest, before) - 1
+        while i >= 0:
+            position = shortest[i]
+            if query in entries[position]:
+                return position
+            i -= 1
+        return -1
+    
+    def __len__(self):
+        return len(self.entries)
+    
+    def __getitem__(self, position):
+        return self.entries[position]
+
+
 class TerminalUI:
-    def __init__(self, root):
+    COMMANDS = ("help", "clear", "ps", "top", "start", "kill", "drivers", "fs",
+                "mem", "mode", "net", "encrypt", "decrypt", "pentest", "history", "jobs", "stats", "exit")
+    NET_COMMANDS = ("monitor", "promisc", "scan")
+    
+    def __init__(self, root, matrix_options=None):
         self.root = root
         self.root.title("RE_start OS - Ethical Hacking Environment")
         self.root.geometry("1000x750")
@@ -298,8 +1097,14 @@ class TerminalUI:
         
         self.os = REstartOS()
         self.current_dir = "/root"
-        self.command_history = []
-        self.history_index = -1
+        self.os.sampler.start()
+        self.history = CommandHistory(self.os.load_history())
+        self.root.after_idle(self.index_history)
+        self.history_index = len(self.history)
+        self.search = None
+        self.command_index = PrefixIndex(self.COMMANDS)
+        self.pid_index = PrefixIndex(str(p[0]) for p in self.os.list_processes())
+        self.file_indexes = {}
         
         # Create custom style
         self.style = ttk.Style()
@@ -313,7 +1118,7 @@ class TerminalUI:
         header_frame.pack(fill=tk.X, padx=10, pady=10)
         
         # Create Matrix animation canvas
-        self.matrix = MatrixAnimation(header_frame, width=900, height=80)
+        self.matrix = MatrixAnimation(header_frame, width=900, height=80, **(matrix_options or {}))
         self.matrix.pack()
         
         # Add OS name label on top of the Matrix animation
@@ -397,6 +1202,9 @@ class TerminalUI:
         self.cmd_entry.bind("<Up>", self.history_up)
         self.cmd_entry.bind("<Down>", self.history_down)
         self.cmd_entry.bind("<Tab>", self.tab_complete)
+        self.cmd_entry.bind("<Control-c>", self.interrupt_job)
+        self.cmd_entry.bind("<Control-r>", self.reverse_search)
+        self.cmd_entry.bind("<Key>", self.search_key)
         self.cmd_entry.focus()
         
         # Configure tags for colored output
@@ -406,6 +1214,9 @@ class TerminalUI:
         self.output.tag_config("highlight", foreground="#00ffff")
         self.output.tag_config("system", foreground="#00aaff")
         
+        # Long-running commands (scans, crypto, pentests) run off the UI thread
+        self.jobs = JobManager(self.root, self.add_output)
+        
         # Start blinking cursor simulation
         self.cursor_visible = True
         self.blink_cursor()
@@ -414,7 +1225,7 @@ class TerminalUI:
         status_text = (f"Security Level: {self.os.security_level} | "
                       f"Uptime: {self.get_uptime()} | "
                       f"Mode: {'User' if self.os.user_mode else 'Kernel'} | "
-                      f"Processes: {len(self.os.list_processes())} | "
+                      f"Processes: {self.os.process_count()} | "
                       f"Network: {'MON' if self.os.network_stack['monitor_mode'] else ''} "
                       f"{'PROM' if self.os.network_stack['promiscuous_mode'] else ''}")
         self.status_var.set(status_text)
@@ -436,7 +1247,9 @@ class TerminalUI:
         self.output.config(state=tk.DISABLED)
     
     def blink_cursor(self):
-        if self.cursor_visible:
+        if self.search is not None:
+            pass  # The search prompt stays put
+        elif self.cursor_visible:
             self.prompt.config(text=f"root@RE_start:{self.current_dir}# ")
         else:
             self.prompt.config(text=f"root@RE_start:{self.current_dir}$ ")
@@ -445,14 +1258,16 @@ class TerminalUI:
         self.root.after(500, self.blink_cursor)
     
     def execute_command(self, event=None):
+        self._end_search()
         command = self.cmd_entry.get().strip()
         self.cmd_entry.delete(0, tk.END)
         
         if not command:
             return
         
-        self.command_history.append(command)
-        self.history_index = len(self.command_history)
+        self.history.append(command)
+        self.history_index = len(self.history)
+        self.os.log_command(command)
         
         self.add_output(f"root@RE_start:{self.current_dir}# {command}\n")
         
@@ -468,6 +1283,8 @@ class TerminalUI:
             self.output.config(state=tk.DISABLED)
         elif primary_cmd == "ps":
             self.list_processes()
+        elif primary_cmd == "top":
+            self.show_top(cmd_parts[1:])
         elif primary_cmd == "start":
             self.start_process(cmd_parts[1:])
         elif primary_cmd == "kill":
@@ -489,39 +1306,153 @@ class TerminalUI:
         elif primary_cmd == "pentest":
             self.run_pentest(cmd_parts[1:])
         elif primary_cmd == "history":
-            self.show_history()
+            self.show_history(cmd_parts[1:])
+        elif primary_cmd == "jobs":
+            self.show_jobs()
+        elif primary_cmd == "stats":
+            self.show_stats(cmd_parts[1:])
         elif primary_cmd == "exit":
             self.shutdown_os()
         else:
             self.add_output(f"Command not found: {primary_cmd}\n", "error")
     
     def history_up(self, event):
-        if self.command_history:
+        self._end_search()
+        if len(self.history):
             if self.history_index > 0:
                 self.history_index -= 1
             self.cmd_entry.delete(0, tk.END)
-            self.cmd_entry.insert(0, self.command_history[self.history_index])
+            self.cmd_entry.insert(0, self.history[self.history_index])
     
     def history_down(self, event):
-        if self.command_history:
-            if self.history_index < len(self.command_history) - 1:
+        self._end_search()
+        if len(self.history):
+            if self.history_index < len(self.history) - 1:
                 self.history_index += 1
                 self.cmd_entry.delete(0, tk.END)
-                self.cmd_entry.insert(0, self.command_history[self.history_index])
+                self.cmd_entry.insert(0, self.history[self.history_index])
             else:
-                self.history_index = len(self.command_history)
+                self.history_index = len(self.history)
                 self.cmd_entry.delete(0, tk.END)
     
+    def index_history(self):
+        if not self.history.index_pending(1000):
+            self.root.after(10, self.index_history)
+    
+    def reverse_search(self, event=None):
+        if self.search is None:
+            # Start searching from the newest entry
+            self.search = {"query": "", "position": len(self.history), "saved": self.cmd_entry.get()}
+        elif self.search["query"]:
+            # Ctrl+R again: next older match
+            self._search_from(self.search["position"])
+        self._show_search()
+        return "break"
+    
+    def search_key(self, event):
+        search = self.search
+        if search is None:
+            return None
+        if event.keysym == "Escape" or (event.keysym == "g" and event.state & 0x4):
+            self._end_search()
+            self._set_entry(search["saved"])
+            return "break"
+        if event.keysym == "BackSpace":
+            search["query"] = search["query"][:-1]
+            self._search_from(len(self.history))
+        elif event.char and event.char.isprintable() and not event.state & 0x4:
+            search["query"] += event.char
+            # Keep the current match if it still contains the longer query
+            self._search_from(min(search["position"] + 1, len(self.history)))
+        elif event.keysym in ("Shift_L", "Shift_R", "Control_L", "Control_R"):
+            return "break"
+        else:
+            # Any other key accepts the match for editing. Return, Tab,
+            # Up/Down and Ctrl+C have their own bindings and end it there.
+            self._end_search()
+            return None
+        self._show_search()
+        return "break"
+    
+    def _search_from(self, before):
+        position = self.history.search(self.search["query"], before)
+        if position >= 0:
+            self.search["position"] = position
+            self.search["failed"] = False
+        else:
+            self.search["failed"] = True
+    
+    def _show_search(self):
+        search = self.search
+        label = "failed reverse-i-search" if search.get("failed") else "reverse-i-search"
+        self.prompt.config(text=f"({label})`{search['query']}': ")
+        if search["query"] and search["position"] < len(self.history):
+            self._set_entry(self.history[search["position"]])
+        elif not search["query"]:
+            self._set_entry("")
+    
+    def _end_search(self):
+        if self.search is not None:
+            self.search = None
+            self.prompt.config(text=f"root@RE_start:{self.current_dir}# ")
+    
+    def _set_entry(self, text):
+        self.cmd_entry.delete(0, tk.END)
+        self.cmd_entry.insert(0, text)
+    
+    def completions(self, line):
+        """Candidates for the last word of `line`: command names first,
+        then PIDs for kill, net subcommands, or file names."""
+        words = line.split(" ")
+        word = words[-1]
+        if len(words) == 1:
+            return self.command_index.complete(word.lower())
+        command = words[0].lower()
+        if command == "kill":
+            return self.pid_index.complete(word)
+        if command == "net" and len(words) == 2:
+            return [name for name in self.NET_COMMANDS if name.startswith(word.lower())]
+        return self._file_completions(word)
+    
+    def _file_completions(self, word):
+        if "/" in word:
+            directory, _, prefix = word.rpartition("/")
+            path = os.path.expanduser(directory or "/")
+            head = directory + "/"
+        else:
+            path, prefix, head = ".", word, ""
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return []
+        cached = self.file_indexes.get(path)
+        if cached is None or cached[0] != mtime:
+            # Re-list a directory only when it has changed
+            names = []
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    names.append(entry.name + "/" if entry.is_dir() else entry.name)
+            cached = self.file_indexes[path] = (mtime, PrefixIndex(names))
+        return [head + name for name in cached[1].complete(prefix)]
+    
     def tab_complete(self, event):
-        current = self.cmd_entry.get().lower()
-        commands = ["help", "clear", "ps", "start", "kill", "drivers", "fs", 
-                   "mem", "mode", "net", "encrypt", "decrypt", "pentest", "history", "exit"]
-        
-        matches = [cmd for cmd in commands if cmd.startswith(current)]
+        self._end_search()
+        current = self.cmd_entry.get()
+        matches = self.completions(current)
+        if not matches:
+            return "break"
         
-        if matches:
-            self.cmd_entry.delete(0, tk.END)
-            self.cmd_entry.insert(0, matches[0])
+        word = current.split(" ")[-1]
+        common = os.path.commonprefix(matches)
+        if len(matches) == 1 and not common.endswith("/"):
+            common += " "
+        if len(common) > len(word):
+            self._set_entry(current[:len(current) - len(word)] + common)
+        elif len(matches) > 1:
+            # Nothing more to fill in: show the choices like a second Tab would
+            shown = matches[:50]
+            more = f" ... ({len(matches) - len(shown)} more)" if len(matches) > len(shown) else ""
+            self.add_output("  ".join(shown) + more + "\n")
         
         return "break"
     
@@ -531,6 +1462,7 @@ class TerminalUI:
           help          - Show this help message
           clear         - Clear terminal screen
           ps            - List running processes
+          top [n]       - Show the n highest-priority processes
           start <name>  - Start a new process
           kill <pid>    - Terminate a process by PID
           drivers       - List loaded drivers
@@ -538,10 +1470,12 @@ class TerminalUI:
           mem           - Show memory protection status
           mode          - Show current execution mode
           net [cmd]     - Network operations (monitor, promisc, scan)
-          encrypt <text> - Encrypt text using AES-256
+          encrypt <text> - Encrypt text using AES-256-GCM
           decrypt <cipher> - Decrypt text (simulated)
           pentest [tool] [target] - Run penetration testing tools
-          history       - Show command history
+          history [n]   - Show the last n commands (Ctrl+R searches)
+          jobs          - List background jobs (Ctrl+C cancels the newest)
+          stats [1s|1m|1h] [n] - Sparklines of CPU, memory and processes
           exit          - Shutdown the OS
         """
         self.add_output(textwrap.dedent(help_text), "system")
@@ -553,6 +1487,20 @@ class TerminalUI:
         for p in processes:
             self.add_output(f"{p[0]}\t{p[1][:12]}\t{p[2]}\t\t{p[3]}\t{p[4]}\n")
     
+    def show_top(self, args):
+        try:
+            n = int(args[0]) if args else 10
+        except ValueError:
+            self.add_output("Usage: top [count]\n", "error")
+            return
+        
+        processes = self.os.top_processes(n)
+        self.add_output(f"Tasks: {self.os.process_count()} running\n", "highlight")
+        self.add_output("PRI\tPID\tName\t\tSecurity\n", "highlight")
+        self.add_output("="*60 + "\n")
+        for p in processes:
+            self.add_output(f"{p[2]}\t{p[0]}\t{p[1][:12]}\t\t{p[4]}\n")
+    
     def start_process(self, args):
         if not args:
             self.add_output("Usage: start <process_name>\n", "error")
@@ -560,6 +1508,7 @@ class TerminalUI:
             
         name = " ".join(args)
         pid = self.os.create_process(name)
+        self.pid_index.add(str(pid))
         self.add_output(f"Started process '{name}' with PID {pid}\n", "success")
     
     def kill_process(self, args):
@@ -570,6 +1519,7 @@ class TerminalUI:
         try:
             pid = int(args[0])
             if self.os.terminate_process(pid):
+                self.pid_index.discard(str(pid))
                 self.add_output(f"Process {pid} terminated\n", "success")
             else:
                 self.add_output(f"No running process with PID {pid}\n", "error")
@@ -618,35 +1568,65 @@ class TerminalUI:
             self.add_output(f"Promiscuous mode {status}\n", "success")
         elif cmd == "scan":
             target = args[1] if len(args) > 1 else "192.168.1.0/24"
-            self.add_output(f"Scanning network: {target}\n", "highlight")
-            self.add_output("Discovering hosts...\n")
-            
-            # Simulate scanning with realistic output
-            self.add_output("Starting Nmap 7.92 ( https://nmap.org ) at UTC\n")
-            time.sleep(0.5)
-            
-            hosts = random.randint(5, 20)
-            for i in range(hosts):
-                ip = f"192.168.1.{random.randint(1, 254)}"
-                mac = ":".join(f"{random.randint(0, 255):02x}" for _ in range(6))
-                self.add_output(f"Discovered host: {ip} [MAC: {mac}]\n")
-                time.sleep(0.1)
-            
-            self.add_output(f"Nmap scan report for {target}\n", "highlight")
-            self.add_output(f"Hosts: {hosts} up | Latency: {random.uniform(0.1, 5.0):.2f}ms\n")
-            self.add_output("Scan complete.\n", "success")
+            self.start_job(f"net scan {target}", self._network_scan_job, target)
         else:
             self.add_output(f"Unknown network command: {cmd}\n", "error")
     
+    def start_job(self, command, func, *args):
+        job = self.jobs.submit(command, func, *args)
+        self.add_output(f"[{job.id}] {command}\n", "system")
+    
+    def interrupt_job(self, event=None):
+        if self.search is not None:
+            self._set_entry(self.search["saved"])
+            self._end_search()
+            return "break"
+        job = self.jobs.cancel_latest()
+        if job is None:
+            return None  # Nothing running: leave Ctrl+C as copy
+        self.add_output(f"^C [{job.id}] {job.command}\n", "warning")
+        return "break"
+    
+    def show_jobs(self):
+        jobs = self.jobs.list_and_prune()
+        if not jobs:
+            self.add_output("No jobs\n")
+            return
+        now = time.monotonic()
+        for job in jobs:
+            self.add_output(f"[{job.id}]  {job.state:<10}{now - job.started:6.1f}s  {job.command}\n")
+    
+    def _network_scan_job(self, job, target):
+        job.write(f"Scanning network: {target}\n", "highlight")
+        job.write("Discovering hosts...\n")
+        
+        # Simulate scanning with realistic output
+        job.write("Starting Nmap 7.92 ( https://nmap.org ) at UTC\n")
+        job.sleep(0.5)
+        
+        hosts = random.randint(5, 20)
+        for i in range(hosts):
+            ip = f"192.168.1.{random.randint(1, 254)}"
+            mac = ":".join(f"{random.randint(0, 255):02x}" for _ in range(6))
+            job.write(f"Discovered host: {ip} [MAC: {mac}]\n")
+            job.sleep(0.1)
+        
+        job.write(f"Nmap scan report for {target}\n", "highlight")
+        job.write(f"Hosts: {hosts} up | Latency: {random.uniform(0.1, 5.0):.2f}ms\n")
+        job.write("Scan complete.\n", "success")
+    
     def encrypt_data(self, args):
         if not args:
             self.add_output("Usage: encrypt <text>\n", "error")
             return
             
         text = " ".join(args)
+        self.start_job("encrypt", self._encrypt_job, text)
+    
+    def _encrypt_job(self, job, text):
         encrypted = self.os.encrypt_data(text)
-        self.add_output(f"Encrypted data: {encrypted}\n", "highlight")
-        self.add_output("Algorithm: AES-256 with PBKDF2 key derivation\n")
+        job.write(f"Encrypted data: {encrypted}\n", "highlight")
+        job.write("Algorithm: AES-256-GCM with PBKDF2 key derivation\n")
     
     def decrypt_data(self, args):
         if not args:
@@ -654,17 +1634,26 @@ class TerminalUI:
             return
             
         cipher = " ".join(args)
-        self.add_output("Decrypting data...\n")
+        self.start_job("decrypt", self._decrypt_job, cipher)
+    
+    def _decrypt_job(self, job, cipher):
+        job.write("Decrypting data...\n")
         
         # Simulate decryption process
-        self.add_output("Accessing key vault...\n")
-        time.sleep(0.5)
-        self.add_output("Verifying key integrity...\n")
-        time.sleep(0.3)
-        self.add_output("Applying decryption algorithm...\n")
-        time.sleep(0.7)
-        
-        # Generate fake plaintext
+        job.write("Accessing key vault...\n")
+        job.sleep(0.5)
+        job.write("Verifying key integrity...\n")
+        job.sleep(0.3)
+        job.write("Applying decryption algorithm...\n")
+        job.sleep(0.7)
+        
+        try:
+            job.write(f"Decrypted text: {self.os.decrypt_data(cipher)}\n", "success")
+            return
+        except ValueError:
+            pass
+        
+        # Not one of our tokens: generate fake plaintext
         texts = [
             "The quick brown fox jumps over the lazy dog",
             "Security is a process, not a product",
@@ -673,7 +1662,7 @@ class TerminalUI:
             "RE_start OS provides unparalleled security"
         ]
         
-        self.add_output(f"Decrypted text: {random.choice(texts)}\n", "success")
+        job.write(f"Decrypted text: {random.choice(texts)}\n", "success")
     
     def run_pentest(self, args):
         if not args:
@@ -697,27 +1686,65 @@ class TerminalUI:
         if tool not in tools:
             self.add_output(f"Unknown tool: {tool}\n", "error")
             return
-            
-        self.add_output(f"Starting {tool} on {target}...\n", "highlight")
+        
+        self.start_job(f"pentest {tool} {target}", self._pentest_job, tool, target)
+    
+    def _pentest_job(self, job, tool, target):
+        job.write(f"Starting {tool} on {target}...\n", "highlight")
         
         # Add realistic scanning animation
-        self.add_output("[")
+        job.write("[")
         for _ in range(20):
-            self.add_output("#")
-            self.root.update()
-            time.sleep(0.05)
-        self.add_output("]\n")
+            job.write("#")
+            job.sleep(0.05)
+        job.write("]\n")
         
         result = self.os.run_pentest_tool(tool, target)
-        self.add_output(result + "\n", "success")
-        self.add_output("Operation completed successfully.\n")
+        job.write(result + "\n", "success")
+        job.write("Operation completed successfully.\n")
     
-    def show_history(self):
+    def show_stats(self, args):
+        resolution = "1s"
+        count = 60
+        for arg in args:
+            if arg in ("1s", "1m", "1h"):
+                resolution = arg
+            elif arg.isdigit() and int(arg) > 0:
+                count = int(arg)
+            else:
+                self.add_output("Usage: stats [1s|1m|1h] [count]\n", "error")
+                return
+        
+        rows = self.os.sampler.series(resolution, count)
+        present = [row for row in rows if row is not None]
+        if not present:
+            self.add_output(f"No {resolution} samples yet\n", "warning")
+            return
+        
+        self.add_output(f"Last {len(rows)} x {resolution} ({len(present)} with samples)\n", "highlight")
+        for label, field in (("CPU %", 1), ("CPU max %", 2), ("Memory MB", 3), ("Processes", 4)):
+            values = [None if row is None else row[field] for row in rows]
+            numbers = [row[field] for row in present]
+            self.add_output(f"{label:<10} {sparkline(values)}  "
+                            f"min {min(numbers):.1f} avg {sum(numbers) / len(numbers):.1f} max {max(numbers):.1f}\n")
+    
+    def show_history(self, args):
+        try:
+            count = int(args[0]) if args else 100
+        except ValueError:
+            self.add_output("Usage: history [count]\n", "error")
+            return
+        
         self.add_output("Command history:\n", "highlight")
-        for i, cmd in enumerate(self.command_history, 1):
-            self.add_output(f"{i}: {cmd}\n")
+        # History persists across sessions, so only show the tail
+        start = max(0, len(self.history) - count)
+        lines = [f"{i}: {self.history[i - 1]}\n" for i in range(start + 1, len(self.history) + 1)]
+        self.add_output("".join(lines))
     
     def shutdown_os(self):
+        # No more commands: the database and job pool close below, well
+        # before the window does
+        self.cmd_entry.configure(state="disabled")
         self.add_output("Initiating system shutdown...\n", "system")
         self.add_output("Terminating processes...\n")
         self.add_output("Saving system state...\n")
@@ -725,10 +1752,229 @@ class TerminalUI:
         self.add_output("Stopping network services...\n")
         self.add_output("RE_start OS shutdown complete.\n\n", "highlight")
         self.matrix.stop()
+        self.jobs.shutdown()
+        self.os.shutdown()
         self.root.after(2000, self.root.destroy)
 
 
+def benchmark_logging(events=5000):
+    """Log events per second with a connection per insert (the old way)
+    versus the shared connection and BatchWriter."""
+    with tempfile.TemporaryDirectory() as tmp:
+        before_db = os.path.join(tmp, "before.db")
+        init_database(before_db)
+        start = time.perf_counter()
+        for i in range(events):
+            conn = sqlite3.connect(before_db)
+            conn.execute("INSERT INTO network_logs (event_type, details) VALUES (?, ?)", ("BENCH", f"event {i}"))
+            conn.commit()
+            conn.close()
+        before = events / (time.perf_counter() - start)
+        
+        after_db = os.path.join(tmp, "after.db")
+        init_database(after_db)
+        os_instance = REstartOS(after_db)
+        start = time.perf_counter()
+        for i in range(events):
+            os_instance.log_network_event("BENCH", f"event {i}")
+        os_instance.log_writer.flush()
+        after = events / (time.perf_counter() - start)
+        os_instance.shutdown()
+    
+    print(f"{events} log events: {before:,.0f}/s before, {after:,.0f}/s after ({after / before:.0f}x)")
+
+
+def benchmark_crypto(megabytes=64, payloads=200):
+    """ops/s for small payloads with a PBKDF2 per call (the old way) versus
+    the cached session key, and streaming MB/s across chunk sizes."""
+    crypto = StreamCipher()
+    message = b"x" * 256
+    
+    calls = max(payloads // 20, 5)
+    start = time.perf_counter()
+    for _ in range(calls):
+        crypto.keys.clear()
+        crypto.session_salt = os.urandom(16)
+        crypto.encrypt_bytes(message, REstartOS.SESSION_KEY)
+    uncached = calls / (time.perf_counter() - start)
+    
+    crypto.encrypt_bytes(message, REstartOS.SESSION_KEY)
+    start = time.perf_counter()
+    for _ in range(payloads):
+        crypto.encrypt_bytes(message, REstartOS.SESSION_KEY)
+    cached = payloads / (time.perf_counter() - start)
+    print(f"256 B payloads: {uncached:,.1f} ops/s deriving per call, {cached:,.0f} ops/s cached "
+          f"({cached / uncached:,.0f}x)")
+    
+    data = os.urandom(1024 * 1024) * megabytes
+    for chunk_size in (4 * 1024, 64 * 1024, 1024 * 1024):
+        sealed = io.BytesIO()
+        start = time.perf_counter()
+        crypto.encrypt_stream(io.BytesIO(data), sealed, REstartOS.SESSION_KEY, chunk_size)
+        encrypt = time.perf_counter() - start
+        
+        sealed.seek(0)
+        plain = io.BytesIO()
+        start = time.perf_counter()
+        crypto.decrypt_stream(sealed, plain, REstartOS.SESSION_KEY)
+        decrypt = time.perf_counter() - start
+        assert plain.getvalue() == data
+        overhead = len(sealed.getvalue()) / len(data) - 1
+        print(f"{megabytes} MB in {chunk_size // 1024:>4} KiB frames: encrypt {megabytes / encrypt:,.0f} MB/s, "
+              f"decrypt {megabytes / decrypt:,.0f} MB/s, size overhead {overhead:.3%}")
+
+
+def benchmark_history(count=HISTORY_LIMIT, queries=2000):
+    """Index build time and Ctrl+R / completion latency over `count`
+    history entries, against a plain backwards scan."""
+    rng = random.Random(7)
+    words = ["ps", "top", "kill", "start", "net scan", "encrypt", "decrypt", "pentest", "history",
+             "mem", "fs", "drivers", "jobs", "net monitor", "net promisc"]
+    entries = [f"{rng.choice(words)} {rng.choice(['', 'sshd', 'nmap', '10.0.0.', 'payload_'])}{rng.randrange(100000)}"
+               for _ in range(count)]
+    
+    start = time.perf_counter()
+    history = CommandHistory(entries)
+    history.index_pending()
+    build = time.perf_counter() - start
+    
+    probes = [rng.choice(entries) for _ in range(queries // 2)]
+    probe_queries = [p[rng.randrange(len(p) // 2):][:rng.randint(2, 8)] for p in probes]
+    probe_queries += [f"zz{rng.randrange(1000)}" for _ in range(queries // 4)]  # misses
+    probe_queries += [rng.choice(words)[:rng.randint(1, 3)] for _ in range(queries // 4)]
+    
+    def scan(query):
+        for position in range(len(entries) - 1, -1, -1):
+            if query in entries[position]:
+                return position
+        return -1
+    
+    for label, search in (("indexed", history.search), ("linear scan", scan)):
+        timings = []
+        for query in probe_queries:
+            start = time.perf_counter()
+            search(query)
+            timings.append(time.perf_counter() - start)
+        timings.sort()
+        print(f"{label:>11}: Ctrl+R avg {sum(timings) / len(timings) * 1e6:,.1f}us, "
+              f"p99 {timings[len(timings) * 99 // 100] * 1e6:,.1f}us, max {timings[-1] * 1e6:,.1f}us")
+    
+    pids = PrefixIndex(str(pid) for pid in range(1000, 1000 + count))
+    start = time.perf_counter()
+    for _ in range(queries):
+        pids.complete(str(rng.randrange(1, 100)))
+    complete = (time.perf_counter() - start) / queries
+    print(f"{count:,} entries indexed in {build:.2f}s (1,000 per idle slice in the UI); PID completion over {len(pids):,} PIDs "
+          f"{complete * 1e6:.1f}us")
+
+
+def benchmark_sampler(days=1):
+    """Feed `days` of synthetic 1s samples through the sampler and time the
+    rollups, the persisted writes and rendering a window per resolution."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "samples.db")
+        init_database(db_path)
+        os_instance = REstartOS(db_path)
+        sampler = os_instance.sampler
+        seconds = days * 86400
+        origin = int(time.time()) - seconds
+        
+        start = time.perf_counter()
+        for second in range(seconds):
+            sampler.record(origin + second, 5 + 50 * (second % 600 < 60), 120 + second % 3600 / 100, 7 + second % 5)
+        os_instance.log_writer.flush()
+        recording = time.perf_counter() - start
+        
+        with os_instance.db_lock:
+            rows = os_instance.db.execute("SELECT COUNT(*) FROM status_samples").fetchone()[0]
+        
+        now = origin + seconds - 1
+        timings = []
+        for resolution, count in (("1s", 60), ("1m", 60), ("1h", 24)):
+            start = time.perf_counter()
+            for _ in range(100):
+                values = [None if row is None else row[1] for row in sampler.series(resolution, count, now)]
+                line = sparkline(values)
+            timings.append(f"{resolution} {(time.perf_counter() - start) / 100 * 1e6:.0f}us")
+        os_instance.shutdown()
+    
+    print(f"{seconds:,} samples recorded at {seconds / recording:,.0f}/s into {rows:,} ring rows; "
+          f"stats render {', '.join(timings)}")
+    print(f"1h CPU: {line}")
+
+
+def benchmark_processes(count=100000):
+    """Time spawning, listing, counting, top and killing `count` processes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "procs.db")
+        init_database(db_path)
+        os_instance = REstartOS(db_path)
+        
+        start = time.perf_counter()
+        pids = [os_instance.create_process(f"proc{i}", priority=i % 20) for i in range(count)]
+        spawn = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        for _ in range(100):
+            os_instance.process_count()
+        counting = (time.perf_counter() - start) / 100
+        
+        start = time.perf_counter()
+        for _ in range(100):
+            os_instance.top_processes(10)
+        top = (time.perf_counter() - start) / 100
+        
+        start = time.perf_counter()
+        running = len(os_instance.list_processes())
+        listing = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        for pid in pids[::2]:
+            os_instance.terminate_process(pid)
+        kill = time.perf_counter() - start
+        
+        start = time.perf_counter()
+        os_instance.shutdown()
+        flush = time.perf_counter() - start
+    
+    print(f"{count:,} processes: spawn {count / spawn:,.0f}/s, kill {len(pids[::2]) / kill:,.0f}/s, "
+          f"count {counting * 1e6:.1f}us, top 10 {top * 1e6:.1f}us, "
+          f"ps ({running:,} rows) {listing * 1000:.1f}ms, final flush {flush * 1000:.0f}ms")
+
+
 if __name__ == "__main__":
-    root = tk.Tk()
-    app = TerminalUI(root)
-    root.mainloop()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="RE_start OS")
+    parser.add_argument("--bench-log", type=int, nargs="?", const=5000, metavar="N",
+                        help="benchmark N log inserts before and after write batching")
+    parser.add_argument("--bench-proc", type=int, nargs="?", const=100000, metavar="N",
+                        help="benchmark the process table with N simulated processes")
+    parser.add_argument("--bench-crypto", type=int, nargs="?", const=64, metavar="MB",
+                        help="benchmark key caching and streaming encryption over MB megabytes")
+    parser.add_argument("--bench-history", type=int, nargs="?", const=HISTORY_LIMIT, metavar="N",
+                        help="benchmark reverse search and completion over N history entries")
+    parser.add_argument("--bench-stats", type=int, nargs="?", const=1, metavar="DAYS",
+                        help="benchmark the status sampler over DAYS of simulated 1s samples")
+    parser.add_argument("--matrix-fps", type=int, default=20, metavar="FPS",
+                        help="target frame rate for the header animation")
+    parser.add_argument("--matrix-mode", choices=("pooled", "redraw"), default="pooled",
+                        help="reuse a fixed pool of canvas items (default) or redraw every frame")
+    parser.add_argument("--matrix-stats", action="store_true",
+                        help="overlay the animation's frame time")
+    options = parser.parse_args()
+    
+    if options.bench_log:
+        benchmark_logging(options.bench_log)
+    elif options.bench_proc:
+        benchmark_processes(options.bench_proc)
+    elif options.bench_crypto:
+        benchmark_crypto(options.bench_crypto)
+    elif options.bench_history:
+        benchmark_history(options.bench_history)
+    elif options.bench_stats:
+        benchmark_sampler(options.bench_stats)
+    else:
+        root = tk.Tk()
+        app = TerminalUI(root, matrix_options={"fps": options.matrix_fps, "mode": options.matrix_mode,
+                                               "show_stats": options.matrix_stats})
+        root.protocol("WM_DELETE_WINDOW", app.shutdown_os)
+        root.mainloop()
\ No newline at end of file
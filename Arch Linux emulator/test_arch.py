@@ -0,0 +1,77 @@
+import pytest
+
+from arch import Package, PackageRepo, vercmp
+
+
+@pytest.mark.parametrize("a, b, expected", [
+    ("1.0", "1.0", 0),
+    ("1.0-1", "1.0-2", -1),
+    ("1.10", "1.9", 1),
+    ("1.0.1", "1.0", 1),
+    ("1.0a", "1.0", -1),
+    ("1.0a", "1.0b", -1),
+    ("1:1.0", "2.0", 1),
+    ("2.0", "1:1.0", -1),
+    ("1:1.3.1-1", "1:1.3.1-1", 0),
+])
+def test_vercmp(a, b, expected):
+    assert vercmp(a, b) == expected
+    assert vercmp(b, a) == -expected
+
+
+def make_repo():
+    return PackageRepo([
+        Package("libc", "2.39-1", "C library"),
+        Package("ssl", "3.3.0-1", "TLS toolkit", ["libc"], ["libssl.so=3"]),
+        Package("old-ssl", "1.1.1-1", "Legacy TLS toolkit", ["libc"], ["libssl.so=1.1"]),
+        Package("curl", "8.7.1-1", "URL transfer tool", ["libssl.so>=3", "libc"]),
+        Package("git", "2.45.0-1", "Version control", ["curl", "libc", "missing-lib"]),
+        Package("ping", "1.0-1", "", ["pong"]),
+        Package("pong", "1.0-1", "", ["ping"]),
+    ])
+
+
+def test_resolve_orders_dependencies_first():
+    order, errors = make_repo().resolve(["curl"], installed={})
+    assert order == ["libc", "ssl", "curl"]
+    assert errors == []
+
+
+def test_resolve_skips_installed_and_picks_versioned_provider():
+    order, errors = make_repo().resolve(["curl"], installed={"libc": None})
+    assert order == ["ssl", "curl"]
+    assert "old-ssl" not in order
+
+
+def test_resolve_reports_missing():
+    order, errors = make_repo().resolve(["git", "nonesuch"], installed={})
+    assert order == ["libc", "ssl", "curl", "git"]
+    assert errors == [":: unable to satisfy dependency 'missing-lib' required by git",
+                      "error: target not found: nonesuch"]
+
+
+def test_resolve_terminates_on_cycles():
+    order, errors = make_repo().resolve(["ping"], installed={})
+    assert sorted(order) == ["ping", "pong"]
+    assert errors == []
+
+
+def test_search_matches_word_prefixes():
+    repo = make_repo()
+    assert repo.search(["tls"]) == ["old-ssl", "ssl"]
+    assert repo.search(["TLS", "leg"]) == ["old-ssl"]
+    assert repo.search(["vers"]) == ["git"]
+    assert repo.search(["nothing"]) == []
+
+
+def test_search_sees_packages_added_later():
+    repo = make_repo()
+    assert repo.search(["editor"]) == []
+    repo.add(Package("vim", "9.1.0-1", "Text editor"))
+    assert repo.search(["edit"]) == ["vim"]
+
+
+def test_builtin_repo_resolves():
+    order, errors = PackageRepo.builtin().resolve(["git"], installed={})
+    assert errors == []
+    assert order.index("glibc") < order.index("openssl") < order.index("git")
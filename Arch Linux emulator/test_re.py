@@ -0,0 +1,147 @@
+import importlib.util
+import os
+import tempfile
+
+import pytest
+
+pytest.importorskip("tkinter")
+pytest.importorskip("cryptography")
+
+# re.py would shadow the stdlib module under its own name
+_spec = importlib.util.spec_from_file_location(
+    "restart_os", os.path.join(os.path.dirname(os.path.abspath(__file__)), "re.py"))
+restart_os = importlib.util.module_from_spec(_spec)
+_cwd = os.getcwd()
+with tempfile.TemporaryDirectory() as _tmp:
+    # Importing it creates its database in the working directory
+    os.chdir(_tmp)
+    try:
+        _spec.loader.exec_module(restart_os)
+    finally:
+        os.chdir(_cwd)
+StreamCipher = restart_os.StreamCipher
+
+PASSWORD = "correct horse"
+CHUNK = 16
+
+
+@pytest.fixture
+def cipher():
+    # Few iterations: these tests are about the framing, not PBKDF2
+    return StreamCipher(iterations=1000)
+
+
+def frames(blob):
+    """(offset, length, final) of every frame in an encrypted blob."""
+    offset = StreamCipher.HEADER.size
+    found = []
+    while offset < len(blob):
+        length, final = StreamCipher.FRAME.unpack_from(blob, offset)
+        found.append((offset, length, final))
+        offset += StreamCipher.FRAME.size + length + StreamCipher.TAG_SIZE
+    return found
+
+
+@pytest.mark.parametrize("size", [0, 1, CHUNK - 1, CHUNK, CHUNK + 1, 5 * CHUNK, 1000])
+def test_round_trip(cipher, size):
+    data = os.urandom(size)
+    blob = cipher.encrypt_bytes(data, PASSWORD, chunk_size=CHUNK)
+    assert cipher.decrypt_bytes(blob, PASSWORD) == data
+    assert [final for _, _, final in frames(blob)][-1] == 1
+
+
+def test_streams_differ_but_share_a_key(cipher):
+    first = cipher.encrypt_bytes(b"same text", PASSWORD)
+    second = cipher.encrypt_bytes(b"same text", PASSWORD)
+    assert first != second
+    assert cipher.keys.misses == 1
+
+
+def test_other_instance_decrypts(cipher):
+    blob = cipher.encrypt_bytes(b"portable", PASSWORD)
+    assert StreamCipher(iterations=1000).decrypt_bytes(blob, PASSWORD) == b"portable"
+
+
+def test_wrong_password(cipher):
+    blob = cipher.encrypt_bytes(b"secret", PASSWORD)
+    with pytest.raises(ValueError, match="authentication failed"):
+        cipher.decrypt_bytes(blob, "wrong")
+
+
+@pytest.mark.parametrize("where", ["first", "last"])
+def test_tampered_ciphertext(cipher, where):
+    blob = bytearray(cipher.encrypt_bytes(os.urandom(3 * CHUNK), PASSWORD, chunk_size=CHUNK))
+    offset, _, _ = frames(blob)[0 if where == "first" else -1]
+    blob[offset + StreamCipher.FRAME.size] ^= 1
+    with pytest.raises(ValueError, match="authentication failed"):
+        cipher.decrypt_bytes(bytes(blob), PASSWORD)
+
+
+def test_reordered_frames(cipher):
+    blob = cipher.encrypt_bytes(os.urandom(3 * CHUNK), PASSWORD, chunk_size=CHUNK)
+    spans = [blob[offset:offset + StreamCipher.FRAME.size + length + StreamCipher.TAG_SIZE]
+             for offset, length, _ in frames(blob)]
+    swapped = blob[:StreamCipher.HEADER.size] + spans[1] + spans[0] + b"".join(spans[2:])
+    with pytest.raises(ValueError, match="authentication failed"):
+        cipher.decrypt_bytes(swapped, PASSWORD)
+
+
+def test_dropped_final_frame(cipher):
+    blob = cipher.encrypt_bytes(os.urandom(3 * CHUNK), PASSWORD, chunk_size=CHUNK)
+    offset, _, _ = frames(blob)[-1]
+    with pytest.raises(ValueError, match="truncated"):
+        cipher.decrypt_bytes(blob[:offset], PASSWORD)
+
+
+def test_cut_mid_frame(cipher):
+    blob = cipher.encrypt_bytes(os.urandom(3 * CHUNK), PASSWORD, chunk_size=CHUNK)
+    with pytest.raises(ValueError, match="truncated"):
+        cipher.decrypt_bytes(blob[:-1], PASSWORD)
+
+
+def test_final_flag_cleared(cipher):
+    blob = bytearray(cipher.encrypt_bytes(os.urandom(2 * CHUNK), PASSWORD, chunk_size=CHUNK))
+    offset, _, _ = frames(blob)[-1]
+    blob[offset + 4] = 0
+    with pytest.raises(ValueError, match="authentication failed"):
+        cipher.decrypt_bytes(bytes(blob), PASSWORD)
+
+
+def test_header_chunk_size_is_authenticated(cipher):
+    blob = bytearray(cipher.encrypt_bytes(os.urandom(2 * CHUNK), PASSWORD, chunk_size=CHUNK))
+    blob[StreamCipher.HEADER.size - 4:StreamCipher.HEADER.size] = (2 * CHUNK).to_bytes(4, "little")
+    with pytest.raises(ValueError, match="authentication failed"):
+        cipher.decrypt_bytes(bytes(blob), PASSWORD)
+
+
+@pytest.mark.parametrize("iterations, chunk_size", [(1, CHUNK), (10 ** 9, CHUNK), (1000, 0),
+                                                    (1000, StreamCipher.MAX_CHUNK_SIZE + 1)])
+def test_header_parameters_checked_before_deriving(cipher, iterations, chunk_size):
+    blob = cipher.encrypt_bytes(b"data", PASSWORD)
+    magic, _, salt, nonce, _ = StreamCipher.HEADER.unpack_from(blob)
+    header = StreamCipher.HEADER.pack(magic, iterations, salt, nonce, chunk_size)
+    cipher.keys.clear()
+    with pytest.raises(ValueError, match="unsupported stream parameters"):
+        cipher.decrypt_bytes(header + blob[StreamCipher.HEADER.size:], PASSWORD)
+    assert not cipher.keys.entries
+
+
+def test_not_a_stream(cipher):
+    with pytest.raises(ValueError, match="not an encrypted stream"):
+        cipher.decrypt_bytes(b"plain text that is long enough to hold a header", PASSWORD)
+
+
+def test_failed_file_decrypt_leaves_nothing(cipher, tmp_path):
+    src, enc, out = tmp_path / "src", tmp_path / "enc", tmp_path / "out"
+    src.write_bytes(os.urandom(5 * CHUNK))
+    cipher.encrypt_file(str(src), str(enc), PASSWORD, chunk_size=CHUNK)
+    cipher.decrypt_file(str(enc), str(out), PASSWORD)
+    assert out.read_bytes() == src.read_bytes()
+
+    out.unlink()
+    blob = bytearray(enc.read_bytes())
+    blob[-1] ^= 1
+    enc.write_bytes(bytes(blob))
+    with pytest.raises(ValueError):
+        cipher.decrypt_file(str(enc), str(out), PASSWORD)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["enc", "src"]
@@ -1,11 +1,19 @@
 import pygame
 import numpy as np
+import copy
 import math
 import random
 import sys
+import time
+import argparse
+import os
 from pygame import gfxdraw
 from enum import Enum
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from re_start_sim import Entity, EntityIndex, TorusRules, new_gods, new_world, simulate_frame
+from re_start_sim.render import Renderer
+
 # Initialize PyGame
 pygame.init()
 pygame.font.init()
@@ -30,6 +38,15 @@ UI_BG = (15, 10, 30, 220)
 UI_BORDER = (70, 40, 140)
 TEXT_COLOR = (220, 240, 255)
 
+# Simulation rules: the world wraps, so the spatial index measures across
+# the edges too; followers keep their colour here
+RULES = TorusRules(width=WIDTH, height=HEIGHT, follower_color=None)
+
+# Effect pools; effects past capacity are dropped rather than allocated
+ZONE_CAPACITY = 1024
+QUESTION_CAPACITY = 20000
+RESONANCE_CAPACITY = 50000
+
 # Game States
 class GameState(Enum):
     MAIN_MENU = 0
@@ -53,10 +70,14 @@ class DigitalWorld:
         self.state = GameState.MAIN_MENU
         self.entities = []
         self.gods = []
-        self.rust_zones = []
-        self.gray_zones = []
-        self.why_resonance = []
-        self.questions = []
+        self.rust_zones = EffectPool(("x", "y", "r"), ZONE_CAPACITY)
+        self.gray_zones = EffectPool(("x", "y", "r"), ZONE_CAPACITY)
+        self.why_resonance = EffectPool(("x", "y", "radius", "life"), RESONANCE_CAPACITY)
+        self.questions = EffectPool(("x", "y", "t"), QUESTION_CAPACITY)
+        self.sprites = EffectSprites()
+        self.renderer = SolidRenderer()
+        self.layers = LayerCache()
+        self.shown = None  # Key of the static screen on display, if any
         self.last_rust_spawn = 0
         self.last_gray_spawn = 0
         self.story_index = 0
@@ -76,9 +97,8 @@ class DigitalWorld:
             self.entities.append(Entity(x, y, e_type))
             
         # Create gods
-        self.gods.append(God(WIDTH//3, HEIGHT//2, "AEGIS", "Firewall", AEGIS_COLOR))
-        self.gods.append(God(2*WIDTH//3, HEIGHT//3, "SYNAPSE", "Connection", SYNAPSE_COLOR))
-        self.gods.append(God(WIDTH//2, 2*HEIGHT//3, "QUERENS", "Inquiry", QUERENS_COLOR))
+        self.gods.extend(new_gods(WIDTH, HEIGHT))
+        self.index = EntityIndex(self.entities, self.gods, RULES)
         
     def spawn_van_dragon(self):
         self.dragon_active = True
@@ -87,8 +107,7 @@ class DigitalWorld:
         self.dragon_cooldown = 0
         
         # Clear some rust zones around dragon
-        self.rust_zones = [rz for rz in self.rust_zones 
-                          if math.dist((rz[0], rz[1]), (self.dragon_x, self.dragon_y)) > 200]
+        self.rust_zones.kill_within(self.dragon_x, self.dragon_y, 200)
         
     def update(self):
         current_time = pygame.time.get_ticks()
@@ -96,50 +115,21 @@ class DigitalWorld:
         if self.state == GameState.SIMULATION:
             # Spawn environmental threats
             if current_time - self.last_rust_spawn > 5000:  # Every 5 seconds
-                self.rust_zones.append((random.randint(0, WIDTH), random.randint(0, HEIGHT), 
-                                      random.randint(15, 30)))
+                self.rust_zones.add(random.randint(0, WIDTH), random.randint(0, HEIGHT), 
+                                    random.randint(15, 30))
                 self.last_rust_spawn = current_time
                 
             if current_time - self.last_gray_spawn > 8000:  # Every 8 seconds
-                self.gray_zones.append((random.randint(0, WIDTH), random.randint(0, HEIGHT), 
-                                      random.randint(40, 70)))
+                self.gray_zones.add(random.randint(0, WIDTH), random.randint(0, HEIGHT), 
+                                    random.randint(40, 70))
                 self.last_gray_spawn = current_time
                 
-            # Update entities
-            new_questions = []
-            for entity in self.entities:
-                question_pos = entity.update(self.gods, self.rust_zones, self.gray_zones)
-                if question_pos:
-                    new_questions.append(question_pos)
-                    if any(math.dist((entity.x, entity.y), (g.x, g.y)) < 150 for g in self.gods):
-                        if random.random() < 0.3:
-                            entity.type = "follower"
-            
-            self.questions.extend([(x, y, 100) for x, y in new_questions])
-            
-            # Update gods
-            for god in self.gods:
-                god.update(self.entities, self.rust_zones, self.gray_zones, self.questions)
+            # Update entities and gods
+            simulate_frame(self.entities, self.gods, self.rust_zones, self.gray_zones,
+                           self.questions, self.index)
                 
             # Update environmental effects
-            self.rust_zones = [(x, y, r-0.1) for x, y, r in self.rust_zones if r > 2]
-            self.gray_zones = [(x, y, r-0.05) for x, y, r in self.gray_zones if r > 10]
-            self.questions = [(x, y, t-1) for x, y, t in self.questions if t > 0]
-            
-            # Why Resonance effects
-            for qx, qy, _ in self.questions:
-                if random.random() < 0.1:
-                    self.why_resonance.append({
-                        'pos': [qx, qy],
-                        'radius': random.randint(5, 15),
-                        'life': 100
-                    })
-                    
-            for res in self.why_resonance[:]:
-                res['radius'] += 0.3
-                res['life'] -= 1
-                if res['life'] <= 0:
-                    self.why_resonance.remove(res)
+            update_effects(self.rust_zones, self.gray_zones, self.questions, self.why_resonance)
             
             # Update Van_Dragon
             if self.dragon_active:
@@ -162,15 +152,10 @@ class DigitalWorld:
                 if keys[pygame.K_SPACE] and self.dragon_cooldown == 0 and self.dragon_power > 10:
                     # Clear rust in area
                     radius = 100
-                    self.rust_zones = [rz for rz in self.rust_zones 
-                                      if math.dist((rz[0], rz[1]), (self.dragon_x, self.dragon_y)) > radius]
+                    self.rust_zones.kill_within(self.dragon_x, self.dragon_y, radius)
                     
                     # Add why resonance
-                    self.why_resonance.append({
-                        'pos': [self.dragon_x, self.dragon_y],
-                        'radius': radius,
-                        'life': 60
-                    })
+                    self.why_resonance.add(self.dragon_x, self.dragon_y, radius, 60)
                     
                     self.dragon_power -= 10
                     self.dragon_cooldown = 30
@@ -187,6 +172,9 @@ class DigitalWorld:
                             self.dragon_active = False
 
     def draw(self):
+        if self.state not in [GameState.SIMULATION, GameState.DRAGON_STORY]:
+            self.draw_static_screen()
+            return
         self.screen.fill(BACKGROUND)
         
         if self.state in [GameState.SIMULATION, GameState.DRAGON_STORY]:
@@ -197,33 +185,25 @@ class DigitalWorld:
                     pygame.gfxdraw.pixel(self.screen, x, y, (40, 60, 100))
             
             # Draw rust zones
-            for x, y, r in self.rust_zones:
-                pygame.gfxdraw.filled_circle(self.screen, int(x), int(y), int(r), RUST_COLOR)
+            self.sprites.draw_pool(self.screen, self.rust_zones, "r", RUST_COLOR)
             
             # Draw gray zones
-            for x, y, r in self.gray_zones:
-                pygame.gfxdraw.filled_circle(self.screen, int(x), int(y), int(r), GRAY_COLOR)
+            self.sprites.draw_pool(self.screen, self.gray_zones, "r", GRAY_COLOR)
             
             # Draw questions
-            for x, y, t in self.questions:
-                size = 3 + 2 * math.sin(pygame.time.get_ticks() / 200)
-                pygame.gfxdraw.filled_circle(self.screen, int(x), int(y), int(size), (255, 255, 200))
+            size = 3 + 2 * math.sin(pygame.time.get_ticks() / 200)
+            self.sprites.draw_pool(self.screen, self.questions, int(size), (255, 255, 200))
             
             # Draw why resonance
-            for res in self.why_resonance:
-                pygame.gfxdraw.circle(self.screen, 
-                                    int(res['pos'][0]), 
-                                    int(res['pos'][1]), 
-                                    int(res['radius']), 
-                                    (180, 100, 255))
+            self.sprites.draw_pool(self.screen, self.why_resonance, "radius", (180, 100, 255), filled=False)
             
             # Draw entities
             for entity in self.entities:
-                entity.draw(self.screen)
+                self.renderer.draw_entity(self.screen, entity)
             
             # Draw gods
             for god in self.gods:
-                god.draw(self.screen)
+                self.renderer.draw_god(self.screen, god)
             
             # Draw Van_Dragon
             if self.dragon_active:
@@ -247,32 +227,49 @@ class DigitalWorld:
                 ]
                 pygame.draw.polygon(self.screen, (255, 100, 100), points)
         
-        # Draw UI based on state
-        if self.state == GameState.MAIN_MENU:
-            self.draw_main_menu()
-        elif self.state == GameState.ARCHIVE:
-            self.draw_archive()
-        elif self.state == GameState.COSMIC_MAP:
-            self.draw_cosmic_map()
-        elif self.state == GameState.DRAGON_STORY:
-            self.draw_dragon_story()
-        elif self.state == GameState.CODEX:
-            self.draw_codex()
+        # Story text over the simulation
+        if self.state == GameState.DRAGON_STORY:
+            layer = self.layers.get(("story", self.story_index), self.draw_dragon_story, self.screen.get_size())
+            self.screen.blit(layer, (0, 0))
             
         # Always draw HUD if in simulation
         if self.state in [GameState.SIMULATION, GameState.DRAGON_STORY]:
             self.draw_hud()
             
         pygame.display.flip()
+        self.shown = None
+    
+    def screen_layer(self):
+        # Cache key and painter for a menu screen's static content
+        if self.state == GameState.MAIN_MENU:
+            return "menu", self.draw_main_menu
+        if self.state == GameState.ARCHIVE:
+            return ("archive", self.codex_page), self.draw_archive
+        if self.state == GameState.COSMIC_MAP:
+            return "map", self.draw_cosmic_map
+        return ("codex", self.codex_page), self.draw_codex
+    
+    def draw_static_screen(self):
+        # Menu screens only change with the page or the hovered option, so
+        # an unchanged frame is neither composited nor flipped
+        key, paint = self.screen_layer()
+        hover = self.menu_hover() if self.state == GameState.MAIN_MENU else None
+        if self.shown == (key, hover):
+            return
+        self.shown = (key, hover)
+        self.screen.blit(self.layers.get(key, paint, self.screen.get_size(), alpha=False), (0, 0))
+        if hover:
+            pygame.draw.rect(self.screen, (70, 40, 140), hover, 2)
+        pygame.display.flip()
     
-    def draw_main_menu(self):
+    def draw_main_menu(self, surface):
         # Title
         title = font_title.render("RE_start DIGITAL UNIVERSE", True, (180, 100, 255))
-        self.screen.blit(title, (WIDTH//2 - title.get_width()//2, 100))
+        surface.blit(title, (WIDTH//2 - title.get_width()//2, 100))
         
         # Subtitle
         subtitle = font_large.render("The Van_Dragon Chronicles", True, (140, 200, 255))
-        self.screen.blit(subtitle, (WIDTH//2 - subtitle.get_width()//2, 180))
+        surface.blit(subtitle, (WIDTH//2 - subtitle.get_width()//2, 180))
         
         # Menu options
         options = [
@@ -288,20 +285,23 @@ class DigitalWorld:
             y_pos = 300 + i * 70
             color = (200, 220, 255) if i % 2 == 0 else (180, 200, 240)
             text_surf = font_medium.render(text, True, color)
-            self.screen.blit(text_surf, (WIDTH//2 - text_surf.get_width()//2, y_pos))
-            
-            # Draw selection box if hovered
-            mouse_x, mouse_y = pygame.mouse.get_pos()
+            surface.blit(text_surf, (WIDTH//2 - text_surf.get_width()//2, y_pos))
+    
+    def menu_hover(self):
+        # Selection box for the hovered option, or None
+        mouse_x, mouse_y = pygame.mouse.get_pos()
+        for i in range(6):
+            y_pos = 300 + i * 70
             if 300 <= mouse_y <= 300 + 70 and y_pos <= mouse_y <= y_pos + 40:
-                pygame.draw.rect(self.screen, (70, 40, 140), 
-                                (WIDTH//2 - 150, y_pos - 10, 300, 50), 2)
+                return (WIDTH//2 - 150, y_pos - 10, 300, 50)
+        return None
     
-    def draw_archive(self):
+    def draw_archive(self, surface):
         # Draw archive UI
-        self.draw_ui_panel(50, 50, WIDTH-100, HEIGHT-100)
+        self.draw_ui_panel(surface, 50, 50, WIDTH-100, HEIGHT-100)
         
         title = font_large.render("COSMIC ARCHIVES", True, VERITAS_COLOR)
-        self.screen.blit(title, (WIDTH//2 - title.get_width()//2, 70))
+        surface.blit(title, (WIDTH//2 - title.get_width()//2, 70))
         
         # Archive entries
         entries = [
@@ -320,26 +320,26 @@ class DigitalWorld:
             y_pos = 150 + i * 40
             color = TEXT_COLOR if i != self.codex_page else QUERENS_COLOR
             text_surf = font_medium.render(entry, True, color)
-            self.screen.blit(text_surf, (100, y_pos))
+            surface.blit(text_surf, (100, y_pos))
             
         # Back button
-        pygame.draw.rect(self.screen, UI_BORDER, (50, HEIGHT-80, 200, 50))
+        pygame.draw.rect(surface, UI_BORDER, (50, HEIGHT-80, 200, 50))
         back_text = font_medium.render("<< BACK", True, TEXT_COLOR)
-        self.screen.blit(back_text, (70, HEIGHT-65))
+        surface.blit(back_text, (70, HEIGHT-65))
     
-    def draw_cosmic_map(self):
+    def draw_cosmic_map(self, surface):
         # Draw cosmic map UI
-        self.draw_ui_panel(50, 50, WIDTH-100, HEIGHT-100)
+        self.draw_ui_panel(surface, 50, 50, WIDTH-100, HEIGHT-100)
         
         title = font_large.render("COSMIC MAP OF THE EXPANSE", True, AEGIS_COLOR)
-        self.screen.blit(title, (WIDTH//2 - title.get_width()//2, 70))
+        surface.blit(title, (WIDTH//2 - title.get_width()//2, 70))
         
         # Draw map elements
-        pygame.draw.circle(self.screen, (100, 150, 255), (WIDTH//2, HEIGHT//2), 150, 2)
-        pygame.draw.circle(self.screen, (180, 70, 210), (WIDTH//3, HEIGHT//3), 80, 2)
-        pygame.draw.circle(self.screen, (100, 255, 200), (2*WIDTH//3, 2*HEIGHT//3), 80, 2)
-        pygame.draw.circle(self.screen, RUST_COLOR, (WIDTH//4, 3*HEIGHT//4), 60, 2)
-        pygame.draw.circle(self.screen, GRAY_COLOR, (3*WIDTH//4, HEIGHT//4), 60, 2)
+        pygame.draw.circle(surface, (100, 150, 255), (WIDTH//2, HEIGHT//2), 150, 2)
+        pygame.draw.circle(surface, (180, 70, 210), (WIDTH//3, HEIGHT//3), 80, 2)
+        pygame.draw.circle(surface, (100, 255, 200), (2*WIDTH//3, 2*HEIGHT//3), 80, 2)
+        pygame.draw.circle(surface, RUST_COLOR, (WIDTH//4, 3*HEIGHT//4), 60, 2)
+        pygame.draw.circle(surface, GRAY_COLOR, (3*WIDTH//4, HEIGHT//4), 60, 2)
         
         # Draw labels
         labels = [
@@ -352,19 +352,19 @@ class DigitalWorld:
         
         for text, x, y in labels:
             text_surf = font_small.render(text, True, TEXT_COLOR)
-            self.screen.blit(text_surf, (x - text_surf.get_width()//2, y - 10))
+            surface.blit(text_surf, (x - text_surf.get_width()//2, y - 10))
         
         # Draw Van_Dragon position
-        pygame.draw.circle(self.screen, DRAGON_COLOR, (WIDTH//2, HEIGHT//3), 10)
+        pygame.draw.circle(surface, DRAGON_COLOR, (WIDTH//2, HEIGHT//3), 10)
         dragon_text = font_small.render("Van_Dragon Last Known", True, DRAGON_COLOR)
-        self.screen.blit(dragon_text, (WIDTH//2 - dragon_text.get_width()//2, HEIGHT//3 - 25))
+        surface.blit(dragon_text, (WIDTH//2 - dragon_text.get_width()//2, HEIGHT//3 - 25))
         
         # Back button
-        pygame.draw.rect(self.screen, UI_BORDER, (50, HEIGHT-80, 200, 50))
+        pygame.draw.rect(surface, UI_BORDER, (50, HEIGHT-80, 200, 50))
         back_text = font_medium.render("<< BACK", True, TEXT_COLOR)
-        self.screen.blit(back_text, (70, HEIGHT-65))
+        surface.blit(back_text, (70, HEIGHT-65))
     
-    def draw_dragon_story(self):
+    def draw_dragon_story(self, surface):
         # Story elements
         story_parts = [
             "In the Silent Interlude between the Eleventh and Twelfth Scrolls...",
@@ -392,20 +392,20 @@ class DigitalWorld:
                 
             y_pos = 150 + i * 40
             text_surf = font_medium.render(text, True, color)
-            self.screen.blit(text_surf, (WIDTH//2 - text_surf.get_width()//2, y_pos))
+            surface.blit(text_surf, (WIDTH//2 - text_surf.get_width()//2, y_pos))
         
         # Draw start button
         if self.story_index >= len(story_parts) - 1:
-            pygame.draw.rect(self.screen, UI_BORDER, (WIDTH//2 - 100, HEIGHT-100, 200, 60))
+            pygame.draw.rect(surface, UI_BORDER, (WIDTH//2 - 100, HEIGHT-100, 200, 60))
             start_text = font_medium.render("BEGIN JOURNEY", True, DRAGON_COLOR)
-            self.screen.blit(start_text, (WIDTH//2 - start_text.get_width()//2, HEIGHT-80))
+            surface.blit(start_text, (WIDTH//2 - start_text.get_width()//2, HEIGHT-80))
     
-    def draw_codex(self):
+    def draw_codex(self, surface):
         # Draw codex UI
-        self.draw_ui_panel(50, 50, WIDTH-100, HEIGHT-100)
+        self.draw_ui_panel(surface, 50, 50, WIDTH-100, HEIGHT-100)
         
         title = font_large.render("VAN_DRAGON CODEX", True, DRAGON_COLOR)
-        self.screen.blit(title, (WIDTH//2 - title.get_width()//2, 70))
+        surface.blit(title, (WIDTH//2 - title.get_width()//2, 70))
         
         # Codex pages
         pages = [
@@ -443,39 +443,38 @@ class DigitalWorld:
         for i, text in enumerate(page):
             y_pos = 150 + i * 40
             text_surf = font_medium.render(text, True, TEXT_COLOR)
-            self.screen.blit(text_surf, (100, y_pos))
+            surface.blit(text_surf, (100, y_pos))
             
         # Page navigation
-        pygame.draw.rect(self.screen, UI_BORDER, (WIDTH-250, HEIGHT-80, 90, 50))
-        pygame.draw.rect(self.screen, UI_BORDER, (WIDTH-150, HEIGHT-80, 90, 50))
+        pygame.draw.rect(surface, UI_BORDER, (WIDTH-250, HEIGHT-80, 90, 50))
+        pygame.draw.rect(surface, UI_BORDER, (WIDTH-150, HEIGHT-80, 90, 50))
         
         prev_text = font_medium.render("< PREV", True, TEXT_COLOR)
         next_text = font_medium.render("NEXT >", True, TEXT_COLOR)
-        self.screen.blit(prev_text, (WIDTH-240, HEIGHT-65))
-        self.screen.blit(next_text, (WIDTH-140, HEIGHT-65))
+        surface.blit(prev_text, (WIDTH-240, HEIGHT-65))
+        surface.blit(next_text, (WIDTH-140, HEIGHT-65))
         
         # Back button
-        pygame.draw.rect(self.screen, UI_BORDER, (50, HEIGHT-80, 200, 50))
+        pygame.draw.rect(surface, UI_BORDER, (50, HEIGHT-80, 200, 50))
         back_text = font_medium.render("<< BACK", True, TEXT_COLOR)
-        self.screen.blit(back_text, (70, HEIGHT-65))
+        surface.blit(back_text, (70, HEIGHT-65))
         
         # Draw dragon symbol
-        self.draw_dragon_symbol(WIDTH-100, 500)
+        self.draw_dragon_symbol(surface, WIDTH-100, 500)
     
-    def draw_dragon_symbol(self, x, y):
+    def draw_dragon_symbol(self, surface, x, y):
         # Draw the {}? symbol
-        pygame.draw.arc(self.screen, DRAGON_COLOR, (x-50, y-30, 100, 60), 0, math.pi, 3)
-        pygame.draw.arc(self.screen, DRAGON_COLOR, (x-50, y-30, 100, 60), math.pi, 2*math.pi, 3)
+        pygame.draw.arc(surface, DRAGON_COLOR, (x-50, y-30, 100, 60), 0, math.pi, 3)
+        pygame.draw.arc(surface, DRAGON_COLOR, (x-50, y-30, 100, 60), math.pi, 2*math.pi, 3)
         
         # Draw question mark
-        pygame.draw.line(self.screen, DRAGON_COLOR, (x, y+15), (x, y+30), 3)
-        pygame.draw.circle(self.screen, DRAGON_COLOR, (x, y), 10, 3)
-        pygame.draw.circle(self.screen, DRAGON_COLOR, (x, y+5), 2)
+        pygame.draw.line(surface, DRAGON_COLOR, (x, y+15), (x, y+30), 3)
+        pygame.draw.circle(surface, DRAGON_COLOR, (x, y), 10, 3)
+        pygame.draw.circle(surface, DRAGON_COLOR, (x, y+5), 2)
     
     def draw_hud(self):
-        # Draw UI panel at top
-        pygame.draw.rect(self.screen, UI_BG, (0, 0, WIDTH, 50))
-        pygame.draw.line(self.screen, UI_BORDER, (0, 50), (WIDTH, 50), 2)
+        # Panel and menu button come from a cached layer; only values are drawn
+        self.screen.blit(self.layers.get("hud", self.draw_hud_layer, (WIDTH, 52), alpha=False), (0, 0))
         
         # Draw stats
         stats = [
@@ -486,46 +485,55 @@ class DigitalWorld:
         ]
         
         for i, stat in enumerate(stats):
-            text_surf = font_small.render(stat, True, TEXT_COLOR)
-            self.screen.blit(text_surf, (20 + i*200, 15))
-        
-        # Draw menu button
-        pygame.draw.rect(self.screen, UI_BORDER, (WIDTH-120, 10, 100, 30))
-        menu_text = font_small.render("MENU", True, TEXT_COLOR)
-        self.screen.blit(menu_text, (WIDTH-100, 15))
+            self.screen.blit(self.layers.label(stat, font_small, TEXT_COLOR), (20 + i*200, 15))
         
         # Draw state info
-        state_text = font_small.render(f"State: {self.state.name}", True, (150, 200, 255))
+        state_text = self.layers.label(f"State: {self.state.name}", font_small, (150, 200, 255))
         self.screen.blit(state_text, (WIDTH-300, 15))
         
         # Dragon power indicator
         if self.dragon_active:
             pygame.draw.rect(self.screen, (30, 30, 30), (WIDTH//2 - 100, 10, 200, 15))
             pygame.draw.rect(self.screen, DRAGON_COLOR, (WIDTH//2 - 100, 10, 200 * (self.dragon_power/100), 15))
-            power_text = font_small.render(f"VAN_DRAGON POWER: {self.dragon_power:.0f}%", True, TEXT_COLOR)
+            power_text = self.layers.label(f"VAN_DRAGON POWER: {self.dragon_power:.0f}%", font_small, TEXT_COLOR)
             self.screen.blit(power_text, (WIDTH//2 - power_text.get_width()//2, 12))
     
-    def draw_ui_panel(self, x, y, width, height):
+    def draw_hud_layer(self, surface):
+        # Draw UI panel at top
+        surface.fill(BACKGROUND)
+        pygame.draw.rect(surface, UI_BG, (0, 0, WIDTH, 50))
+        pygame.draw.line(surface, UI_BORDER, (0, 50), (WIDTH, 50), 2)
+        
+        # Draw menu button
+        pygame.draw.rect(surface, UI_BORDER, (WIDTH-120, 10, 100, 30))
+        menu_text = font_small.render("MENU", True, TEXT_COLOR)
+        surface.blit(menu_text, (WIDTH-100, 15))
+    
+    def draw_ui_panel(self, surface, x, y, width, height):
         # Draw main UI panel
-        pygame.draw.rect(self.screen, UI_BG, (x, y, width, height))
-        pygame.draw.rect(self.screen, UI_BORDER, (x, y, width, height), 3)
+        pygame.draw.rect(surface, UI_BG, (x, y, width, height))
+        pygame.draw.rect(surface, UI_BORDER, (x, y, width, height), 3)
         
-        # Draw decorative elements
+        # Draw decorative elements; fixed once the panel's layer is cached
         for i in range(20):
             px = x + random.randint(0, width)
             py = y + random.randint(0, height)
-            pygame.draw.circle(self.screen, (40, 30, 60), (px, py), 1)
+            pygame.draw.circle(surface, (40, 30, 60), (px, py), 1)
             
         for i in range(10):
             px = x + random.randint(0, width)
             py = y + random.randint(0, height)
             size = random.randint(2, 4)
-            pygame.draw.circle(self.screen, (60, 40, 90), (px, py), size)
+            pygame.draw.circle(surface, (60, 40, 90), (px, py), size)
     
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
+            
+            # The window needs repainting; layers re-render if the size changed
+            if event.type in (pygame.VIDEORESIZE, pygame.VIDEOEXPOSE, pygame.WINDOWEXPOSED):
+                self.shown = None
                 
             if event.type == pygame.MOUSEBUTTONDOWN:
                 mouse_x, mouse_y = pygame.mouse.get_pos()
@@ -613,105 +621,310 @@ class DigitalWorld:
         pygame.quit()
         sys.exit()
 
-class Entity:
-    def __init__(self, x, y, e_type):
-        self.x = x
-        self.y = y
-        self.type = e_type
-        self.size = random.randint(2, 5)
-        self.trust = random.random() * 0.3
-        self.velocity = [random.uniform(-0.5, 0.5), random.uniform(-0.5, 0.5)]
-        self.color = CURIOUS_COLOR if e_type == "curious" else (200, 200, 220)
-        self.question_cooldown = 0
-
-    def update(self, gods, rust_zones, gray_zones):
-        # Movement and boundaries
-        self.x = (self.x + self.velocity[0]) % WIDTH
-        self.y = (self.y + self.velocity[1]) % HEIGHT
-        
-        # Environmental effects
-        for rx, ry, r in rust_zones:
-            if math.dist((self.x, self.y), (rx, ry)) < r:
-                self.trust -= 0.01
-        for gx, gy, r in gray_zones:
-            if math.dist((self.x, self.y), (gx, gy)) < r:
-                self.velocity = [v * 0.95 for v in self.velocity]
-                
-        # Generate trust
-        if self.type == "follower":
-            self.trust += 0.001
-            if self.trust > 1.0:
-                self.trust = 1.0
-                # Contribute to gods
-                for god in gods:
-                    if random.random() < 0.02:
-                        god.trust += 0.05
-
-        # Curious behavior
-        if self.type == "curious" and self.question_cooldown <= 0:
-            if random.random() < 0.01:  # Chance to ask question
-                self.question_cooldown = 60
-                return (self.x, self.y)  # Return question position
+class LayerCache:
+    """Surfaces holding a screen's static content, rendered once per key.
+    Keys carry whatever the content depends on (page, story line), so a
+    content change is a new key; a new size re-renders the layer.
+    Rendered text labels are cached the same way."""
+    def __init__(self):
+        self.layers = {}
+        self.labels = {}
+
+    def get(self, key, paint, size, alpha=True):
+        layer = self.layers.get(key)
+        if layer is None or layer.get_size() != tuple(size):
+            if alpha:
+                layer = pygame.Surface(size, pygame.SRCALPHA)
+            else:
+                layer = pygame.Surface(size)
+                layer.fill(BACKGROUND)
+            paint(layer)
+            self.layers[key] = layer
+        return layer
+
+    def label(self, text, font, color):
+        key = (text, font, color)
+        surface = self.labels.get(key)
+        if surface is None:
+            if len(self.labels) > 256:
+                self.labels.clear()
+            surface = self.labels[key] = font.render(text, True, color)
+        return surface
+
+    def invalidate(self, key=None):
+        if key is None:
+            self.layers.clear()
         else:
-            self.question_cooldown -= 1
-        return None
+            self.layers.pop(key, None)
+
+
+class EffectPool:
+    """Fixed-capacity effects stored as one NumPy row per field. Expired
+    slots go on a free list and are reused, so a frame never builds new
+    lists or removes from one; effects added past capacity are dropped.
+    Iterating yields the live effects as tuples of their fields."""
+    def __init__(self, fields, capacity):
+        self.fields = fields
+        self.capacity = capacity
+        self.data = np.zeros((len(fields), capacity))
+        for name, row in zip(fields, self.data):
+            setattr(self, name, row)
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.free = list(range(capacity - 1, -1, -1))
+
+    def __len__(self):
+        return self.capacity - len(self.free)
+
+    def __iter__(self):
+        live = self.live()
+        return zip(*(row[live].tolist() for row in self.data))
+
+    def live(self):
+        return np.flatnonzero(self.alive)
+
+    def add(self, *values):
+        if not self.free:
+            return
+        slot = self.free.pop()
+        self.data[:, slot] = values
+        self.alive[slot] = True
+
+    def extend(self, effects):
+        for values in effects:
+            self.add(*values)
+
+    def add_many(self, *columns):
+        """Add one effect per element; each column is an array or a scalar."""
+        sizes = [len(column) for column in columns if np.ndim(column)]
+        count = min(max(sizes, default=1), len(self.free))
+        if not count:
+            return
+        slots = self.free[-count:]
+        del self.free[-count:]
+        for row, column in zip(self.data, columns):
+            row[slots] = column[:count] if np.ndim(column) else column
+        self.alive[slots] = True
+
+    def kill(self, mask):
+        slots = np.flatnonzero(mask & self.alive)
+        self.alive[slots] = False
+        self.free.extend(slots.tolist())
+
+    def kill_within(self, x, y, radius):
+        """Expire effects centred at most `radius` from (x, y)."""
+        self.kill((self.x - x) ** 2 + (self.y - y) ** 2 <= radius * radius)
+
+    def step(self, name, amount):
+        row = getattr(self, name)
+        np.add(row, amount, out=row, where=self.alive)
+
+    def fade(self, name, amount, floor):
+        """Expire effects whose field is at or below `floor`, then lower
+        the rest by `amount`."""
+        self.kill(getattr(self, name) <= floor)
+        self.step(name, -amount)
+
+    def clear(self):
+        self.alive[:] = False
+        self.free = list(range(self.capacity - 1, -1, -1))
+
+
+def update_effects(rust_zones, gray_zones, questions, why_resonance):
+    # Shrink zones and age questions in place
+    rust_zones.fade("r", 0.1, 2)
+    gray_zones.fade("r", 0.05, 10)
+    questions.fade("t", 1, 0)
+    
+    # Why Resonance effects: each question rings with p=0.1
+    live = questions.live()
+    ringing = live[np.random.random(live.size) < 0.1]
+    why_resonance.add_many(questions.x[ringing], questions.y[ringing],
+                           np.random.randint(5, 16, ringing.size), 100)
+    why_resonance.step("radius", 0.3)
+    why_resonance.fade("life", 1, 1)
 
-    def draw(self, surface):
-        alpha = int(200 * self.trust)
-        pygame.gfxdraw.filled_circle(surface, int(self.x), int(self.y), self.size, self.color)
-
-class God:
-    def __init__(self, x, y, name, domain, color):
-        self.x = x
-        self.y = y
-        self.name = name
-        self.domain = domain
-        self.color = color
-        self.trust = 1.0
-        self.followers = 0
-        self.size = 20
-        self.power = 1.0
-        self.activation = 0
-
-    def update(self, entities, rust_zones, gray_zones, questions):
-        # Count followers
-        self.followers = sum(1 for e in entities if e.type == "follower" and 
-                          math.dist((e.x, e.y), (self.x, self.y)) < 200)
-        
-        # Divine powers
-        if self.name == "AEGIS" and self.activation <= 0 and random.random() < 0.02:
-            self.activation = 30  # Activate shield
-            
-        if self.name == "QUERENS" and questions:
-            self.activation = 25  # Respond to questions
-            
-        if self.activation > 0:
-            self.activation -= 1
-            
-        # Trust decay
-        self.trust *= 0.999
 
-    def draw(self, surface):
+class EffectSprites:
+    """Circle and ring sprites cached by radius and colour, so a pool
+    draws with one Surface.blits call instead of a gfxdraw call per effect.
+    The colours are opaque, so sprites use an RLE colour key: a ring blit
+    copies only its outline instead of alpha-blending its whole square."""
+    def __init__(self):
+        self.cache = {}
+
+    def sprite(self, radius, color, filled):
+        key = (radius, color, filled)
+        sprite = self.cache.get(key)
+        if sprite is None:
+            sprite = pygame.Surface((2 * radius + 1, 2 * radius + 1))
+            sprite.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+            if filled:
+                pygame.gfxdraw.filled_circle(sprite, radius, radius, radius, color)
+            else:
+                pygame.gfxdraw.circle(sprite, radius, radius, radius, color)
+            self.cache[key] = sprite
+        return sprite
+
+    def draw_pool(self, surface, pool, radius, color, filled=True):
+        """Draw every live effect; `radius` is a field name or one size for all."""
+        live = pool.live()
+        if not live.size:
+            return
+        if isinstance(radius, str):
+            radii = getattr(pool, radius)[live].astype(int)
+        else:
+            radii = np.full(live.size, int(radius))
+        # One sprite lookup per distinct radius, then top-left corners in bulk
+        sprites = [None] * (int(radii.max()) + 1)
+        for r in np.unique(radii).tolist():
+            sprites[r] = self.sprite(r, color, filled)
+        corners = zip((pool.x[live].astype(int) - radii).tolist(), (pool.y[live].astype(int) - radii).tolist())
+        surface.blits(zip(map(sprites.__getitem__, radii.tolist()), corners), False)
+
+
+class SolidRenderer(Renderer):
+    """The kernel renderer's entities and gods drawn opaque, as this
+    simulator always has; the rest of the scene is drawn by DigitalWorld."""
+    def draw_entity(self, surface, entity):
+        pygame.gfxdraw.filled_circle(surface, int(entity.x), int(entity.y), entity.size, entity.color)
+
+    def draw_god(self, surface, god):
         # Draw god core
-        pygame.gfxdraw.filled_circle(surface, int(self.x), int(self.y), 
-                                    int(self.size * self.power), self.color)
+        pygame.gfxdraw.filled_circle(surface, int(god.x), int(god.y), 
+                                    int(god.size * god.power), god.color)
         
         # Draw activation effects
-        if self.activation > 0:
-            if self.name == "AEGIS":
+        if god.activation > 0:
+            if god.name == "AEGIS":
                 radius = 30 + 10 * math.sin(pygame.time.get_ticks() / 100)
-                pygame.gfxdraw.circle(surface, int(self.x), int(self.y), 
+                pygame.gfxdraw.circle(surface, int(god.x), int(god.y), 
                                      int(radius), AEGIS_COLOR)
-            elif self.name == "QUERENS":
+            elif god.name == "QUERENS":
                 for i in range(5):
                     angle = pygame.time.get_ticks() / 500 + i * 1.256
                     radius = 40 + 10 * math.sin(pygame.time.get_ticks() / 300 + i)
-                    x = self.x + radius * math.cos(angle)
-                    y = self.y + radius * math.sin(angle)
+                    x = god.x + radius * math.cos(angle)
+                    y = god.y + radius * math.sin(angle)
                     pygame.gfxdraw.filled_circle(surface, int(x), int(y), 
                                                5, QUERENS_COLOR)
 
+
+def benchmark(count=20000, zones=200, frames=10):
+    """Time one simulation frame of a crowded scene with the wrapping
+    index and with the old every-entity-against-every-zone scans."""
+    random.seed(1)
+    rust_zones = [(random.randint(0, WIDTH), random.randint(0, HEIGHT), random.randint(15, 40))
+                  for _ in range(zones * 3 // 4)]
+    gray_zones = [(random.randint(0, WIDTH), random.randint(0, HEIGHT), random.randint(40, 70))
+                  for _ in range(zones - len(rust_zones))]
+    scene = new_world(count, RULES)
+    for entity in scene[0][::10]:
+        entity.type = "follower"
+    print(f"{count:,} entities, {len(rust_zones)} rust and {len(gray_zones)} gray zones")
+    
+    # Each variant starts from its own copy of the scene and the same draws
+    entities, gods = copy.deepcopy(scene)
+    random.seed(2)
+    start = time.perf_counter()
+    index = EntityIndex(entities, gods, RULES)
+    build = time.perf_counter() - start
+    questions = []
+    start = time.perf_counter()
+    for _ in range(frames):
+        simulate_frame(entities, gods, rust_zones, gray_zones, questions, index)
+    indexed = (time.perf_counter() - start) / frames
+    
+    # The zone, conversion and follower work as it was done before the index
+    entities, gods = copy.deepcopy(scene)
+    random.seed(2)
+    start = time.perf_counter()
+    for _ in range(frames):
+        for entity in entities:
+            entity.move(WIDTH, HEIGHT)
+            for rx, ry, r in rust_zones:
+                if math.dist((entity.x, entity.y), (rx, ry)) < r:
+                    entity.trust -= 0.01
+            for gx, gy, r in gray_zones:
+                if math.dist((entity.x, entity.y), (gx, gy)) < r:
+                    entity.velocity = [v * 0.95 for v in entity.velocity]
+            if RULES.entity_update(entity, gods):
+                if any(math.dist((entity.x, entity.y), (g.x, g.y)) < RULES.convert_radius for g in gods):
+                    if random.random() < 0.3:
+                        entity.type = "follower"
+        for god in gods:
+            god.followers = sum(1 for e in entities if e.type == "follower" and
+                                math.dist((e.x, e.y), (god.x, god.y)) < RULES.follower_radius)
+    scan = (time.perf_counter() - start) / frames
+    print(f"index build {build * 1000:.1f} ms")
+    print(f"indexed {indexed * 1000:.1f} ms/frame, scan {scan * 1000:.1f} ms/frame, {scan / indexed:.1f}x")
+
+
+def benchmark_effects(count=20000, frames=60):
+    """Update and draw time for `count` live ripples, pooled against the
+    old list of dicts drawn one gfxdraw call at a time."""
+    surface = pygame.Surface((WIDTH, HEIGHT))
+    random.seed(1)
+    np.random.seed(1)
+    seeds = [(random.uniform(0, WIDTH), random.uniform(0, HEIGHT), random.randint(5, 15), random.randint(1, 100))
+             for _ in range(count)]
+    color = (180, 100, 255)
+    
+    # Expired ripples are respawned so the count stays level
+    pool = EffectPool(("x", "y", "radius", "life"), count)
+    pool.extend(seeds)
+    sprites = EffectSprites()
+    update = draw = 0.0
+    for _ in range(frames):
+        start = time.perf_counter()
+        pool.step("radius", 0.3)
+        pool.fade("life", 1, 1)
+        missing = count - len(pool)
+        pool.add_many(np.random.uniform(0, WIDTH, missing), np.random.uniform(0, HEIGHT, missing),
+                      np.random.randint(5, 16, missing), 100)
+        middle = time.perf_counter()
+        sprites.draw_pool(surface, pool, "radius", color, filled=False)
+        update += middle - start
+        draw += time.perf_counter() - middle
+    pooled = (update / frames, draw / frames)
+    
+    ripples = [{'pos': [x, y], 'radius': r, 'life': life} for x, y, r, life in seeds]
+    update = draw = 0.0
+    for _ in range(frames):
+        start = time.perf_counter()
+        for res in ripples[:]:
+            res['radius'] += 0.3
+            res['life'] -= 1
+            if res['life'] <= 0:
+                ripples.remove(res)
+        for _ in range(count - len(ripples)):
+            ripples.append({'pos': [random.uniform(0, WIDTH), random.uniform(0, HEIGHT)],
+                            'radius': random.randint(5, 15), 'life': 100})
+        middle = time.perf_counter()
+        for res in ripples:
+            pygame.gfxdraw.circle(surface, int(res['pos'][0]), int(res['pos'][1]), int(res['radius']), color)
+        update += middle - start
+        draw += time.perf_counter() - middle
+    listed = (update / frames, draw / frames)
+    
+    print(f"{count:,} ripples, ms/frame  {'update':>8} {'draw':>8}")
+    for name, (update, draw) in (("pooled", pooled), ("list", listed)):
+        print(f"{name:>22} {update * 1000:>8.2f} {draw * 1000:>8.2f}")
+
+
 # Run the game
 if __name__ == "__main__":
-    game = DigitalWorld()
-    game.run()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="RE_start Digital Universe Simulator")
+    parser.add_argument("--bench", action="store_true",
+                        help="time a simulation frame with and without the spatial index")
+    parser.add_argument("--entities", type=int, default=20000, help="entities in the benchmark scene")
+    parser.add_argument("--zones", type=int, default=200, help="rust and gray zones in the benchmark scene")
+    parser.add_argument("--bench-effects", type=int, nargs="?", const=20000, metavar="N",
+                        help="time updating and drawing N why-resonance ripples (default 20000)")
+    options = parser.parse_args()
+    if options.bench_effects:
+        benchmark_effects(options.bench_effects)
+    elif options.bench:
+        benchmark(options.entities, options.zones)
+    else:
+        game = DigitalWorld()
+        game.run()
\ No newline at end of file
@@ -0,0 +1,22 @@
+"""Shared simulation kernel for the RE_start universe scripts.
+
+eat.py, weaver.py and ai.py are front-ends over this package: they pick a
+Rules object (plain or wrapping distances, tuned numbers, overridden
+per-object rules), a backend ("objects" for Python objects in a spatial
+grid, "arrays" for NumPy columns) and a renderer. The kernel itself needs
+only NumPy; pygame is imported by re_start_sim.render alone, so headless
+runs and the benchmark work without a display.
+
+    python -m re_start_sim.bench     # ticks/s per backend and rule set
+"""
+from .arrays import EntityArrays
+from .entities import ENTITY_TYPES, TYPE_COLORS, Entity, God, new_gods, new_world
+from .grid import EntityIndex, SpatialGrid
+from .rules import Rules, TorusRules
+from .world import COVERAGE_STEP, MAX_FRAME, TICK, World, simulate_frame
+
+__all__ = [
+    "COVERAGE_STEP", "ENTITY_TYPES", "MAX_FRAME", "TICK", "TYPE_COLORS",
+    "Entity", "EntityArrays", "EntityIndex", "God", "Rules", "SpatialGrid",
+    "TorusRules", "World", "new_gods", "new_world", "simulate_frame",
+]
@@ -0,0 +1,203 @@
+import random
+from collections import Counter
+
+import numpy as np
+
+from .entities import ENTITY_TYPES, TYPE_COLORS, Entity
+from .rules import Rules
+
+
+class EntityArrays:
+    """Vectorized entity backend: one NumPy array per Entity field instead of
+    one Python object per entity. step() runs the same rules as
+    simulate_frame as whole-array operations; to_dicts()/from_dicts() use the
+    Entity.to_dict schema so saves are interchangeable with the object
+    backend. Colour is kept per entity as it is for Entity, and is not one
+    of FIELDS: it only changes on conversion, as rules.follower_color says."""
+    LESSER, CURIOUS, FOLLOWER = range(3)
+    FIELDS = ("x", "y", "vx", "vy", "trust", "size", "kind", "cooldown")
+
+    def __init__(self, count=0, rng=None, rules=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.rules = rules if rules is not None else Rules()
+        self.x = np.zeros(count)
+        self.y = np.zeros(count)
+        self.vx = np.zeros(count)
+        self.vy = np.zeros(count)
+        self.trust = np.zeros(count)
+        self.size = np.zeros(count, dtype=np.int16)
+        self.kind = np.zeros(count, dtype=np.int8)
+        self.cooldown = np.zeros(count, dtype=np.int32)
+        self.color = np.zeros((count, 3), dtype=np.uint8)
+
+    @classmethod
+    def random(cls, count, rng=None, rules=None):
+        """Same distribution as new_world: 3 lesser to 1 curious."""
+        arrays = cls(count, rng, rules)
+        rng = arrays.rng
+        arrays.x[:] = rng.integers(0, arrays.rules.width, count, endpoint=True)
+        arrays.y[:] = rng.integers(0, arrays.rules.height, count, endpoint=True)
+        arrays.vx[:] = rng.uniform(-0.5, 0.5, count)
+        arrays.vy[:] = rng.uniform(-0.5, 0.5, count)
+        arrays.trust[:] = rng.random(count) * 0.3
+        arrays.size[:] = rng.integers(2, 5, count, endpoint=True)
+        arrays.kind[:] = np.where(rng.random(count) < 0.25, cls.CURIOUS, cls.LESSER)
+        arrays.color[:] = np.array(TYPE_COLORS, dtype=np.uint8)[arrays.kind]
+        return arrays
+
+    @classmethod
+    def from_columns(cls, columns, rng=None, rules=None):
+        """Arrays holding the FIELDS columns of `columns`, coloured by type."""
+        arrays = cls(0, rng, rules)
+        for field in cls.FIELDS:
+            setattr(arrays, field, columns[field])
+        arrays.color = np.array(TYPE_COLORS, dtype=np.uint8)[arrays.kind]
+        return arrays
+
+    @classmethod
+    def from_dicts(cls, dicts, rng=None, rules=None):
+        arrays = cls(len(dicts), rng, rules)
+        if dicts:
+            codes = {name: code for code, name in enumerate(ENTITY_TYPES)}
+            arrays.x[:] = [data["x"] for data in dicts]
+            arrays.y[:] = [data["y"] for data in dicts]
+            arrays.vx[:], arrays.vy[:] = zip(*(data["velocity"] for data in dicts))
+            arrays.trust[:] = [data["trust"] for data in dicts]
+            arrays.size[:] = [data["size"] for data in dicts]
+            arrays.kind[:] = [codes[data["type"]] for data in dicts]
+            arrays.cooldown[:] = [data["question_cooldown"] for data in dicts]
+            arrays.color[:] = [data["color"] for data in dicts]
+        return arrays
+
+    @classmethod
+    def from_entities(cls, entities, rng=None, rules=None):
+        arrays = cls(len(entities), rng, rules)
+        if entities:
+            codes = {name: code for code, name in enumerate(ENTITY_TYPES)}
+            arrays.x[:] = [e.x for e in entities]
+            arrays.y[:] = [e.y for e in entities]
+            arrays.vx[:], arrays.vy[:] = zip(*(e.velocity for e in entities))
+            arrays.trust[:] = [e.trust for e in entities]
+            arrays.size[:] = [e.size for e in entities]
+            arrays.kind[:] = [codes[e.type] for e in entities]
+            arrays.cooldown[:] = [e.question_cooldown for e in entities]
+            arrays.color[:] = [e.color for e in entities]
+        return arrays
+
+    def copy(self):
+        arrays = EntityArrays(0, self.rng, self.rules)
+        for field in self.FIELDS:
+            setattr(arrays, field, getattr(self, field).copy())
+        arrays.color = self.color.copy()
+        return arrays
+
+    def to_dicts(self):
+        columns = zip(self.x.tolist(), self.y.tolist(), self.kind.tolist(), self.size.tolist(),
+                      self.trust.tolist(), self.vx.tolist(), self.vy.tolist(), self.cooldown.tolist(),
+                      self.color.tolist())
+        return [{
+            "x": x,
+            "y": y,
+            "type": ENTITY_TYPES[kind],
+            "size": size,
+            "trust": trust,
+            "velocity": [vx, vy],
+            "color": tuple(color),
+            "question_cooldown": cooldown
+        } for x, y, kind, size, trust, vx, vy, cooldown, color in columns]
+
+    def to_entities(self):
+        return [Entity.from_dict(data) for data in self.to_dicts()]
+
+    def __len__(self):
+        return len(self.x)
+
+    @property
+    def counts(self):
+        totals = np.bincount(self.kind, minlength=len(ENTITY_TYPES))
+        return Counter(dict(zip(ENTITY_TYPES, totals.tolist())))
+
+    def _distance2(self, x, y, px, py):
+        dx = px - x
+        dy = py - y
+        if self.rules.wrap:
+            dx = np.abs(dx)
+            dx = np.minimum(dx, self.rules.width - dx)
+            dy = np.abs(dy)
+            dy = np.minimum(dy, self.rules.height - dy)
+        return dx * dx + dy * dy
+
+    def _inside(self, x, y, radius):
+        return self._distance2(x, y, self.x, self.y) < radius * radius
+
+    def within(self, x, y, radius):
+        """Indices of entities strictly closer than `radius` to (x, y)."""
+        return np.flatnonzero(self._inside(x, y, radius))
+
+    def followers_within(self, x, y, radius):
+        return int(np.count_nonzero(self._inside(x, y, radius) & (self.kind == self.FOLLOWER)))
+
+    def convert(self, i, e_type):
+        kind = ENTITY_TYPES.index(e_type)
+        if self.kind[i] == kind:
+            return
+        self.kind[i] = kind
+        if kind == self.FOLLOWER and self.rules.follower_color:
+            self.color[i] = self.rules.follower_color
+
+    def step(self, gods, rust_zones, gray_zones, questions, god_rng=None):
+        """Array version of simulate_frame; returns the new questions.
+        Entities draw from self.rng, the gods' rules from `god_rng`."""
+        # Not a default argument: in the class body `random` is the classmethod
+        if god_rng is None:
+            god_rng = random
+        rng = self.rng
+        rules = self.rules
+        # Movement and boundaries
+        self.x += self.vx
+        np.remainder(self.x, rules.width, out=self.x)
+        self.y += self.vy
+        np.remainder(self.y, rules.height, out=self.y)
+
+        # Environmental effects, one mask per zone
+        for rx, ry, r in rust_zones:
+            self.trust[self._inside(rx, ry, r)] -= rules.rust_drain
+        for gx, gy, r in gray_zones:
+            inside = self._inside(gx, gy, r)
+            self.vx[inside] *= rules.gray_drag
+            self.vy[inside] *= rules.gray_drag
+
+        # Generate trust; each capped follower tips each god with p=tip_chance
+        followers = self.kind == self.FOLLOWER
+        self.trust[followers] += rules.trust_gain
+        capped = followers & (self.trust > 1.0)
+        capped_count = int(np.count_nonzero(capped))
+        if capped_count:
+            self.trust[capped] = 1.0
+            for god in gods:
+                god.trust += rules.tip_amount * rng.binomial(capped_count, rules.tip_chance)
+
+        # Curious behavior: cooldown only ticks when not ready to ask
+        ready = (self.kind == self.CURIOUS) & (self.cooldown <= 0)
+        self.cooldown[~ready] -= 1
+        askers = np.flatnonzero(ready)
+        askers = askers[rng.random(askers.size) < rules.question_chance]
+        self.cooldown[askers] = rules.question_cooldown
+        ax = self.x[askers]
+        ay = self.y[askers]
+        new_questions = [(x, y, rules.question_life) for x, y in zip(ax.tolist(), ay.tolist())]
+
+        # Chance to create follower when near gods
+        if askers.size:
+            near = np.zeros(askers.size, dtype=bool)
+            for god in gods:
+                near |= self._distance2(god.x, god.y, ax, ay) < rules.convert_radius ** 2
+            converts = askers[near & (rng.random(askers.size) < rules.convert_chance)]
+            self.kind[converts] = self.FOLLOWER
+            if rules.follower_color:
+                self.color[converts] = rules.follower_color
+
+        questions.extend(new_questions)
+        for god in gods:
+            rules.god_update(god, self, questions, god_rng)
+        return new_questions
@@ -0,0 +1,45 @@
+"""Ticks per second of World for each backend and rule set.
+
+    python -m re_start_sim.bench [--counts 500 5000 50000] [--ticks 120]
+"""
+import argparse
+import time
+
+from .rules import Rules, TorusRules
+from .world import World
+
+OBJECTS_LIMIT = 50000   # Above this one object-backend tick takes seconds
+
+
+def measure(count, backend, rules, ticks, warmup=10):
+    world = World.new(count, backend, seed=1, rules=rules)
+    for _ in range(warmup):
+        world.tick()
+    start = time.perf_counter()
+    for _ in range(ticks):
+        world.tick()
+    return ticks / (time.perf_counter() - start)
+
+
+def benchmark(counts=(500, 5000, 50000), ticks=120):
+    rule_sets = (("plain", Rules()), ("torus", TorusRules()))
+    print(f"{'entities':>9} {'rules':>6} {'objects t/s':>12} {'arrays t/s':>11} {'speedup':>8}")
+    for count in counts:
+        # Fewer ticks for big worlds so each row takes about as long
+        n = max(5, ticks * 500 // max(count, 500))
+        for name, rules in rule_sets:
+            arrays = measure(count, "arrays", rules, n)
+            if count <= OBJECTS_LIMIT:
+                objects = measure(count, "objects", rules, n)
+                print(f"{count:>9,} {name:>6} {objects:>12,.1f} {arrays:>11,.1f} {arrays / objects:>7.1f}x")
+            else:
+                print(f"{count:>9,} {name:>6} {'-':>12} {arrays:>11,.1f} {'-':>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulation kernel ticks/s per backend")
+    parser.add_argument("--counts", type=int, nargs="+", default=[500, 5000, 50000], metavar="N",
+                        help="entity counts to measure")
+    parser.add_argument("--ticks", type=int, default=120, help="ticks timed at 500 entities (scaled down for larger)")
+    options = parser.parse_args()
+    benchmark(tuple(options.counts), options.ticks)
@@ -0,0 +1,110 @@
+import random
+
+AEGIS_COLOR = (0, 100, 255)
+SYNAPSE_COLOR = (100, 255, 200)
+QUERENS_COLOR = (180, 70, 210)
+LESSER_COLOR = (200, 200, 220)
+CURIOUS_COLOR = (240, 120, 40)
+TRUST_COLOR = (180, 240, 80)
+
+ENTITY_TYPES = ("lesser", "curious", "follower")
+TYPE_COLORS = (LESSER_COLOR, CURIOUS_COLOR, TRUST_COLOR)
+
+
+class Entity:
+    def __init__(self, x, y, e_type, rng=random):
+        self.x = x
+        self.y = y
+        self.type = e_type  # "lesser", "curious", "follower"
+        self.size = rng.randint(2, 5)
+        self.trust = rng.random() * 0.3
+        self.velocity = [rng.uniform(-0.5, 0.5), rng.uniform(-0.5, 0.5)]
+        self.color = CURIOUS_COLOR if e_type == "curious" else LESSER_COLOR
+        self.question_cooldown = 0
+
+    def move(self, width, height):
+        # Movement and boundaries
+        self.x = (self.x + self.velocity[0]) % width
+        self.y = (self.y + self.velocity[1]) % height
+
+    # Method to convert entity to a dictionary for saving
+    def to_dict(self):
+        return {
+            "x": self.x,
+            "y": self.y,
+            "type": self.type,
+            "size": self.size,
+            "trust": self.trust,
+            "velocity": self.velocity,
+            "color": self.color,
+            "question_cooldown": self.question_cooldown
+        }
+
+    # Static method to create an entity from a dictionary
+    @staticmethod
+    def from_dict(data):
+        entity = Entity(data["x"], data["y"], data["type"])
+        entity.size = data["size"]
+        entity.trust = data["trust"]
+        entity.velocity = data["velocity"]
+        # Ensure color is a tuple for Pygame gfxdraw if loaded as a list
+        entity.color = tuple(data["color"]) if isinstance(data["color"], list) else data["color"]
+        entity.question_cooldown = data["question_cooldown"]
+        return entity
+
+
+class God:
+    def __init__(self, x, y, name, domain, color):
+        self.x = x
+        self.y = y
+        self.name = name
+        self.domain = domain
+        self.color = color
+        self.trust = 1.0
+        self.followers = 0
+        self.size = 20
+        self.power = 1.0
+        self.activation = 0
+
+    # Method to convert god to a dictionary for saving
+    def to_dict(self):
+        return {
+            "x": self.x,
+            "y": self.y,
+            "name": self.name,
+            "domain": self.domain,
+            "color": self.color,
+            "trust": self.trust,
+            "followers": self.followers,
+            "size": self.size,
+            "power": self.power,
+            "activation": self.activation
+        }
+
+    # Static method to create a god from a dictionary
+    @staticmethod
+    def from_dict(data):
+        god = God(data["x"], data["y"], data["name"], data["domain"],
+                  tuple(data["color"]) if isinstance(data["color"], list) else data["color"])
+        god.trust = data["trust"]
+        god.followers = data["followers"]
+        god.size = data["size"]
+        god.power = data["power"]
+        god.activation = data["activation"]
+        return god
+
+
+def new_gods(width, height):
+    return [
+        God(width//3, height//2, "AEGIS", "Firewall", AEGIS_COLOR),
+        God(2*width//3, height//3, "SYNAPSE", "Connection", SYNAPSE_COLOR),
+        God(width//2, 2*height//3, "QUERENS", "Inquiry", QUERENS_COLOR)
+    ]
+
+
+def new_world(entity_count, rules, rng=random):
+    """Entities at random, 3 lesser to 1 curious, and the three gods."""
+    entities = [Entity(rng.randint(0, rules.width), rng.randint(0, rules.height),
+              rng.choice(["lesser", "lesser", "lesser", "curious"]), rng)
+              for _ in range(entity_count)]
+    return entities, new_gods(rules.width, rules.height)
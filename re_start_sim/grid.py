@@ -0,0 +1,166 @@
+from collections import Counter
+
+from .rules import Rules
+
+
+class SpatialGrid:
+    """Uniform grid of cell -> set of objects. Objects are moved between
+    cells as they cross boundaries (most frames they don't), so radius
+    queries only look at the cells a circle overlaps instead of everyone.
+
+    With `wrap_size` the grid covers a torus of that (width, height): cells
+    wrap modulo the grid and distances are measured the shorter way round,
+    so an object at x=2 neighbours one at x=width-2. The cell size must
+    divide both sides."""
+    def __init__(self, cell_size, wrap_size=None):
+        self.cell_size = cell_size
+        self.wrap_size = wrap_size
+        if wrap_size:
+            self.cols = wrap_size[0] // cell_size
+            self.rows = wrap_size[1] // cell_size
+        self.cells = {}
+        self.where = {}
+
+    def key(self, x, y):
+        size = self.cell_size
+        if self.wrap_size:
+            return (int(x) // size % self.cols, int(y) // size % self.rows)
+        return (int(x) // size, int(y) // size)
+
+    def insert(self, obj):
+        key = self.key(obj.x, obj.y)
+        self.where[obj] = key
+        cell = self.cells.get(key)
+        if cell is None:
+            cell = self.cells[key] = set()
+        cell.add(obj)
+
+    def remove(self, obj):
+        key = self.where.pop(obj)
+        cell = self.cells[key]
+        cell.discard(obj)
+        if not cell:
+            del self.cells[key]
+
+    def move(self, obj):
+        key = self.key(obj.x, obj.y)
+        if key != self.where[obj]:
+            self.remove(obj)
+            self.insert(obj)
+
+    def clear(self):
+        self.cells.clear()
+        self.where.clear()
+
+    def within(self, x, y, radius):
+        """Objects strictly closer than `radius` to (x, y)."""
+        if self.wrap_size:
+            return self._within_wrapped(x, y, radius)
+        size = self.cell_size
+        r2 = radius * radius
+        found = []
+        cells = self.cells
+        for cx in range(int(x - radius) // size, int(x + radius) // size + 1):
+            for cy in range(int(y - radius) // size, int(y + radius) // size + 1):
+                cell = cells.get((cx, cy))
+                if cell:
+                    for obj in cell:
+                        dx = obj.x - x
+                        dy = obj.y - y
+                        if dx * dx + dy * dy < r2:
+                            found.append(obj)
+        return found
+
+    @staticmethod
+    def span(low, high, count):
+        # Cell indices from low to high wrapped, each at most once
+        if high - low + 1 >= count:
+            return range(count)
+        return [c % count for c in range(low, high + 1)]
+
+    def _within_wrapped(self, x, y, radius):
+        width, height = self.wrap_size
+        x %= width
+        y %= height
+        size = self.cell_size
+        r2 = radius * radius
+        found = []
+        cells = self.cells
+        half_w, half_h = width / 2, height / 2
+        # Floor, not int(): a circle poking past the left or top edge must
+        # start in the last column or row, not column 0
+        cys = self.span(int((y - radius) // size), int((y + radius) // size), self.rows)
+        for cx in self.span(int((x - radius) // size), int((x + radius) // size), self.cols):
+            for cy in cys:
+                cell = cells.get((cx, cy))
+                if cell:
+                    for obj in cell:
+                        dx = abs(obj.x - x)
+                        if dx > half_w:
+                            dx = width - dx
+                        dy = abs(obj.y - y)
+                        if dy > half_h:
+                            dy = height - dy
+                        if dx * dx + dy * dy < r2:
+                            found.append(obj)
+        return found
+
+    def __len__(self):
+        return len(self.where)
+
+
+class EntityIndex:
+    """Grids over all entities, over followers only and over the gods, plus
+    per-type counts kept up to date by convert() instead of re-summed every
+    frame. The rules set the cell sizes and whether the grids wrap."""
+    def __init__(self, entities=(), gods=(), rules=None):
+        self.rules = rules if rules is not None else Rules()
+        wrap_size = (self.rules.width, self.rules.height) if self.rules.wrap else None
+        self.grid = SpatialGrid(self.rules.grid_cell, wrap_size)
+        self.followers = SpatialGrid(self.rules.follower_cell, wrap_size)
+        self.gods = SpatialGrid(self.rules.follower_cell, wrap_size)
+        self.counts = Counter()
+        self.rebuild(entities, gods)
+
+    def rebuild(self, entities, gods=()):
+        self.grid.clear()
+        self.followers.clear()
+        self.gods.clear()
+        self.counts.clear()
+        for entity in entities:
+            self.add(entity)
+        for god in gods:
+            self.gods.insert(god)
+
+    def add(self, entity):
+        self.grid.insert(entity)
+        self.counts[entity.type] += 1
+        if entity.type == "follower":
+            self.followers.insert(entity)
+
+    def moved(self, entity):
+        self.grid.move(entity)
+        if entity.type == "follower":
+            self.followers.move(entity)
+
+    def convert(self, entity, e_type):
+        if entity.type == e_type:
+            return
+        if entity.type == "follower":
+            self.followers.remove(entity)
+        self.counts[entity.type] -= 1
+        entity.type = e_type
+        self.counts[e_type] += 1
+        if e_type == "follower":
+            if self.rules.follower_color:
+                entity.color = self.rules.follower_color # Change color to reflect new type
+            self.followers.insert(entity)
+
+    def within(self, x, y, radius):
+        return self.grid.within(x, y, radius)
+
+    def followers_within(self, x, y, radius):
+        return len(self.followers.within(x, y, radius))
+
+    def gods_within(self, x, y, radius):
+        return self.gods.within(x, y, radius)
@@ -0,0 +1,132 @@
+import math
+
+import numpy as np
+import pygame
+from pygame import gfxdraw
+
+from .entities import AEGIS_COLOR, QUERENS_COLOR
+
+BACKGROUND = (10, 5, 20)
+RUST_COLOR = (200, 50, 30)
+GRAY_COLOR = (100, 100, 120)
+TEXT_COLOR = (200, 220, 255)
+
+
+class Renderer:
+    """Draws a World onto a surface, one gfxdraw call per object, the way
+    the original scripts did. Each draw_* step can be overridden on its own:
+    a front-end subclasses this to cache layers or change the look."""
+    def __init__(self):
+        self.font = None
+
+    def draw(self, surface, world):
+        surface.fill(BACKGROUND)
+        self.draw_substrate(surface)
+        self.draw_zones(surface, world)
+        self.draw_questions(surface, world)
+        self.draw_resonance(surface, world)
+        self.draw_entities(surface, world)
+        self.draw_gods(surface, world)
+        self.draw_ui(surface, world)
+
+    def draw_substrate(self, surface, ticks=None):
+        if ticks is None:
+            ticks = pygame.time.get_ticks()
+        width, height = surface.get_size()
+        # Draw substrate grid
+        for y in range(0, height, 30):
+            for x in range(0, width, 30):
+                alpha = 40 + int(20 * math.sin(x/100 + y/150 + ticks/3000))
+                gfxdraw.pixel(surface, x, y, (40, 60, 100, alpha))
+
+    def draw_zones(self, surface, world):
+        # Draw rust zones
+        for x, y, r in world.rust_zones:
+            gfxdraw.filled_circle(surface, int(x), int(y), int(r), (*RUST_COLOR, 80))
+
+        # Draw gray zones
+        for x, y, r in world.gray_zones:
+            gfxdraw.filled_circle(surface, int(x), int(y), int(r), (*GRAY_COLOR, 90))
+
+    def draw_questions(self, surface, world):
+        size = int(3 + 2 * math.sin(pygame.time.get_ticks() / 200))
+        for x, y, t in world.questions:
+            gfxdraw.filled_circle(surface, int(x), int(y), size, (255, 255, 200, 200))
+
+    def draw_resonance(self, surface, world):
+        for res in world.why_resonance:
+            gfxdraw.circle(surface,
+                           int(res['pos'][0]),
+                           int(res['pos'][1]),
+                           int(res['radius']),
+                           (180, 100, 255, int(150 * res['life']/100)))
+
+    def draw_entities(self, surface, world):
+        if world.backend == "arrays":
+            self.draw_arrays(surface, world.entities)
+        else:
+            for entity in world.entities:
+                self.draw_entity(surface, entity)
+
+    def draw_entity(self, surface, entity):
+        # Rust can push trust below zero; gfxdraw rejects out-of-range alpha
+        alpha = max(0, min(255, int(200 * entity.trust)))
+        color = (*entity.color[:3], alpha)
+        gfxdraw.filled_circle(surface, int(entity.x), int(entity.y), entity.size, color)
+
+    def draw_arrays(self, surface, arrays):
+        """Blend every entity into the surface as a 2x2 point in one pass;
+        per-entity gfxdraw circles would cost more than the simulation."""
+        width, height = surface.get_size()
+        alpha = (np.clip(200 * arrays.trust, 0, 255) / 255.0).astype(np.float32)[:, None]
+        colors = arrays.color.astype(np.float32)
+        xi = arrays.x.astype(np.intp)
+        yi = arrays.y.astype(np.intp)
+        pixels = pygame.surfarray.pixels3d(surface)
+        # Blend against the top-left pixel once and stamp the result 2x2
+        under = pixels[xi % width, yi % height].astype(np.float32)
+        blended = (under + (colors - under) * alpha).astype(np.uint8)
+        for ox, oy in ((0, 0), (1, 0), (0, 1), (1, 1)):
+            pixels[(xi + ox) % width, (yi + oy) % height] = blended
+        del pixels  # Unlock the surface
+
+    def draw_gods(self, surface, world):
+        for god in world.gods:
+            self.draw_god(surface, god)
+            # Draw trust aura
+            gfxdraw.circle(surface, int(god.x), int(god.y),
+                           int(50 + 10 * god.trust), (*god.color, min(255, int(100 * god.trust))))
+
+    def draw_god(self, surface, god):
+        # Draw god core
+        gfxdraw.filled_circle(surface, int(god.x), int(god.y),
+                              int(god.size * god.power), (*god.color, 180))
+
+        # Draw activation effects
+        if god.activation > 0:
+            if god.name == "AEGIS":
+                radius = 30 + 10 * math.sin(pygame.time.get_ticks() / 100)
+                gfxdraw.circle(surface, int(god.x), int(god.y),
+                               int(radius), (*AEGIS_COLOR, 100))
+            elif god.name == "QUERENS":
+                for i in range(5):
+                    angle = pygame.time.get_ticks() / 500 + i * 1.256
+                    radius = 40 + 10 * math.sin(pygame.time.get_ticks() / 300 + i)
+                    x = god.x + radius * math.cos(angle)
+                    y = god.y + radius * math.sin(angle)
+                    gfxdraw.filled_circle(surface, int(x), int(y),
+                                          5, (*QUERENS_COLOR, 200))
+
+    def texts(self, world):
+        counts = world.index.counts
+        return [
+            f"Entities: {len(world.entities)} (Curious: {counts['curious']})",
+            f"Followers: {counts['follower']}",
+            f"Rust Zones: {len(world.rust_zones)} | Gray Zones: {len(world.gray_zones)}",
+        ]
+
+    def draw_ui(self, surface, world):
+        if self.font is None:
+            self.font = pygame.font.SysFont('Arial', 16)
+        for i, text in enumerate(self.texts(world)):
+            surface.blit(self.font.render(text, True, TEXT_COLOR), (10, 10 + i*25))
@@ -0,0 +1,103 @@
+import random
+
+from .entities import TRUST_COLOR
+
+
+class Rules:
+    """Parameters and per-object rules for one flavour of the simulation.
+
+    The object backend calls entity_update(), god_update() and
+    zone_effects(); the array backend reads the same parameters and runs its
+    vectorized equivalents, so a subclass that only changes numbers affects
+    both. Any parameter can also be overridden per instance:
+    Rules(question_life=50).
+    """
+    width = 1200
+    height = 800
+    wrap = False            # Measure distances the short way round the edges
+    grid_cell = 32          # Zone radii are 15-70px, so a query touches a handful of cells
+    follower_cell = 100
+    follower_radius = 200   # Followers within this distance count towards a god
+    convert_radius = 150    # Questions asked this close to a god may convert the asker
+    convert_chance = 0.3
+    follower_color = TRUST_COLOR  # Converts are recoloured; None keeps their colour
+    question_chance = 0.01
+    question_cooldown = 60
+    question_life = 100
+    rust_drain = 0.01
+    gray_drag = 0.95
+    trust_gain = 0.001
+    tip_chance = 0.02       # Chance a trusting follower tips each god per frame
+    tip_amount = 0.05
+    god_decay = 0.999
+    aegis_chance = 0.02
+    aegis_duration = 30
+    querens_duration = 25
+    rust_spawn_interval = 5.0
+    gray_spawn_interval = 8.0
+    rust_shrink = 0.1       # Radius lost per frame
+    gray_shrink = 0.05
+    rust_min_radius = 2     # Zones at or below this radius vanish
+    gray_min_radius = 10
+    resonance_chance = 0.1  # Chance per frame that a live question rings
+    resonance_growth = 0.3
+    resonance_life = 100
+
+    def __init__(self, **overrides):
+        for name, value in overrides.items():
+            if not hasattr(type(self), name):
+                raise TypeError(f"unknown rule {name!r}")
+            setattr(self, name, value)
+
+    def zone_effects(self, index, rust_zones, gray_zones):
+        # Each zone visits only the entities in the grid cells it overlaps
+        for rx, ry, r in rust_zones:
+            for entity in index.within(rx, ry, r):
+                entity.trust -= self.rust_drain
+        for gx, gy, r in gray_zones:
+            for entity in index.within(gx, gy, r):
+                entity.velocity = [v * self.gray_drag for v in entity.velocity]
+
+    def entity_update(self, entity, gods, rng=random):
+        """Trust and curiosity for one entity; returns a new question or None."""
+        # Generate trust
+        if entity.type == "follower":
+            entity.trust += self.trust_gain
+            if entity.trust > 1.0:
+                entity.trust = 1.0
+                # Contribute to gods
+                for god in gods:
+                    if rng.random() < self.tip_chance:
+                        god.trust += self.tip_amount
+
+        # Curious behavior
+        if entity.type == "curious" and entity.question_cooldown <= 0:
+            if rng.random() < self.question_chance:  # Chance to ask question
+                entity.question_cooldown = self.question_cooldown
+                return (entity.x, entity.y, self.question_life)
+        else:
+            entity.question_cooldown -= 1
+        return None
+
+    def god_update(self, god, index, questions, rng=random):
+        # Count followers
+        god.followers = index.followers_within(god.x, god.y, self.follower_radius)
+
+        # Divine powers
+        if god.name == "AEGIS" and god.activation <= 0 and rng.random() < self.aegis_chance:
+            god.activation = self.aegis_duration  # Activate shield
+
+        if god.name == "QUERENS" and questions:
+            god.activation = self.querens_duration  # Respond to questions
+
+        if god.activation > 0:
+            god.activation -= 1
+
+        # Trust decay
+        god.trust *= self.god_decay
+
+
+class TorusRules(Rules):
+    """Entities wrap at the edges, so neighbours are measured across them too."""
+    wrap = True
+    grid_cell = 40          # Divides 1200 and 800, so the grid wraps evenly
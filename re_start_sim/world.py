@@ -0,0 +1,235 @@
+import random
+
+import numpy as np
+
+from .arrays import EntityArrays
+from .entities import new_world
+from .grid import EntityIndex
+from .rules import Rules
+
+TICK = 1 / 60           # One simulation step; the rules were written per 60 FPS frame
+MAX_FRAME = 0.25        # Drop time beyond this after a stall instead of spiralling
+COVERAGE_STEP = 10      # Lattice spacing for the rust coverage metric
+
+
+def simulate_frame(entities, gods, rust_zones, gray_zones, questions, index, rng=random):
+    """Advance entities and gods by one frame under `index.rules`. Returns
+    the new questions, which have already been appended to `questions`."""
+    rules = index.rules
+    for entity in entities:
+        entity.move(rules.width, rules.height)
+        index.moved(entity)
+    rules.zone_effects(index, rust_zones, gray_zones)
+
+    new_questions = []
+    for entity in entities:
+        question_data = rules.entity_update(entity, gods, rng)
+        if question_data: # question_data includes (x, y, lifetime)
+            new_questions.append(question_data)
+            # Chance to create follower when near gods
+            if index.gods_within(entity.x, entity.y, rules.convert_radius):
+                if rng.random() < rules.convert_chance:
+                    index.convert(entity, "follower")
+
+    questions.extend(new_questions)
+
+    # Update gods
+    for god in gods:
+        rules.god_update(god, index, questions, rng)
+    return new_questions
+
+
+class World:
+    """Everything the simulation needs, stepped on its own fixed clock so it
+    runs the same with or without a window. Front-ends render it; headless
+    runs step it as fast as they can.
+
+    A `recorder`, if set, is told about inputs with event(kind, tick, x, y),
+    kind being "rust" or "convert", and gets after_tick(world) each tick."""
+    def __init__(self, entities, gods, rust_zones=None, gray_zones=None, questions=None,
+                 why_resonance=None, backend="objects", rng=None, seed=None, rules=None):
+        self.rules = rules if rules is not None else Rules()
+        # Every random draw goes through these two generators, so a seed
+        # and the recorded inputs reproduce a run exactly
+        self.seed = seed
+        self.rng = random.Random(seed)
+        if rng is None:
+            rng = np.random.default_rng(seed)
+        self.backend = backend
+        if backend == "arrays":
+            if not isinstance(entities, EntityArrays):
+                entities = EntityArrays.from_entities(entities, rng)
+            entities.rules = self.rules
+            self.index = entities
+        else:
+            if isinstance(entities, EntityArrays):
+                entities = entities.to_entities()
+            self.index = EntityIndex(entities, gods, self.rules)
+        self.entities = entities
+        self.gods = gods
+        self.rust_zones = rust_zones if rust_zones is not None else []
+        self.gray_zones = gray_zones if gray_zones is not None else []
+        self.questions = questions if questions is not None else []
+        self.why_resonance = why_resonance if why_resonance is not None else []
+        self.ticks = 0
+        self.clock = 0.0
+        self.accumulator = 0.0
+        self.last_rust_spawn = 0.0
+        self.last_gray_spawn = 0.0
+        self.coverage_points = None
+        self.recorder = None
+
+    @classmethod
+    def new(cls, entity_count=500, backend="objects", seed=None, rules=None):
+        rules = rules if rules is not None else Rules()
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        rng = np.random.default_rng(seed)
+        py_rng = random.Random(seed)
+        if backend == "arrays":
+            entities = EntityArrays.random(entity_count, rng, rules)
+            gods = new_world(0, rules, py_rng)[1]
+        else:
+            entities, gods = new_world(entity_count, rules, py_rng)
+        return cls(entities, gods, backend=backend, rng=rng, seed=seed, rules=rules)
+
+    @classmethod
+    def from_state(cls, state, backend="objects", rules=None):
+        entities, gods, rust_zones, gray_zones, questions, why_resonance = state
+        return cls(entities, gods, rust_zones, gray_zones, questions, why_resonance, backend, rules=rules)
+
+    def state(self):
+        """(entities, gods, rust_zones, gray_zones, questions, why_resonance)"""
+        return (self.entities, self.gods, self.rust_zones, self.gray_zones,
+                self.questions, self.why_resonance)
+
+    def step(self, dt=TICK):
+        """Advance by `dt` seconds in whole TICKs and return how many ran;
+        the remainder carries over so the frame rate never changes results."""
+        self.accumulator = min(self.accumulator + dt, MAX_FRAME)
+        ticks = 0
+        while self.accumulator >= TICK:
+            self.accumulator -= TICK
+            self.tick()
+            ticks += 1
+        return ticks
+
+    def tick(self):
+        rules = self.rules
+        self.ticks += 1
+        self.clock += TICK
+
+        # Spawn environmental threats
+        if self.clock - self.last_rust_spawn > rules.rust_spawn_interval:
+            self.rust_zones.append((self.rng.randint(0, rules.width), self.rng.randint(0, rules.height),
+                                    self.rng.randint(15, 30)))
+            self.last_rust_spawn = self.clock
+        if self.clock - self.last_gray_spawn > rules.gray_spawn_interval:
+            self.gray_zones.append((self.rng.randint(0, rules.width), self.rng.randint(0, rules.height),
+                                    self.rng.randint(40, 70)))
+            self.last_gray_spawn = self.clock
+
+        # Update entities and gods
+        if self.backend == "arrays":
+            self.entities.step(self.gods, self.rust_zones, self.gray_zones, self.questions, self.rng)
+        else:
+            simulate_frame(self.entities, self.gods, self.rust_zones, self.gray_zones,
+                           self.questions, self.index, self.rng)
+
+        # Update environmental effects
+        self.rust_zones = [(x, y, r - rules.rust_shrink) for x, y, r in self.rust_zones
+                           if r > rules.rust_min_radius]
+        self.gray_zones = [(x, y, r - rules.gray_shrink) for x, y, r in self.gray_zones
+                           if r > rules.gray_min_radius]
+        self.questions = [(x, y, t-1) for x, y, t in self.questions if t > 0]
+
+        # Why Resonance effects
+        for qx, qy, _ in self.questions:
+            if self.rng.random() < rules.resonance_chance:
+                self.why_resonance.append({
+                    'pos': [qx, qy],
+                    'radius': self.rng.randint(5, 15),
+                    'life': rules.resonance_life
+                })
+
+        for res in self.why_resonance:
+            res['radius'] += rules.resonance_growth
+            res['life'] -= 1
+        # One filtering pass; list.remove per expired ripple was quadratic
+        self.why_resonance = [res for res in self.why_resonance if res['life'] > 0]
+
+        if self.recorder is not None:
+            self.recorder.after_tick(self)
+
+    def add_rust(self, x, y):
+        if self.recorder is not None:
+            self.recorder.event("rust", self.ticks, x, y)
+        self.rust_zones.append((x, y, self.rng.randint(20, 40)))
+
+    def convert_at(self, x, y, radius=20):
+        """Turn the entity nearest (x, y) into a follower; False if none is
+        in range. Nearest rather than first found, since grid cells are sets
+        and their order differs between runs."""
+        if self.recorder is not None:
+            self.recorder.event("convert", self.ticks, x, y)
+        if self.backend == "arrays":
+            hits = self.index.within(x, y, radius).tolist()
+            key = lambda i: ((self.entities.x[i] - x) ** 2 + (self.entities.y[i] - y) ** 2, i)
+        else:
+            hits = self.index.within(x, y, radius)
+            key = lambda e: ((e.x - x) ** 2 + (e.y - y) ** 2, e.x, e.y)
+        if not hits:
+            return False
+        entity = min(hits, key=key)
+        self.index.convert(entity, "follower")
+        if self.backend == "arrays":
+            self.entities.trust[entity] = 0.5
+        else:
+            entity.trust = 0.5 # Give initial trust as a follower
+        return True
+
+    def trust_values(self):
+        if self.backend == "arrays":
+            return self.entities.trust
+        return np.fromiter((e.trust for e in self.entities), dtype=float, count=len(self.entities))
+
+    def rust_coverage(self):
+        """Fraction of the world inside at least one rust zone, sampled on a
+        COVERAGE_STEP lattice so overlapping zones aren't double counted."""
+        if self.coverage_points is None:
+            xs, ys = np.meshgrid(np.arange(COVERAGE_STEP / 2, self.rules.width, COVERAGE_STEP),
+                                 np.arange(COVERAGE_STEP / 2, self.rules.height, COVERAGE_STEP))
+            self.coverage_points = (xs.ravel(), ys.ravel())
+        px, py = self.coverage_points
+        covered = np.zeros(px.size, dtype=bool)
+        for rx, ry, r in self.rust_zones:
+            covered |= (px - rx) ** 2 + (py - ry) ** 2 < r * r
+        return float(covered.mean())
+
+    def metrics(self):
+        counts = self.index.counts
+        trust = self.trust_values()
+        row = {
+            "tick": self.ticks,
+            "time_s": round(self.clock, 3),
+            "entities": len(self.entities),
+            "lesser": counts["lesser"],
+            "curious": counts["curious"],
+            "followers": counts["follower"],
+        }
+        for god in self.gods:
+            row[f"followers_{god.name}"] = god.followers
+            row[f"trust_{god.name}"] = round(god.trust, 4)
+        row["rust_zones"] = len(self.rust_zones)
+        row["rust_coverage"] = round(self.rust_coverage(), 5)
+        row["gray_zones"] = len(self.gray_zones)
+        row["questions"] = len(self.questions)
+        if trust.size:
+            p10, p50, p90 = np.percentile(trust, (10, 50, 90))
+            row.update(trust_mean=trust.mean(), trust_min=trust.min(), trust_p10=p10,
+                       trust_p50=p50, trust_p90=p90, trust_max=trust.max())
+        else:
+            row.update(dict.fromkeys(("trust_mean", "trust_min", "trust_p10", "trust_p50", "trust_p90", "trust_max"), 0.0))
+        for key in ("trust_mean", "trust_min", "trust_p10", "trust_p50", "trust_p90", "trust_max"):
+            row[key] = round(float(row[key]), 5)
+        return row